@@ -0,0 +1,101 @@
+"""Precompressed sidecars (X.gz, X.br) for exported artifacts.
+
+Static hosting can serve these directly instead of compressing every
+response on the fly.  gzip is always written; brotli only when the
+optional ``brotli`` module is installed.  Both use their highest level
+and are deterministic, so unchanged inputs give unchanged sidecars.
+"""
+
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from . import config, export_manifest
+
+try:
+    import brotli
+except ImportError:  # optional: .gz sidecars only
+    brotli = None
+
+SIDECAR_SUFFIXES = (".gz", ".br")
+
+
+def _encoders() -> dict:
+    """Sidecar suffix -> compress function for the available codecs."""
+    encoders = {".gz": lambda data: gzip.compress(data, compresslevel=9,
+                                                  mtime=0)}
+    if brotli is not None:
+        encoders[".br"] = lambda data: brotli.compress(data, quality=11)
+    return encoders
+
+
+def codecs() -> list[str]:
+    """Sidecar suffixes written with the codecs available here."""
+    return list(_encoders())
+
+
+def sidecar_paths(path: Path) -> list[Path]:
+    """Sidecars written for *path*."""
+    return [path.with_name(path.name + suffix) for suffix in codecs()]
+
+
+def compress_file(path: Path) -> dict[str, int]:
+    """Write the sidecars of one file. Returns suffix -> compressed size."""
+    data = path.read_bytes()
+    sizes = {}
+    for suffix, encode in _encoders().items():
+        blob = encode(data)
+        with export_manifest.replace_if_changed(
+                path.with_name(path.name + suffix), "wb") as f:
+            f.write(blob)
+        sizes[suffix] = len(blob)
+    return sizes
+
+
+def _display_path(path: Path) -> str:
+    """*path* relative to the public data dir (or project root) for logs;
+    shard files share names, so the bare name is ambiguous."""
+    for root in (config.PUBLIC_DATA_DIR, config.PROJECT_ROOT):
+        try:
+            return path.resolve().relative_to(root.resolve()).as_posix()
+        except ValueError:
+            pass
+    return str(path)
+
+
+def compress_outputs(paths,
+                     manifest: export_manifest.ExportManifest | None = None,
+                     workers: int | None = None
+                     ) -> dict[Path, dict[str, int]]:
+    """Compress exported files in a thread pool, printing each ratio.
+
+    Files are skipped when *manifest* shows both the file and its
+    sidecars unchanged since they were last recorded, so the manifest
+    must not have been updated with this run's paths yet.
+
+    Returns {path: {suffix: compressed size}} for the files compressed.
+    """
+    paths = [Path(p) for p in dict.fromkeys(paths)
+             if Path(p).suffix not in SIDECAR_SUFFIXES]
+
+    def unchanged(path: Path) -> bool:
+        return manifest is not None and all(
+            manifest.recorded(p) for p in [path, *sidecar_paths(path)]
+        )
+
+    todo = [p for p in paths if not unchanged(p)]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results = dict(zip(todo, pool.map(compress_file, todo)))
+
+    for path in results:
+        size = path.stat().st_size
+        ratios = ", ".join(
+            f"{suffix} {compressed:,} ({compressed / size:.1%})"
+            for suffix, compressed in results[path].items()
+        ) if size else "empty"
+        print(f"  {_display_path(path)}: {size:,} bytes -> {ratios}")
+    skipped = len(paths) - len(results)
+    if skipped:
+        print(f"  {skipped} files unchanged, sidecars kept")
+    return results
@@ -16,6 +16,19 @@ JSONP_PATH = DATA_DIR / "job_data.js"
 # JSON output paths (for metroverse-jobs frontend)
 JSON_FULL_PATH = PUBLIC_DATA_DIR / "bls-data.json"
 
+# Hash/size/rows of every exported file (see export_manifest.py)
+EXPORT_MANIFEST_PATH = DATA_DIR / "export_manifest.json"
+# Exports a superseded content-addressed file survives before removal
+HASHED_FILE_GENERATIONS = 3
+
+# JSON encoding: "compact" (production) or "pretty" (indent=2, for diffing)
+JSON_STYLES = ("compact", "pretty")
+JSON_FLOAT_DIGITS = 4  # decimal places kept for floats in compact JSON
+
+# regionData layout: "rows" (array of objects) or "columns" (parallel arrays)
+REGION_DATA_ENCODINGS = ("rows", "columns")
+COMPLEXITY_SCALE = 10 ** JSON_FLOAT_DIGITS  # quantized complexity = round(c * scale)
+
 # BLS OES bulk download URLs (YY = 2-digit year)
 BLS_BASE_URL = "https://www.bls.gov/oes/special-requests"
 ONET_BASE_URL = "https://www.onetcenter.org/dl_files/database"
@@ -175,6 +188,10 @@ SOC_MAJOR_GROUPS = {
     "53": "Transportation and Material Moving",
 }
 
+# Classification version per code system (hierarchy rules in bls-data.json,
+# and the version of the shared occupation dictionaries)
+CODE_SYSTEM_VERSIONS = {"SOC": "soc2018", "NCO": "nco2015"}
+
 # SOC Major Group colors (for frontend visualization)
 SOC_MAJOR_GROUP_COLORS = {
     "11": "#A973BE",  # Management - Purple
@@ -380,6 +397,11 @@ def json_country_year_path(country: str, year: int) -> Path:
     return PUBLIC_DATA_DIR / f"bls-data-{country}-{year}.json"
 
 
+def json_occupations_path(country: str) -> Path:
+    """Return path for a country's shared occupation dictionary."""
+    return PUBLIC_DATA_DIR / f"occupations-{country}.json"
+
+
 def json_country_year_level_path(country: str, year: int, level: int | str) -> Path:
     """Return path for a country-year-level extension JSON file.
 
@@ -1,8 +1,22 @@
 """SQLite database schema, CRUD operations, and complexity computation."""
 
+import hashlib
 import sqlite3
+from collections import Counter
+from collections.abc import Iterable
+from itertools import islice
 from pathlib import Path
 
+from .hierarchy import (
+    OccupationHierarchy,
+    _get_level,
+    _get_major_group_id,
+    _get_parent,
+)
+
+# Rows per executemany() call in bulk_insert_occupations().
+BULK_CHUNK_SIZE = 10_000
+
 SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS countries (
     id INTEGER PRIMARY KEY,
@@ -20,42 +34,257 @@ CREATE TABLE IF NOT EXISTS regions (
     UNIQUE(country_id, name, region_type)
 );
 
-CREATE TABLE IF NOT EXISTS occupations (
+CREATE TABLE IF NOT EXISTS occupation_codes (
     id INTEGER PRIMARY KEY,
-    year INTEGER NOT NULL,
-    region_id INTEGER NOT NULL REFERENCES regions(id),
+    code_system TEXT NOT NULL,
     occupation_code TEXT NOT NULL,
     occupation_title TEXT NOT NULL,
     major_group_name TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    parent_code TEXT,
+    -- 1 for parent codes no source published, added so synthesized
+    -- rows can reference them; cleared when a real row arrives
+    is_placeholder INTEGER NOT NULL DEFAULT 0,
+    UNIQUE(code_system, occupation_code)
+);
+
+CREATE TABLE IF NOT EXISTS occupation_facts (
+    id INTEGER PRIMARY KEY,
+    year INTEGER NOT NULL,
+    region_id INTEGER NOT NULL REFERENCES regions(id),
+    code_id INTEGER NOT NULL REFERENCES occupation_codes(id),
     employment INTEGER NOT NULL,
     mean_annual_wage INTEGER NOT NULL,
     gdp BIGINT NOT NULL,
     complexity_score REAL NOT NULL DEFAULT 0.5,
-    UNIQUE(year, region_id, occupation_code)
+    UNIQUE(year, region_id, code_id)
+);
+
+-- Missing intermediate levels rolled up from their children by
+-- synthesize_levels(); complexity_score is the unrounded
+-- employment-weighted mean of the children.  child_order is the first
+-- child in export order ('0' + code if published, '1' + code if
+-- synthesized) and keeps exported rows in a stable order.
+CREATE TABLE IF NOT EXISTS synthetic_occupations (
+    id INTEGER PRIMARY KEY,
+    year INTEGER NOT NULL,
+    region_id INTEGER NOT NULL REFERENCES regions(id),
+    code_id INTEGER NOT NULL REFERENCES occupation_codes(id),
+    employment INTEGER NOT NULL,
+    mean_annual_wage INTEGER NOT NULL,
+    gdp BIGINT NOT NULL,
+    complexity_score REAL NOT NULL,
+    child_order TEXT NOT NULL,
+    UNIQUE(year, region_id, code_id)
+);
+
+-- (year, region) groups whose synthetic_occupations are up to date.
+-- synthesize_levels() adds them; every function that writes the group's
+-- facts removes its entry (_invalidate_rollups), and exporters roll
+-- stale groups up in Python instead.
+CREATE TABLE IF NOT EXISTS synthetic_scopes (
+    year INTEGER NOT NULL,
+    region_id INTEGER NOT NULL REFERENCES regions(id),
+    PRIMARY KEY (year, region_id)
+);
+
+-- Title / major group a code was published with in a year, only where
+-- it differs from occupation_codes (codes retitled between releases).
+CREATE TABLE IF NOT EXISTS occupation_titles (
+    code_id INTEGER NOT NULL REFERENCES occupation_codes(id),
+    year INTEGER NOT NULL,
+    occupation_title TEXT NOT NULL,
+    major_group_name TEXT NOT NULL,
+    PRIMARY KEY (code_id, year)
+);
+
+-- Compatibility view: the pre-normalization occupations column shape.
+CREATE VIEW IF NOT EXISTS occupations AS
+SELECT f.id, f.year, f.region_id, oc.occupation_code,
+       COALESCE(t.occupation_title, oc.occupation_title) AS occupation_title,
+       COALESCE(t.major_group_name, oc.major_group_name) AS major_group_name,
+       f.employment, f.mean_annual_wage, f.gdp, f.complexity_score,
+       f.code_id
+FROM occupation_facts f
+JOIN occupation_codes oc ON oc.id = f.code_id
+LEFT JOIN occupation_titles t ON t.code_id = f.code_id AND t.year = f.year;
+
+CREATE TABLE IF NOT EXISTS import_manifest (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_occ_year ON occupations(year);
-CREATE INDEX IF NOT EXISTS idx_occ_region ON occupations(region_id);
+CREATE TABLE IF NOT EXISTS import_manifest_scopes (
+    path TEXT NOT NULL REFERENCES import_manifest(path) ON DELETE CASCADE,
+    year INTEGER NOT NULL,
+    region_id INTEGER NOT NULL,
+    PRIMARY KEY (path, year, region_id)
+);
+"""
+
+# Secondary indexes; kept separate so bulk loads can build them afterwards.
+# The exporters walk countries(code) -> regions -> facts -> codes:
+#   countries(code)        is served by the UNIQUE constraint index
+#   idx_regions_order      regions of a country in export sort order
+#   idx_occ_region_cover   all fact columns an exporter reads, so the
+#                          per-region probe never touches the table
+# idx_occ_region_cover supersedes the single-column idx_occ_region.
+INDEX_SQL = """
+DROP INDEX IF EXISTS idx_occ_region;
+CREATE INDEX IF NOT EXISTS idx_occ_year ON occupation_facts(year);
+CREATE INDEX IF NOT EXISTS idx_occ_region_cover ON occupation_facts(
+    region_id, code_id, year,
+    employment, mean_annual_wage, gdp, complexity_score
+);
+CREATE INDEX IF NOT EXISTS idx_regions_order
+    ON regions(country_id, region_type, name);
 """
 
+# PRAGMA settings per connection profile, applied in order by connect().
+#   default     - general use
+#   bulk_load   - imports: no fsync, 256 MB page cache, temp B-trees in RAM
+#   read_mostly - exports: memory-mapped reads, writes rejected
+CONNECTION_PROFILES = {
+    "default": {
+        "journal_mode": "WAL",
+        "foreign_keys": "ON",
+    },
+    "bulk_load": {
+        "journal_mode": "WAL",
+        "foreign_keys": "ON",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "temp_store": "MEMORY",
+    },
+    "read_mostly": {
+        "journal_mode": "WAL",
+        "foreign_keys": "ON",
+        "mmap_size": 268435456,
+        "cache_size": -65536,
+        "query_only": "ON",
+    },
+}
 
-def connect(db_path: Path) -> sqlite3.Connection:
-    """Open (or create) the SQLite database and return a connection."""
+
+def connect(db_path: Path, profile: str = "default") -> sqlite3.Connection:
+    """Open (or create) the SQLite database and return a connection.
+
+    *profile* selects a set of PRAGMAs from CONNECTION_PROFILES.
+    """
+    if profile not in CONNECTION_PROFILES:
+        raise ValueError(f"Unknown connection profile: {profile}")
     conn = sqlite3.connect(str(db_path))
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
+    for pragma, value in CONNECTION_PROFILES[profile].items():
+        conn.execute(f"PRAGMA {pragma}={value}")
     return conn
 
 
 def create_schema(conn: sqlite3.Connection) -> None:
-    """Create all tables and indexes if they don't exist."""
+    """Create all tables and indexes if they don't exist.
+
+    A database with the old denormalized occupations table is migrated
+    to occupation_codes + occupation_facts in place.
+    """
+    legacy = _object_type(conn, "occupations") == "table"
+    if legacy:
+        conn.execute("ALTER TABLE occupations RENAME TO occupations_legacy")
+    else:
+        # Recreated below, so older databases get the current definition
+        conn.execute("DROP VIEW IF EXISTS occupations")
     conn.executescript(SCHEMA_SQL)
+    if legacy:
+        _migrate_legacy_occupations(conn)
+    create_indexes(conn)
+
+
+def _object_type(conn: sqlite3.Connection, name: str) -> str | None:
+    """Return 'table', 'view', ... for a schema object, or None."""
+    row = conn.execute(
+        "SELECT type FROM sqlite_master WHERE name = ?", (name,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _migrate_legacy_occupations(conn: sqlite3.Connection) -> None:
+    """Move rows from occupations_legacy into the normalized tables."""
+    conn.execute("""
+        INSERT OR IGNORE INTO occupation_codes
+            (code_system, occupation_code, occupation_title,
+             major_group_name, level)
+        SELECT c.code_system, o.occupation_code, o.occupation_title,
+               o.major_group_name, 0
+        FROM occupations_legacy o
+        JOIN regions r ON o.region_id = r.id
+        JOIN countries c ON r.country_id = c.id
+        ORDER BY o.id
+    """)
+    refresh_code_hierarchy(conn)
+    conn.execute("""
+        INSERT INTO occupation_facts
+            (id, year, region_id, code_id, employment, mean_annual_wage,
+             gdp, complexity_score)
+        SELECT o.id, o.year, o.region_id, oc.id, o.employment,
+               o.mean_annual_wage, o.gdp, o.complexity_score
+        FROM occupations_legacy o
+        JOIN regions r ON o.region_id = r.id
+        JOIN countries c ON r.country_id = c.id
+        JOIN occupation_codes oc
+          ON oc.code_system = c.code_system
+         AND oc.occupation_code = o.occupation_code
+    """)
+    conn.execute("""
+        INSERT OR IGNORE INTO occupation_titles
+            (code_id, year, occupation_title, major_group_name)
+        SELECT oc.id, o.year, o.occupation_title, o.major_group_name
+        FROM occupations_legacy o
+        JOIN regions r ON o.region_id = r.id
+        JOIN countries c ON r.country_id = c.id
+        JOIN occupation_codes oc
+          ON oc.code_system = c.code_system
+         AND oc.occupation_code = o.occupation_code
+        WHERE o.occupation_title != oc.occupation_title
+           OR o.major_group_name != oc.major_group_name
+        ORDER BY o.id
+    """)
+    conn.execute("DROP TABLE occupations_legacy")
+    conn.commit()
+
+
+def create_indexes(conn: sqlite3.Connection) -> None:
+    """Create (or rebuild after drop_indexes) all secondary indexes."""
+    conn.executescript(INDEX_SQL)
+
+
+def drop_indexes(conn: sqlite3.Connection) -> None:
+    """Drop all secondary indexes so a bulk load skips index maintenance.
+
+    UNIQUE constraint indexes are kept; they are needed to resolve
+    conflicts during the load.  Call create_indexes() afterwards.
+    """
+    names = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master "
+        "WHERE type = 'index' AND sql IS NOT NULL"
+    )]
+    for name in names:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
 
 
 def drop_all(conn: sqlite3.Connection) -> None:
     """Drop all tables (for --fresh rebuilds)."""
+    if _object_type(conn, "occupations") == "table":
+        conn.execute("DROP TABLE occupations")
     conn.executescript("""
-        DROP TABLE IF EXISTS occupations;
+        DROP VIEW IF EXISTS occupations;
+        DROP TABLE IF EXISTS import_manifest_scopes;
+        DROP TABLE IF EXISTS import_manifest;
+        DROP TABLE IF EXISTS synthetic_scopes;
+        DROP TABLE IF EXISTS synthetic_occupations;
+        DROP TABLE IF EXISTS occupation_titles;
+        DROP TABLE IF EXISTS occupation_facts;
+        DROP TABLE IF EXISTS occupation_codes;
         DROP TABLE IF EXISTS regions;
         DROP TABLE IF EXISTS countries;
     """)
@@ -94,62 +323,669 @@ def ensure_region(conn: sqlite3.Connection, country_id: int,
     return row[0]
 
 
+def ensure_occupation_code(conn: sqlite3.Connection, code_system: str,
+                           occupation_code: str, occupation_title: str,
+                           major_group_name: str,
+                           known: set[str] | None = None) -> int:
+    """Insert an occupation code if not exists, return its id.
+
+    Level and parent are derived from the code.  The first title seen
+    for a code is kept, except that a placeholder's title is replaced;
+    other years' titles go to occupation_titles (set_year_names).
+    *known* is the caller's set of the code system's codes (the new code
+    is added to it); without it the set is read from the table.
+    """
+    row = conn.execute(
+        "SELECT id, is_placeholder FROM occupation_codes "
+        "WHERE code_system = ? AND occupation_code = ?",
+        (code_system, occupation_code),
+    ).fetchone()
+    if row:
+        if row[1]:
+            conn.execute(
+                "UPDATE occupation_codes SET occupation_title = ?, "
+                "major_group_name = ?, is_placeholder = 0 WHERE id = ?",
+                (occupation_title, major_group_name, row[0]),
+            )
+        if known is not None:
+            known.add(occupation_code)
+        return row[0]
+    if known is None:
+        known = {r[0] for r in conn.execute(
+            "SELECT occupation_code FROM occupation_codes "
+            "WHERE code_system = ?",
+            (code_system,),
+        )}
+    known.add(occupation_code)
+    level = _get_level(occupation_code, code_system)
+    cur = conn.execute(
+        "INSERT INTO occupation_codes (code_system, occupation_code, "
+        "occupation_title, major_group_name, level, parent_code) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (code_system, occupation_code, occupation_title, major_group_name,
+         level, _get_parent(occupation_code, code_system, known)),
+    )
+    # A new code can become the parent of codes one level down
+    # (e.g. a SOC 2018 renumbered minor group); re-resolve those.  Its
+    # children all start with the code minus trailing zeros, so the
+    # GLOB is a range scan of the (code_system, occupation_code) index.
+    children = conn.execute(
+        "SELECT id, occupation_code, parent_code FROM occupation_codes "
+        "WHERE code_system = ? AND occupation_code GLOB ? AND level = ?",
+        (code_system, occupation_code.rstrip("0") + "*", level + 1),
+    ).fetchall()
+    conn.executemany(
+        "UPDATE occupation_codes SET parent_code = ? WHERE id = ?",
+        [(parent, cid) for cid, code, old in children
+         if (parent := _get_parent(code, code_system, known)) != old],
+    )
+    return cur.lastrowid
+
+
+def refresh_code_hierarchy(conn: sqlite3.Connection) -> None:
+    """Recompute level and parent_code for every occupation code."""
+    by_system: dict[str, dict[str, int]] = {}
+    for cid, code_system, code in conn.execute(
+        "SELECT id, code_system, occupation_code FROM occupation_codes"
+    ):
+        by_system.setdefault(code_system, {})[code] = cid
+    for code_system, ids in by_system.items():
+        hierarchy = OccupationHierarchy(ids, code_system)
+        conn.executemany(
+            "UPDATE occupation_codes SET level = ?, parent_code = ? "
+            "WHERE id = ?",
+            [(hierarchy.levels[i], hierarchy.parent_codes[i], ids[code])
+             for i, code in enumerate(hierarchy.codes)],
+        )
+
+
+def _region_code_system(conn: sqlite3.Connection, region_id: int) -> str:
+    """Return the occupation code system of a region's country."""
+    return conn.execute(
+        "SELECT c.code_system FROM regions r "
+        "JOIN countries c ON r.country_id = c.id WHERE r.id = ?",
+        (region_id,),
+    ).fetchone()[0]
+
+
+class DimensionCache:
+    """Memoized country/region/occupation-code id lookups for the life
+    of a connection.
+
+    Existing rows are pre-loaded with one query per table; afterwards
+    ensure_country/ensure_region/ensure_occupation_code only touch SQLite
+    for unseen keys.  ``write_counts`` tallies the changed / unchanged
+    outcome of every occupation row written with this cache;
+    write_summary() splits changed rows into inserts and updates.
+    The first title a code has in each year written through the cache
+    is its title for that year (set_year_names).
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.write_counts: Counter = Counter()
+        self.facts_at_start: int = conn.execute(
+            "SELECT COUNT(*) FROM occupation_facts"
+        ).fetchone()[0]
+        self.countries: dict[str, int] = {
+            code: cid
+            for cid, code in conn.execute("SELECT id, code FROM countries")
+        }
+        self.regions: dict[tuple[int, str, str], int] = {
+            (country_id, name, region_type): rid
+            for rid, country_id, name, region_type in conn.execute(
+                "SELECT id, country_id, name, region_type FROM regions"
+            )
+        }
+        self.code_systems: dict[int, str] = dict(conn.execute(
+            "SELECT r.id, c.code_system FROM regions r "
+            "JOIN countries c ON r.country_id = c.id"
+        ))
+        self.codes: dict[tuple[str, str], int] = {
+            (code_system, code): oid
+            for oid, code_system, code in conn.execute(
+                "SELECT id, code_system, occupation_code FROM occupation_codes "
+                "WHERE is_placeholder = 0"
+            )
+        }
+        self.names: dict[int, tuple[str, str]] = {}
+        self.known: dict[str, set[str]] = {}
+        for oid, code_system, code, title, major_group in conn.execute(
+            "SELECT id, code_system, occupation_code, occupation_title, "
+            "major_group_name FROM occupation_codes"
+        ):
+            self.names[oid] = (title, major_group)
+            self.known.setdefault(code_system, set()).add(code)
+        self.year_names: dict[tuple[int, int], tuple[str, str]] = {
+            (code_id, year): (title, major_group)
+            for code_id, year, title, major_group in conn.execute(
+                "SELECT code_id, year, occupation_title, major_group_name "
+                "FROM occupation_titles"
+            )
+        }
+        self._named: set[tuple[int, int]] = set()
+
+    def write_summary(self, cleared: int = 0) -> dict[str, int]:
+        """Split ``write_counts`` into inserted / updated / unchanged.
+
+        Inserts are the growth of occupation_facts since the cache was
+        created plus the *cleared* rows deleted for re-import in between
+        (ImportManifest.cleared); the rest of the changed rows are updates.
+        Costs one COUNT per call instead of per written chunk.
+        """
+        total = self.conn.execute(
+            "SELECT COUNT(*) FROM occupation_facts"
+        ).fetchone()[0]
+        inserted = total - self.facts_at_start + cleared
+        return {
+            "inserted": inserted,
+            "updated": self.write_counts["changed"] - inserted,
+            "unchanged": self.write_counts["unchanged"],
+        }
+
+    def country_id(self, code: str, name: str, code_system: str,
+                   currency: str = "USD") -> int:
+        """Return the id for a country code, inserting it on first use."""
+        cid = self.countries.get(code)
+        if cid is None:
+            cid = ensure_country(self.conn, code, name, code_system, currency)
+            self.countries[code] = cid
+        return cid
+
+    def region_id(self, country_id: int, name: str, region_type: str) -> int:
+        """Return the id for a region, inserting it on first use."""
+        key = (country_id, name, region_type)
+        rid = self.regions.get(key)
+        if rid is None:
+            rid = ensure_region(self.conn, country_id, name, region_type)
+            self.regions[key] = rid
+        return rid
+
+    def code_id(self, region_id: int, occupation_code: str,
+                occupation_title: str, major_group_name: str,
+                year: int | None = None) -> int:
+        """Return the occupation_codes id for a code as used in a region
+        (and, with *year*, record the names it has in that year)."""
+        code_system = self.code_systems.get(region_id)
+        if code_system is None:
+            code_system = _region_code_system(self.conn, region_id)
+            self.code_systems[region_id] = code_system
+        key = (code_system, occupation_code)
+        oid = self.codes.get(key)
+        if oid is None:
+            oid = ensure_occupation_code(
+                self.conn, code_system, occupation_code, occupation_title,
+                major_group_name, self.known.setdefault(code_system, set()),
+            )
+            self.codes[key] = oid
+            self.names[oid] = (occupation_title, major_group_name)
+        if year is not None and (oid, year) not in self._named:
+            self._named.add((oid, year))
+            names = (occupation_title, major_group_name)
+            if self.year_names.get((oid, year), self.names[oid]) != names:
+                set_year_names(self.conn, oid, year, *names)
+                if names == self.names[oid]:
+                    del self.year_names[oid, year]
+                else:
+                    self.year_names[oid, year] = names
+        return oid
+
+
+def file_hash(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ImportManifest:
+    """Source-file manifest for incremental imports.
+
+    Records size, mtime and content hash of every imported file together
+    with the (year, region_id) scopes its rows landed in.  Importers ask
+    unchanged() before parsing a file, call clear() to drop the rows a
+    changed file produced last time, and record() once its rows are in.
+    Every cleared or recorded scope is collected in ``affected`` so
+    complexity can be renormalized for just those regions, and the
+    number of deleted rows in ``cleared``.
+
+    Files that carry no year column are imported into the run's year, so
+    their entries are kept per target year (*year* below): the same file
+    imported for 2023 is not unchanged for 2024.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.affected: set[tuple[int, int]] = set()
+        self.skipped = 0
+        self.cleared = 0
+
+    @staticmethod
+    def _key(path: Path, year: int | None = None) -> str:
+        key = str(Path(path).resolve())
+        return key if year is None else f"{key}@{year}"
+
+    def unchanged(self, path: Path, year: int | None = None) -> bool:
+        """True if *path* matches its manifest entry (size/mtime, then hash)
+        for target *year*."""
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, content_hash FROM import_manifest "
+            "WHERE path = ?",
+            (self._key(path, year),),
+        ).fetchone()
+        if row is None:
+            return False
+        stat = Path(path).stat()
+        same = stat.st_size == row[0] and (
+            stat.st_mtime_ns == row[1] or file_hash(path) == row[2]
+        )
+        if same:
+            self.skipped += 1
+        return same
+
+    def clear(self, path: Path,
+              scopes: Iterable[tuple[int, int]] = (),
+              year: int | None = None) -> None:
+        """Delete occupation rows previously imported from *path* (for
+        target *year*).
+
+        Rows in any extra *scopes* the new version will write are cleared
+        too, so occupations dropped from the file do not linger.
+        """
+        old = self.conn.execute(
+            "SELECT year, region_id FROM import_manifest_scopes "
+            "WHERE path = ?",
+            (self._key(path, year),),
+        ).fetchall()
+        targets = set(old) | set(scopes)
+        self.cleared += self.conn.executemany(
+            "DELETE FROM occupation_facts WHERE year = ? AND region_id = ?",
+            sorted(targets),
+        ).rowcount
+        _invalidate_rollups(self.conn, targets)
+        self.affected |= targets
+
+    def record(self, path: Path, scopes: Iterable[tuple[int, int]],
+               year: int | None = None) -> None:
+        """Store the fingerprint and produced scopes for *path* (for
+        target *year*)."""
+        key = self._key(path, year)
+        stat = Path(path).stat()
+        scopes = set(scopes)
+        self.conn.execute(
+            "INSERT INTO import_manifest (path, size, mtime_ns, content_hash) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT(path) DO UPDATE SET "
+            "size = excluded.size, mtime_ns = excluded.mtime_ns, "
+            "content_hash = excluded.content_hash",
+            (key, stat.st_size, stat.st_mtime_ns, file_hash(path)),
+        )
+        self.conn.execute(
+            "DELETE FROM import_manifest_scopes WHERE path = ?", (key,)
+        )
+        self.conn.executemany(
+            "INSERT INTO import_manifest_scopes (path, year, region_id) "
+            "VALUES (?, ?, ?)",
+            [(key, year, region_id) for year, region_id in sorted(scopes)],
+        )
+        self.conn.commit()
+        self.affected |= scopes
+
+
+# Rows that already exist are updated in place (same rowid, no index
+# churn), and only when a measure actually changed.
+INSERT_OCCUPATION_SQL = (
+    "INSERT INTO occupation_facts "
+    "(year, region_id, code_id, employment, mean_annual_wage, gdp, "
+    "complexity_score) "
+    "VALUES (?, ?, ?, ?, ?, ?, 0.5) "
+    "ON CONFLICT(year, region_id, code_id) DO UPDATE SET "
+    "employment = excluded.employment, "
+    "mean_annual_wage = excluded.mean_annual_wage, "
+    "gdp = excluded.gdp "
+    "WHERE employment != excluded.employment "
+    "OR mean_annual_wage != excluded.mean_annual_wage "
+    "OR gdp != excluded.gdp"
+)
+
+
+def set_year_names(conn: sqlite3.Connection, code_id: int, year: int,
+                   occupation_title: str, major_group_name: str) -> None:
+    """Record the title and major group *code_id* was published with in
+    *year*; only names that differ from its occupation_codes row are kept."""
+    base = conn.execute(
+        "SELECT occupation_title, major_group_name FROM occupation_codes "
+        "WHERE id = ?", (code_id,),
+    ).fetchone()
+    if base == (occupation_title, major_group_name):
+        conn.execute(
+            "DELETE FROM occupation_titles WHERE code_id = ? AND year = ?",
+            (code_id, year),
+        )
+    else:
+        conn.execute(
+            "INSERT INTO occupation_titles (code_id, year, occupation_title, "
+            "major_group_name) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(code_id, year) DO UPDATE SET "
+            "occupation_title = excluded.occupation_title, "
+            "major_group_name = excluded.major_group_name",
+            (code_id, year, occupation_title, major_group_name),
+        )
+
+
+def _invalidate_rollups(conn: sqlite3.Connection,
+                       scopes: Iterable[tuple[int, int]]) -> None:
+    """Mark the rollups of (year, region_id) groups whose facts changed
+    as stale."""
+    conn.executemany(
+        "DELETE FROM synthetic_scopes WHERE year = ? AND region_id = ?",
+        scopes,
+    )
+
+
 def insert_occupation(conn: sqlite3.Connection, year: int, region_id: int,
                       occupation_code: str, occupation_title: str,
                       major_group_name: str, employment: int,
                       mean_annual_wage: int) -> None:
     """Insert one occupation record. GDP is auto-calculated."""
+    code_id = ensure_occupation_code(
+        conn, _region_code_system(conn, region_id),
+        occupation_code, occupation_title, major_group_name,
+    )
+    set_year_names(conn, code_id, year, occupation_title, major_group_name)
     gdp = employment * mean_annual_wage
     conn.execute(
-        "INSERT OR REPLACE INTO occupations "
-        "(year, region_id, occupation_code, occupation_title, "
-        "major_group_name, employment, mean_annual_wage, gdp, complexity_score) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0.5)",
-        (year, region_id, occupation_code, occupation_title,
-         major_group_name, employment, mean_annual_wage, gdp),
+        INSERT_OCCUPATION_SQL,
+        (year, region_id, code_id, employment, mean_annual_wage, gdp),
     )
+    _invalidate_rollups(conn, [(year, region_id)])
 
 
-def compute_complexity_scores(conn: sqlite3.Connection) -> None:
+def bulk_insert_occupations(conn: sqlite3.Connection,
+                            rows: Iterable[tuple],
+                            chunk_size: int = BULK_CHUNK_SIZE,
+                            cache: DimensionCache | None = None) -> int:
+    """Insert many occupation records with executemany. Returns row count.
+
+    Each row is a tuple of (year, region_id, occupation_code,
+    occupation_title, major_group_name, employment, mean_annual_wage);
+    the code is resolved to an occupation_codes id through *cache* and
+    GDP is appended inline.  Rows are consumed lazily and written in
+    chunks of *chunk_size*, all inside a single transaction that is
+    committed at the end.
+
+    Existing rows are upserted; the changed / unchanged tallies are added
+    to ``cache.write_counts`` (see DimensionCache.write_summary).
+    """
+    if cache is None:
+        cache = DimensionCache(conn)
+    it = (
+        (row[0], row[1], cache.code_id(row[1], row[2], row[3], row[4],
+                                       row[0]),
+         row[5], row[6], row[5] * row[6])
+        for row in rows
+    )
+    count = 0
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            break
+        # The UPSERT's WHERE skips identical rows, so rowcount is
+        # inserts + real updates; write_summary() splits the two.
+        changed = conn.executemany(INSERT_OCCUPATION_SQL, chunk).rowcount
+        if changed:
+            _invalidate_rollups(conn, {row[:2] for row in chunk})
+        cache.write_counts["changed"] += changed
+        cache.write_counts["unchanged"] += len(chunk) - changed
+        count += len(chunk)
+    conn.commit()
+    return count
+
+
+def compute_complexity_scores(
+    conn: sqlite3.Connection,
+    scope: Iterable[tuple[int, int]] | None = None,
+) -> None:
     """Set complexity_score = min-max normalized GDP per (year, region).
 
     Per-region normalization ensures each treemap view gets full 0-1 color range.
     If all GDPs equal in a region, set 0.5.
+
+    Runs as a single set-based UPDATE joined against per-group MIN/MAX.
+    If *scope* is given, only those (year, region_id) groups are renormalized.
     """
-    rows = conn.execute("""
-        SELECT year, region_id, MIN(gdp), MAX(gdp)
-        FROM occupations
-        GROUP BY year, region_id
-    """).fetchall()
+    group_filter = ""
+    if scope is not None:
+        _create_scope_table(conn, scope)
+        group_filter = "WHERE " + SCOPE_FILTER
 
-    for year, region_id, min_gdp, max_gdp in rows:
-        gdp_range = max_gdp - min_gdp
-        if gdp_range == 0:
-            conn.execute(
-                "UPDATE occupations SET complexity_score = 0.5 "
-                "WHERE year = ? AND region_id = ?",
-                (year, region_id),
-            )
-        else:
-            conn.execute(
-                "UPDATE occupations SET complexity_score = "
-                "ROUND(CAST(gdp - ? AS REAL) / ?, 4) "
-                "WHERE year = ? AND region_id = ?",
-                (min_gdp, gdp_range, year, region_id),
-            )
+    conn.execute(f"""
+        UPDATE occupation_facts AS o
+        SET complexity_score = CASE
+            WHEN g.max_gdp = g.min_gdp THEN 0.5
+            ELSE ROUND(CAST(o.gdp - g.min_gdp AS REAL)
+                       / (g.max_gdp - g.min_gdp), 4)
+        END
+        FROM (
+            SELECT year, region_id, MIN(gdp) AS min_gdp, MAX(gdp) AS max_gdp
+            FROM occupation_facts
+            {group_filter}
+            GROUP BY year, region_id
+        ) AS g
+        WHERE o.year = g.year AND o.region_id = g.region_id
+    """)
+    if scope is not None:
+        conn.execute(f"DELETE FROM synthetic_scopes WHERE {SCOPE_FILTER}")
+        conn.execute("DROP TABLE temp.scope")
+    else:
+        conn.execute("DELETE FROM synthetic_scopes")
     conn.commit()
 
 
+# Matches rows whose (year, region_id) is in the temp.scope table.
+SCOPE_FILTER = "(year, region_id) IN (SELECT year, region_id FROM temp.scope)"
+
+
+def _create_scope_table(conn: sqlite3.Connection,
+                        scope: Iterable[tuple[int, int]]) -> None:
+    """Load (year, region_id) pairs into temp.scope for SCOPE_FILTER."""
+    conn.execute("DROP TABLE IF EXISTS temp.scope")
+    conn.execute(
+        "CREATE TEMP TABLE scope ("
+        "year INTEGER NOT NULL, region_id INTEGER NOT NULL, "
+        "PRIMARY KEY (year, region_id))"
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO scope (year, region_id) VALUES (?, ?)", scope
+    )
+
+
+def _ensure_parent_codes(conn: sqlite3.Connection) -> None:
+    """Add placeholder occupation_codes rows for unpublished parents.
+
+    The title follows the exporters' fallback ("SOC 15-1000"); the major
+    group name is borrowed from a published code in the same group.
+    Repeats until every parent chain is complete.
+    """
+    while rows := conn.execute("""
+        SELECT DISTINCT c.code_system, c.parent_code
+        FROM occupation_codes c
+        LEFT JOIN occupation_codes p
+          ON p.code_system = c.code_system
+         AND p.occupation_code = c.parent_code
+        WHERE c.parent_code IS NOT NULL AND p.id IS NULL
+    """).fetchall():
+        _insert_placeholders(conn, rows)
+
+
+def _insert_placeholders(conn: sqlite3.Connection,
+                         rows: list[tuple[str, str]]) -> None:
+    """Insert placeholder occupation_codes for (code_system, code) rows."""
+    group_names: dict[tuple[str, str], str] = {}
+    known: dict[str, set[str]] = {}
+    for code_system, code, name in conn.execute(
+        "SELECT code_system, occupation_code, major_group_name "
+        "FROM occupation_codes ORDER BY id"
+    ):
+        group_names.setdefault(
+            (code_system, _get_major_group_id(code, code_system)), name
+        )
+        known.setdefault(code_system, set()).add(code)
+    for code_system, parent in rows:
+        known[code_system].add(parent)
+    for code_system, parent in sorted(rows):
+        prefix = "NCO" if code_system == "NCO" else "SOC"
+        mg_name = group_names.get(
+            (code_system, _get_major_group_id(parent, code_system)), ""
+        )
+        conn.execute(
+            "INSERT INTO occupation_codes (code_system, occupation_code, "
+            "occupation_title, major_group_name, level, parent_code, "
+            "is_placeholder) VALUES (?, ?, ?, ?, ?, ?, 1)",
+            (code_system, parent, f"{prefix} {parent}", mg_name,
+             _get_level(parent, code_system),
+             _get_parent(parent, code_system, known[code_system])),
+        )
+
+
+# Roll immediate children (published or already synthesized) up into
+# every unpublished parent at one level.  A_MEAN is GDP / employment
+# rounded half-to-even, as Python's round() does in the exporters.
+SYNTHESIZE_LEVEL_SQL = """
+    INSERT INTO synthetic_occupations
+        (year, region_id, code_id, employment, mean_annual_wage, gdp,
+         complexity_score, child_order)
+    SELECT year, region_id, code_id, emp,
+           CASE WHEN emp > 0 THEN gdp / emp + (
+               CASE WHEN 2 * (gdp % emp) > emp
+                      OR (2 * (gdp % emp) = emp AND (gdp / emp) % 2 = 1)
+                    THEN 1 ELSE 0 END)
+           ELSE 0 END,
+           gdp,
+           CASE WHEN emp > 0 THEN weighted / emp ELSE 0.5 END,
+           child_order
+    FROM (
+        SELECT ch.year, ch.region_id, p.id AS code_id,
+               SUM(ch.employment) AS emp, SUM(ch.gdp) AS gdp,
+               SUM(ROUND(ch.complexity_score, 4) * ch.employment)
+                   AS weighted,
+               MIN(ch.synthetic || c.occupation_code) AS child_order
+        FROM (
+            SELECT year, region_id, code_id, employment, gdp,
+                   complexity_score, '0' AS synthetic
+            FROM occupation_facts
+            UNION ALL
+            SELECT year, region_id, code_id, employment, gdp,
+                   complexity_score, '1' AS synthetic
+            FROM synthetic_occupations
+        ) AS ch
+        JOIN occupation_codes c ON c.id = ch.code_id
+        JOIN occupation_codes p
+          ON p.code_system = c.code_system
+         AND p.occupation_code = c.parent_code
+        WHERE c.level = :level + 1 AND p.level = :level
+          AND c.level <= CASE c.code_system WHEN 'SOC' THEN 4 ELSE 3 END
+          AND NOT EXISTS (
+              SELECT 1 FROM occupation_facts f
+              WHERE f.year = ch.year AND f.region_id = ch.region_id
+                AND f.code_id = p.id
+          )
+          {scope_filter}
+        GROUP BY ch.year, ch.region_id, p.id
+    )
+"""
+
+
+def synthesize_levels(
+    conn: sqlite3.Connection,
+    scope: Iterable[tuple[int, int]] | None = None,
+) -> int:
+    """Materialize missing intermediate levels into synthetic_occupations.
+
+    BLS doesn't publish minor groups (and some broad occupations) for
+    states and metros.  For each (year, region), every parent code at
+    levels 2..max-1 with no published row gets a row summed from its
+    immediate children, bottom-up, so level 2 can build on synthesized
+    level 3.  Run after compute_complexity_scores().
+
+    If *scope* is given, only those (year, region_id) groups are rebuilt.
+    Rebuilt groups are marked fresh in synthetic_scopes until their facts
+    change again.  Returns the number of synthesized rows written.
+    """
+    _ensure_parent_codes(conn)
+    scope_filter = ""
+    if scope is not None:
+        _create_scope_table(conn, scope)
+        conn.execute(f"DELETE FROM synthetic_occupations WHERE {SCOPE_FILTER}")
+        scope_filter = (
+            "AND (ch.year, ch.region_id) IN "
+            "(SELECT year, region_id FROM temp.scope)"
+        )
+    else:
+        conn.execute("DELETE FROM synthetic_occupations")
+
+    total = 0
+    for level in (3, 2):
+        cur = conn.execute(
+            SYNTHESIZE_LEVEL_SQL.format(scope_filter=scope_filter),
+            {"level": level},
+        )
+        total += cur.rowcount
+    if scope is not None:
+        conn.execute(
+            "INSERT OR IGNORE INTO synthetic_scopes (year, region_id) "
+            "SELECT year, region_id FROM temp.scope"
+        )
+        conn.execute("DROP TABLE temp.scope")
+    else:
+        conn.execute("DELETE FROM synthetic_scopes")
+        conn.execute(
+            "INSERT INTO synthetic_scopes (year, region_id) "
+            "SELECT DISTINCT year, region_id FROM occupation_facts"
+        )
+    conn.commit()
+    return total
+
+
 def get_record_count(conn: sqlite3.Connection) -> int:
     """Return total number of occupation records."""
-    return conn.execute("SELECT COUNT(*) FROM occupations").fetchone()[0]
+    return conn.execute("SELECT COUNT(*) FROM occupation_facts").fetchone()[0]
+
+
+def explain_exports(conn: sqlite3.Connection,
+                    country_codes: list[str] | None = None
+                    ) -> dict[str, list[str]]:
+    """Print EXPLAIN QUERY PLAN for each exporter query.
+
+    Returns {query name: [plan detail lines]} so callers and tests can
+    check that no exporter falls back to a full scan of occupation_facts.
+    """
+    from . import export_csv, export_json, export_jsonp, export_split
+
+    queries = {
+        "export_json._query_records": export_json._records_query(country_codes),
+        "export_split._query_all": export_split._all_query(country_codes),
+        "export_jsonp._query_records": export_jsonp._records_query(country_codes),
+        "export_csv._query_all": (export_csv.QUERY_ALL_SQL, []),
+    }
+    plans = {}
+    for name, (sql, params) in queries.items():
+        plans[name] = [
+            row[3] for row in
+            conn.execute("EXPLAIN QUERY PLAN " + sql, params)
+        ]
+        print(f"  {name}:")
+        for detail in plans[name]:
+            print(f"    {detail}")
+    return plans
 
 
 def get_summary(conn: sqlite3.Connection) -> list[dict]:
     """Return summary counts by country and region type."""
     rows = conn.execute("""
         SELECT c.code, c.name, r.region_type, COUNT(o.id) as record_count
-        FROM occupations o
+        FROM occupation_facts o
         JOIN regions r ON o.region_id = r.id
         JOIN countries c ON r.country_id = c.id
         GROUP BY c.code, r.region_type
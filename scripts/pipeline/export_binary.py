@@ -0,0 +1,146 @@
+"""Binary typed-array bundles for the country-year JSON files.
+
+Each JSON file X.json can have a sibling bundle:
+  - X.bin            little-endian column blobs, one row per region-record
+  - X.manifest.json  the JSON file minus regionData, plus a "binary"
+                     section with column offsets/dtypes, the occupation
+                     code dictionary and the (region, year) row slices
+
+Blobs are 8-byte aligned so the frontend can wrap them in zero-copy
+typed-array views of the fetched ArrayBuffer.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from . import config, export_manifest
+
+BUNDLE_VERSION = 1
+
+# (column, regionData key, dtype).  GDP (employment * wage) overflows
+# Int32 and Float32 precision, so it is Float64 and goes first.
+COLUMNS = (
+    ("gdp", "gdp", "<f8"),
+    ("occ", "socCode", "<i4"),
+    ("totEmp", "totEmp", "<i4"),
+    ("aMean", "aMean", "<i4"),
+    ("complexity", "complexity", "<f4"),
+)
+ALIGN = 8
+
+
+def bundle_paths(json_path: Path) -> tuple[Path, Path]:
+    """Return (manifest path, blob path) for a JSON output file."""
+    return (json_path.with_name(f"{json_path.stem}.manifest.json"),
+            json_path.with_suffix(".bin"))
+
+
+def _column(values: list, dtype: str) -> bytes:
+    """Encode one column as little-endian bytes.
+
+    Integer columns must hold whole numbers within the dtype's range.
+    """
+    arr = np.asarray(values)
+    target = np.dtype(dtype)
+    if target.kind == "i" and len(arr):
+        info = np.iinfo(target)
+        if arr.min() < info.min or arr.max() > info.max:
+            raise ValueError(f"Values out of {target.name} range")
+        if arr.dtype.kind == "f" and not np.array_equal(arr, np.round(arr)):
+            raise ValueError(f"Non-integral values for a {target.name} column")
+    return arr.astype(target).tobytes()
+
+
+def write_bundle(data: dict, json_path: Path,
+                 json_style: str = "compact") -> int:
+    """Write the binary bundle for one file's (row-encoded) data.
+
+    Returns the bytes written (blob + manifest).
+    """
+    from .export_json import _occupation_codes, _write_json
+
+    manifest_path, bin_path = bundle_paths(json_path)
+    codes = _occupation_codes(data)
+    occ_index = {code: i for i, code in enumerate(codes)}
+    region_index = {r["regionId"]: i for i, r in enumerate(data["regions"])}
+
+    # Collect column values region by region (regionData may build
+    # each region's rows on demand); no per-row dicts are kept
+    values: dict[str, list] = {name: [] for name, _, _ in COLUMNS}
+    slices = []
+    row_count = 0
+    for rid, year_data in data["regionData"].items():
+        for year_str, entries in year_data.items():
+            slices.append([region_index[rid], int(year_str),
+                           row_count, len(entries)])
+            row_count += len(entries)
+            for name, key, _ in COLUMNS:
+                if name == "occ":
+                    values[name].extend(occ_index[e[key]] for e in entries)
+                else:
+                    values[name].extend(e[key] for e in entries)
+
+    columns = {}
+    offset = 0
+    with export_manifest.replace_if_changed(bin_path, "wb") as f:
+        for name, key, dtype in COLUMNS:
+            blob = _column(values.pop(name), dtype)
+            blob += b"\0" * (-len(blob) % ALIGN)
+            f.write(blob)
+            columns[name] = {"dtype": np.dtype(dtype).name,
+                             "offset": offset, "length": row_count}
+            offset += len(blob)
+
+    manifest = {k: v for k, v in data.items() if k != "regionData"}
+    manifest["binary"] = {
+        "version": BUNDLE_VERSION,
+        "file": bin_path.name,
+        "byteOrder": "little",
+        "byteLength": offset,
+        "rowCount": row_count,
+        "columns": columns,
+        "occupationCodes": codes,
+        "slices": slices,  # [regionIndex, year, startRow, rowCount]
+    }
+    manifest_size, _ = _write_json(manifest, manifest_path, json_style)
+    return offset + manifest_size
+
+
+def read_bundle(manifest_path: Path) -> dict:
+    """Read a bundle back into the row-encoded JSON structure.
+
+    Used for validation and tests: the result compares equal to the
+    data the bundle was written from.
+    """
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    binary = manifest.pop("binary")
+    if binary["version"] != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported bundle version: {binary['version']}")
+    blob = (manifest_path.parent / binary["file"]).read_bytes()
+
+    cols = {}
+    for name, key, dtype in COLUMNS:
+        spec = binary["columns"][name]
+        cols[name] = np.frombuffer(blob, dtype=dtype, count=spec["length"],
+                                   offset=spec["offset"]).tolist()
+
+    codes = binary["occupationCodes"]
+    digits = config.JSON_FLOAT_DIGITS
+    region_data: dict[str, dict[str, list]] = {}
+    for region_idx, year, start, count in binary["slices"]:
+        rid = manifest["regions"][region_idx]["regionId"]
+        region_data.setdefault(rid, {})[str(year)] = [
+            {
+                "socCode": codes[cols["occ"][i]],
+                "totEmp": cols["totEmp"][i],
+                "gdp": cols["gdp"][i],
+                "aMean": cols["aMean"][i],
+                # Float32 keeps ~7 significant digits; JSON stores 4 places
+                "complexity": round(cols["complexity"][i], digits),
+            }
+            for i in range(start, start + count)
+        ]
+    manifest["regionData"] = region_data
+    return manifest
@@ -13,17 +13,20 @@ COLUMNS = [
 ]
 
 
+QUERY_ALL_SQL = """
+    SELECT c.name, o.year, r.region_type, r.name,
+           o.occupation_code, o.occupation_title, o.major_group_name,
+           o.employment, o.mean_annual_wage, o.gdp, o.complexity_score
+    FROM occupations o
+    JOIN regions r ON o.region_id = r.id
+    JOIN countries c ON r.country_id = c.id
+    ORDER BY c.name, r.region_type, r.name, o.occupation_code
+"""
+
+
 def _query_all(conn: sqlite3.Connection) -> list[tuple]:
     """Query all occupation records with joined country/region info."""
-    return conn.execute("""
-        SELECT c.name, o.year, r.region_type, r.name,
-               o.occupation_code, o.occupation_title, o.major_group_name,
-               o.employment, o.mean_annual_wage, o.gdp, o.complexity_score
-        FROM occupations o
-        JOIN regions r ON o.region_id = r.id
-        JOIN countries c ON r.country_id = c.id
-        ORDER BY c.name, r.region_type, r.name, o.occupation_code
-    """).fetchall()
+    return conn.execute(QUERY_ALL_SQL).fetchall()
 
 
 def _write_csv(filepath: Path, rows: list[tuple],
@@ -11,100 +11,22 @@ Country-tagged output structure:
 import json
 import re
 import sqlite3
+from collections import defaultdict
+from collections.abc import Container, Iterable, Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 
-from . import config
+from . import config, export_manifest
+from .db import _object_type
+from .hierarchy import OccupationHierarchy, _soc_level, hierarchy_for
 
 SOC_MAJOR_GROUP_COLORS = config.SOC_MAJOR_GROUP_COLORS
 NCO_MAJOR_GROUP_COLORS = config.NCO_MAJOR_GROUP_COLORS
 
 
-def _soc_level(soc_code: str) -> int:
-    """BLS SOC hierarchy: 4 real levels.
-
-    XX-0000 = 1 (major group)
-    XX-X000 = 2 (minor group)
-    XX-XX00 = 2 (minor group — SOC 2018 renumbered codes)
-    XX-XXX0 = 3 (broad occupation)
-    XX-XXXX = 4 (detailed occupation)
-    """
-    if soc_code.endswith("-0000"):
-        return 1
-    elif soc_code.endswith("00"):  # catches both XX-X000 and XX-XX00
-        return 2
-    elif soc_code.endswith("0"):
-        return 3
-    else:
-        return 4
-
-
-def _soc_parent(soc_code: str, known_codes: set[str] | None = None) -> str | None:
-    """Get parent SOC code for hierarchy traversal.
-
-    For level 3 (XX-XXX0), the parent minor group can be either
-    XX-X000 (standard) or XX-XX00 (SOC 2018 renumbered).  When
-    *known_codes* is provided we check which pattern actually exists;
-    otherwise we default to the standard XX-X000 pattern.
-    """
-    level = _soc_level(soc_code)
-    prefix = soc_code[:3]  # "XX-"
-    if level == 4:
-        return prefix + soc_code[3:6] + "0"   # XX-XXXX → XX-XXX0
-    if level == 3:
-        renumbered = prefix + soc_code[3:5] + "00"   # XX-XX00
-        standard   = prefix + soc_code[3] + "000"    # XX-X000
-        if renumbered == standard:
-            return standard
-        if known_codes is not None:
-            return renumbered if renumbered in known_codes else standard
-        return standard  # safe default
-    if level == 2:
-        return prefix + "0000"                  # XX-X000 → XX-0000
-    return None  # level 1 has no parent
-
-
-def _nco_level(nco_code: str) -> int:
-    """NCO hierarchy: level = number of digits in the code."""
-    return len(nco_code.strip())
-
-
-def _nco_parent(nco_code: str, known_codes: set[str] | None = None) -> str | None:
-    """Get parent NCO code: drop last digit."""
-    code = nco_code.strip()
-    if len(code) <= 1:
-        return None
-    return code[:-1]
-
-
-def _nco_major_group_id(nco_code: str) -> str:
-    """Get the 1-digit division (major group) for any NCO code."""
-    return nco_code[0]
-
-
-def _get_level(occ_code: str, code_system: str) -> int:
-    """Dispatch to SOC or NCO level function."""
-    if code_system == "NCO":
-        return _nco_level(occ_code)
-    return _soc_level(occ_code)
-
-
-def _get_parent(occ_code: str, code_system: str,
-                known_codes: set[str] | None = None) -> str | None:
-    """Dispatch to SOC or NCO parent function."""
-    if code_system == "NCO":
-        return _nco_parent(occ_code, known_codes)
-    return _soc_parent(occ_code, known_codes)
-
-
-def _get_major_group_id(occ_code: str, code_system: str) -> str:
-    """Get the major group ID for an occupation code."""
-    if code_system == "NCO":
-        return _nco_major_group_id(occ_code)
-    # SOC: first two digits (e.g. "11" from "11-1011")
-    return occ_code[:2] if "-" in occ_code else occ_code[:1]
-
-
 def _get_major_group_colors(code_system: str) -> dict[str, str]:
     """Get the color map for a code system."""
     if code_system == "NCO":
@@ -112,8 +34,48 @@ def _get_major_group_colors(code_system: str) -> dict[str, str]:
     return SOC_MAJOR_GROUP_COLORS
 
 
-def _synthesize_missing_levels(records: list[dict],
-                               code_system: str = "SOC") -> list[dict]:
+def _name_lookups(records: list[dict], hierarchy: OccupationHierarchy
+                  ) -> tuple[dict[str, str], dict[str, str]]:
+    """Return first-seen {code: title} and {major group: name} maps."""
+    soc_names: dict[str, str] = {}
+    soc_mg_names: dict[str, str] = {}
+    for r in records:
+        code = r["SOC_Code"]
+        if code not in soc_names:
+            soc_names[code] = r["OCC_TITLE"]
+        mg = hierarchy.major_group(code)
+        if mg not in soc_mg_names:
+            soc_mg_names[mg] = r.get("SOC_Major_Group_Name", "")
+    return soc_names, soc_mg_names
+
+
+def _synthetic_record(year: int, region_type: str, region: str,
+                      code: str, employment: int, a_mean: int, gdp: int,
+                      complexity: float, hierarchy: OccupationHierarchy,
+                      soc_names: dict[str, str],
+                      soc_mg_names: dict[str, str]) -> dict:
+    """Build a record dict for a synthesized parent occupation."""
+    major_group = hierarchy.major_group(code)
+    fallback_prefix = "NCO" if hierarchy.code_system == "NCO" else "SOC"
+    return {
+        "year": year,
+        "Region_Type": region_type,
+        "Region": region,
+        "SOC_Code": code,
+        "OCC_TITLE": soc_names.get(code, f"{fallback_prefix} {code}"),
+        "SOC_Major_Group": major_group,
+        "SOC_Major_Group_Name": soc_mg_names.get(major_group, ""),
+        "TOT_EMP": employment,
+        "A_MEAN": a_mean,
+        "GDP": gdp,
+        "complexity_score": round(complexity, 4),
+    }
+
+
+def _synthesize_missing_levels(
+    records: list[dict], code_system: str = "SOC",
+    regions: Container[tuple[str, str]] | None = None,
+) -> list[dict]:
     """Synthesize missing intermediate SOC levels by aggregating children.
 
     BLS doesn't publish level 2 (minor group) or some level 3 (broad) data
@@ -123,28 +85,27 @@ def _synthesize_missing_levels(records: list[dict],
 
     Occupation names are looked up from other regions (national usually has
     every code).
-    """
-    from collections import defaultdict
 
-    # Build global name + major-group-name lookup
-    soc_names: dict[str, str] = {}
-    soc_mg_names: dict[str, str] = {}
-    for r in records:
-        code = r["SOC_Code"]
-        if code not in soc_names:
-            soc_names[code] = r["OCC_TITLE"]
-        mg = _get_major_group_id(code, code_system)
-        if mg not in soc_mg_names:
-            soc_mg_names[mg] = r.get("SOC_Major_Group_Name", "")
+    If *regions* is given, only those (region_type, region) pairs are
+    synthesized; names still come from every record.
 
-    # Build global set of all codes (national data has the complete hierarchy)
+    db.synthesize_levels() persists the same rollup in SQL; ExportSession
+    reads those rows and only falls back to this function for regions
+    without a fresh rollup.
+    """
+    # Hierarchy over all codes (national data has the complete hierarchy),
+    # plus the unpublished ancestors this function may synthesize
     all_codes = {r["SOC_Code"] for r in records}
+    hierarchy = hierarchy_for(all_codes, code_system, include_ancestors=True)
+    ids, levels, parents = hierarchy.ids, hierarchy.levels, hierarchy.parents
+    soc_names, soc_mg_names = _name_lookups(records, hierarchy)
 
     # Group records by (region_type, region, year)
     by_region_year: dict[tuple, dict[str, dict]] = defaultdict(dict)
     for r in records:
         key = (r["Region_Type"], r["Region"], r["year"])
-        by_region_year[key][r["SOC_Code"]] = r
+        if regions is None or key[:2] in regions:
+            by_region_year[key][r["SOC_Code"]] = r
 
     all_synthetic: list[dict] = []
 
@@ -158,18 +119,18 @@ def _synthesize_missing_levels(records: list[dict],
             missing_parents: dict[str, list[dict]] = defaultdict(list)
 
             for code, rec in list(code_map.items()):
-                if _get_level(code, code_system) == child_level:
-                    parent = _get_parent(code, code_system, all_codes)
-                    if (parent
-                            and _get_level(parent, code_system) == target_level
-                            and parent not in code_map):
-                        missing_parents[parent].append(rec)
+                cid = ids[code]
+                if levels[cid] == child_level:
+                    pid = parents[cid]
+                    if pid >= 0 and levels[pid] == target_level:
+                        parent = hierarchy.codes[pid]
+                        if parent not in code_map:
+                            missing_parents[parent].append(rec)
 
             for parent_code, children in missing_parents.items():
                 total_emp = sum(c["TOT_EMP"] for c in children)
                 total_gdp = sum(c["GDP"] for c in children)
                 a_mean = round(total_gdp / total_emp) if total_emp > 0 else 0
-                major_group = _get_major_group_id(parent_code, code_system)
 
                 if total_emp > 0:
                     complexity = sum(
@@ -179,20 +140,11 @@ def _synthesize_missing_levels(records: list[dict],
                 else:
                     complexity = 0.5
 
-                fallback_prefix = "NCO" if code_system == "NCO" else "SOC"
-                synth = {
-                    "year": year,
-                    "Region_Type": rt,
-                    "Region": region,
-                    "SOC_Code": parent_code,
-                    "OCC_TITLE": soc_names.get(parent_code, f"{fallback_prefix} {parent_code}"),
-                    "SOC_Major_Group": major_group,
-                    "SOC_Major_Group_Name": soc_mg_names.get(major_group, ""),
-                    "TOT_EMP": total_emp,
-                    "A_MEAN": a_mean,
-                    "GDP": total_gdp,
-                    "complexity_score": round(complexity, 4),
-                }
+                synth = _synthetic_record(
+                    year, rt, region, parent_code, total_emp, a_mean,
+                    total_gdp, complexity, hierarchy,
+                    soc_names, soc_mg_names,
+                )
 
                 # Add to code_map so level 2 synthesis can use synthesized level 3
                 code_map[parent_code] = synth
@@ -207,9 +159,10 @@ def _make_region_id(region_type: str, region_name: str) -> str:
     return f"{region_type.lower()}-{slug}"
 
 
-def _query_records(conn: sqlite3.Connection,
-                   country_codes: list[str] | None = None) -> list[dict]:
-    """Query all occupation records from SQLite."""
+def _records_query(country_codes: list[str] | None = None,
+                   year: int | None = None,
+                   years: list[int] | None = None) -> tuple[str, list]:
+    """Return the (sql, params) used by _query_records()."""
     query = """
         SELECT o.year, r.region_type, r.name as region,
                o.occupation_code, o.occupation_title, o.major_group_name,
@@ -220,14 +173,42 @@ def _query_records(conn: sqlite3.Connection,
         JOIN countries c ON r.country_id = c.id
     """
     params: list = []
+    where = []
     if country_codes:
         placeholders = ",".join("?" * len(country_codes))
-        query += f" WHERE c.code IN ({placeholders})"
+        where.append(f"c.code IN ({placeholders})")
         params = list(country_codes)
-    query += " ORDER BY r.region_type, r.name, o.occupation_code"
+    if year is not None:
+        where.append("o.year = ?")
+        params.append(year)
+    if years is not None:
+        where.append(f"o.year IN ({','.join('?' * len(years))})")
+        params.extend(years)
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    # Year-major for year lists, so the rows can be split in one pass
+    order = "o.year, " if years is not None else ""
+    query += f" ORDER BY {order}r.region_type, r.name, o.occupation_code"
+    return query, params
+
 
-    records = []
-    for row in conn.execute(query, params).fetchall():
+def _query_records(conn: sqlite3.Connection,
+                   country_codes: list[str] | None = None,
+                   year: int | None = None) -> list[dict]:
+    """Query all occupation records from SQLite (optionally one year)."""
+    return list(_iter_records(conn, country_codes, year))
+
+
+def _iter_records(conn: sqlite3.Connection,
+                  country_codes: list[str] | None = None,
+                  year: int | None = None,
+                  years: list[int] | None = None) -> Iterator[dict]:
+    """Stream the records of _query_records() from the cursor.
+
+    With *years* they arrive grouped by year, ascending.
+    """
+    query, params = _records_query(country_codes, year, years)
+    for row in conn.execute(query, params):
         (year, region_type, region, occ_code, occ_title, major_group,
          employment, wage, gdp, complexity, code_system) = row
         # SOC uses XX-XXXX format with dash; NCO uses plain digits
@@ -235,7 +216,7 @@ def _query_records(conn: sqlite3.Connection,
             soc_group = occ_code[:2]
         else:
             soc_group = occ_code[0]  # NCO: 1-digit division
-        records.append({
+        yield {
             "year": year,
             "Region_Type": region_type,
             "Region": region,
@@ -247,8 +228,70 @@ def _query_records(conn: sqlite3.Connection,
             "A_MEAN": wage,
             "GDP": gdp,
             "complexity_score": round(complexity, 4),
-        })
-    return records
+        }
+
+
+def _query_synthetic(conn: sqlite3.Connection, country_code: str,
+                     year: int) -> tuple[set[tuple[str, str]], list[tuple]]:
+    """Query persisted synthetic rows for a country-year, in export order.
+
+    Returns (regions, rows): the (region_type, region) pairs whose rollup
+    is fresh, and the synthetic rows of those regions.
+    """
+    return _query_synthetic_by_year(conn, country_code, [year]).get(
+        year, (set(), [])
+    )
+
+
+def _query_synthetic_by_year(
+    conn: sqlite3.Connection, country_code: str, years: list[int],
+) -> dict[int, tuple[set[tuple[str, str]], list[tuple]]]:
+    """Query persisted synthetic rows for several years of a country at once.
+
+    Returns {year: (regions, rows)} as _query_synthetic does.  Only
+    regions listed in synthetic_scopes count: facts written since their
+    last synthesize_levels() run drop them from it.  A database from
+    before that table existed has no fresh regions, so ExportSession
+    synthesizes in Python (export-only runs never create the schema).
+    """
+    placeholders = ",".join("?" * len(years))
+    by_year: dict[int, tuple[set, list]] = defaultdict(lambda: (set(), []))
+    if _object_type(conn, "synthetic_scopes") is None:
+        return by_year
+    for year, region_type, region in conn.execute(f"""
+        SELECT f.year, r.region_type, r.name
+        FROM synthetic_scopes f
+        JOIN regions r ON f.region_id = r.id
+        JOIN countries c ON r.country_id = c.id
+        WHERE c.code = ? AND f.year IN ({placeholders})
+    """, [country_code, *years]):
+        by_year[year][0].add((region_type, region))
+    for year, *row in conn.execute(f"""
+        SELECT s.year, r.region_type, r.name, oc.occupation_code,
+               s.employment, s.mean_annual_wage, s.gdp, s.complexity_score
+        FROM synthetic_occupations s
+        JOIN synthetic_scopes f
+          ON f.year = s.year AND f.region_id = s.region_id
+        JOIN occupation_codes oc ON oc.id = s.code_id
+        JOIN regions r ON s.region_id = r.id
+        JOIN countries c ON r.country_id = c.id
+        WHERE c.code = ? AND s.year IN ({placeholders})
+        ORDER BY r.region_type, r.name, oc.level DESC, s.child_order
+    """, [country_code, *years]):
+        by_year[year][1].append(tuple(row))
+    return by_year
+
+
+def available_years(conn: sqlite3.Connection, country_code: str) -> list[int]:
+    """Years with occupation records for a country, ascending."""
+    return [row[0] for row in conn.execute("""
+        SELECT DISTINCT o.year
+        FROM occupations o
+        JOIN regions r ON o.region_id = r.id
+        JOIN countries c ON r.country_id = c.id
+        WHERE c.code = ?
+        ORDER BY o.year
+    """, (country_code,))]
 
 
 def _detect_code_system(conn: sqlite3.Connection,
@@ -261,34 +304,292 @@ def _detect_code_system(conn: sqlite3.Connection,
     return row[0] if row else "SOC"
 
 
+def _aggregate_stats(by_occupation: dict, wages: list, complexities: list) -> dict:
+    """Wrap per-occupation aggregates with the year's min/max/median stats."""
+    mid = len(wages) // 2
+    return {
+        "byOccupation": by_occupation,
+        "minMaxStats": {
+            "minWage": min(wages) if wages else 0,
+            "maxWage": max(wages) if wages else 0,
+            "medianWage": sorted(wages)[mid] if wages else 0,
+            "minComplexity": min(complexities) if complexities else 0,
+            "maxComplexity": max(complexities) if complexities else 1,
+            "medianComplexity": (sorted(complexities)[mid]
+                                 if complexities else 0.5),
+        },
+    }
+
+
+def _build_aggregates_python(records: list[dict],
+                             years: Iterable[int]) -> dict[str, dict]:
+    """Pure-Python fallback for _build_aggregates()."""
+    by_year: dict[int, list[dict]] = defaultdict(list)
+    for r in records:
+        by_year[r["year"]].append(r)
+
+    aggregates: dict[str, dict] = {}
+    for year in sorted(years):
+        occ_data: dict[str, dict] = {}
+        all_wages: list[int] = []
+        all_complexity: list[float] = []
+
+        for r in by_year[year]:
+            soc = r["SOC_Code"]
+            if soc not in occ_data:
+                occ_data[soc] = {"totalEmploy": 0, "wages": [],
+                                 "complexities": []}
+            occ_data[soc]["totalEmploy"] += r["TOT_EMP"]
+            occ_data[soc]["wages"].append(r["A_MEAN"])
+            occ_data[soc]["complexities"].append(r.get("complexity_score", 0.5))
+            all_wages.append(r["A_MEAN"])
+            all_complexity.append(r.get("complexity_score", 0.5))
+
+        by_occupation = {}
+        for soc, d in occ_data.items():
+            by_occupation[soc] = {
+                "totalEmploy": d["totalEmploy"],
+                "avgWage": sum(d["wages"]) / len(d["wages"]),
+                "avgComplexity": sum(d["complexities"]) / len(d["complexities"]),
+            }
+        aggregates[str(year)] = _aggregate_stats(by_occupation, all_wages,
+                                                 all_complexity)
+    return aggregates
+
+
+def _build_aggregates(records: list[dict],
+                      years: Iterable[int]) -> dict[str, dict]:
+    """Build the per-year aggregates block of a BLS JSON file.
+
+    Records are converted to columnar arrays once and grouped by
+    (year, occupation) with NumPy.  bincount accumulates in record
+    order, like the sequential sums of the pure-Python path, and the
+    upper median comes from np.partition, so the output is identical.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return _build_aggregates_python(records, years)
+
+    if not records:
+        return {}
+
+    code_ids: dict[str, int] = {}
+    codes = np.fromiter(
+        (code_ids.setdefault(r["SOC_Code"], len(code_ids)) for r in records),
+        dtype=np.int64, count=len(records),
+    )
+    code_names = list(code_ids)
+    year_col = np.fromiter((r["year"] for r in records), dtype=np.int64,
+                           count=len(records))
+    emp_col = np.array([r["TOT_EMP"] for r in records])
+    wage_col = np.array([r["A_MEAN"] for r in records])
+    cx_col = np.array([r.get("complexity_score", 0.5) for r in records],
+                      dtype=np.float64)
+
+    aggregates: dict[str, dict] = {}
+    for year in sorted(years):
+        rows = np.flatnonzero(year_col == year)
+        uniq, first, group = np.unique(codes[rows], return_index=True,
+                                       return_inverse=True)
+        counts = np.bincount(group)
+        emp = np.bincount(group, weights=emp_col[rows])
+        wages = np.bincount(group, weights=wage_col[rows])
+        cx = np.bincount(group, weights=cx_col[rows])
+
+        # byOccupation keeps first-appearance order
+        by_occupation = {}
+        for g in np.argsort(first, kind="stable").tolist():
+            n = int(counts[g])
+            by_occupation[code_names[uniq[g]]] = {
+                "totalEmploy": int(emp[g]),
+                "avgWage": int(wages[g]) / n,
+                "avgComplexity": float(cx[g]) / n,
+            }
+
+        year_wages = wage_col[rows]
+        year_cx = cx_col[rows]
+        mid = len(rows) // 2
+        aggregates[str(year)] = {
+            "byOccupation": by_occupation,
+            "minMaxStats": {
+                "minWage": year_wages.min().item(),
+                "maxWage": year_wages.max().item(),
+                "medianWage": np.partition(year_wages, mid)[mid].item(),
+                "minComplexity": year_cx.min().item(),
+                "maxComplexity": year_cx.max().item(),
+                "medianComplexity": np.partition(year_cx, mid)[mid].item(),
+            },
+        }
+    return aggregates
+
+
+def _region_rows(records: list[dict]) -> dict[str, list[dict]]:
+    """Build one region's {year: [row, ...]} regionData entry."""
+    year_data: dict[str, list[dict]] = {}
+    for record in records:
+        year_data.setdefault(str(record["year"]), []).append({
+            "socCode": record["SOC_Code"],
+            "totEmp": record["TOT_EMP"],
+            "gdp": record["GDP"],
+            "aMean": record["A_MEAN"],
+            "complexity": record.get("complexity_score", 0.5),
+        })
+    return year_data
+
+
+class _RegionData(Mapping):
+    """regionData that builds each region's entry when it is read.
+
+    Only references to the grouped records are held, so _write_json and
+    the bundle/shard writers handle one region's rows at a time instead
+    of the whole file's.  map() chains a per-region re-encoding.
+    """
+
+    def __init__(self, groups: dict[str, list[dict]],
+                 encoders: tuple = ()):
+        self._groups = groups
+        self._encoders = encoders
+
+    def __getitem__(self, rid: str) -> dict:
+        year_data = _region_rows(self._groups[rid])
+        for encode in self._encoders:
+            year_data = encode(year_data)
+        return year_data
+
+    def __iter__(self):
+        return iter(self._groups)
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def record_count(self) -> int:
+        """Number of region-records, without building any rows."""
+        return sum(len(group) for group in self._groups.values())
+
+    def map(self, encode) -> "_RegionData":
+        """Return a view that applies encode() to each region's entry."""
+        return _RegionData(self._groups, self._encoders + (encode,))
+
+
+def _collect_occupations(records: Iterable[dict]
+                         ) -> tuple[dict[str, dict], dict[str, str]]:
+    """First-seen title and major group per code, and major group names."""
+    occupations_set: dict[str, dict] = {}
+    major_groups_set: dict[str, str] = {}
+    for record in records:
+        soc = record["SOC_Code"]
+        if soc not in occupations_set:
+            occupations_set[soc] = {
+                "name": record["OCC_TITLE"],
+                "majorGroupId": record["SOC_Major_Group"],
+                "majorGroupName": record["SOC_Major_Group_Name"],
+            }
+
+        mg = record["SOC_Major_Group"]
+        if mg and mg not in major_groups_set:
+            major_groups_set[mg] = record["SOC_Major_Group_Name"]
+    return occupations_set, major_groups_set
+
+
+def _collect_exported_occupations(records: Iterable[dict], code_system: str
+                                  ) -> tuple[dict[str, dict], dict[str, str]]:
+    """_collect_occupations() plus the unpublished ancestors ExportSession
+    synthesizes for them, titled as _synthetic_record() titles them.
+
+    Lets one pass over the raw records cover every code the exported
+    files use, without synthesizing the rollups themselves.
+    """
+    occupations_set, major_groups_set = _collect_occupations(records)
+    hierarchy = hierarchy_for(occupations_set, code_system,
+                              include_ancestors=True)
+    max_level = 4 if code_system == "SOC" else 3
+    prefix = "NCO" if code_system == "NCO" else "SOC"
+    for code in list(occupations_set):
+        cid = hierarchy.ids[code]
+        if hierarchy.levels[cid] > max_level:
+            continue
+        # Levels 2..max-1 are synthesized wherever they are missing
+        pid = hierarchy.parents[cid]
+        while pid >= 0 and hierarchy.levels[pid] >= 2:
+            parent = hierarchy.codes[pid]
+            if parent in occupations_set:
+                break
+            major_group = hierarchy.major_group(parent)
+            occupations_set[parent] = {
+                "name": f"{prefix} {parent}",
+                "majorGroupId": major_group,
+                "majorGroupName": major_groups_set.get(major_group, ""),
+            }
+            pid = hierarchy.parents[pid]
+    return occupations_set, major_groups_set
+
+
+def _occupation_tables(occupations_set: dict[str, dict],
+                       major_groups_set: dict[str, str],
+                       code_system: str) -> tuple[dict[str, dict], list[dict]]:
+    """Build the occupation map (sorted by code) and major groups array.
+
+    Levels and parents are resolved within the given codes.
+    """
+    occ_hierarchy = hierarchy_for(occupations_set.keys(), code_system)
+    occupation_map: dict[str, dict] = {}
+    for soc_code in sorted(occupations_set.keys()):
+        occ = occupations_set[soc_code]
+        occupation_map[soc_code] = {
+            "name": occ["name"],
+            "level": occ_hierarchy.level(soc_code),
+            "parentCode": occ_hierarchy.parent(soc_code),
+            "majorGroupId": occ["majorGroupId"],
+            "majorGroupName": occ["majorGroupName"],
+        }
+
+    color_map = _get_major_group_colors(code_system)
+    major_groups = [
+        {
+            "groupId": gid,
+            "name": major_groups_set[gid],
+            "color": color_map.get(gid, "#999999"),
+        }
+        for gid in sorted(major_groups_set.keys())
+    ]
+    return occupation_map, major_groups
+
+
 def _build_static_data(records: list[dict],
                        max_level: int | None = None,
                        exact_level: int | None = None,
                        code_system: str = "SOC",
-                       slim_occupations: bool = False) -> dict:
+                       slim_occupations: bool = False,
+                       synthesize: bool = True) -> dict:
     """Build the static data structure for a BLS JSON file.
 
     If max_level is set, only include occupations at levels <= max_level.
     If exact_level is set, only include occupations at exactly that level.
+    Pass synthesize=False when *records* already include synthesized
+    levels (e.g. a slice of an ExportSession).
     """
     # Synthesize missing intermediate levels before filtering.
-    synthetic = _synthesize_missing_levels(records, code_system)
-    if synthetic:
-        records = records + synthetic
-
+    if synthesize:
+        synthetic = _synthesize_missing_levels(records, code_system)
+        if synthetic:
+            records = records + synthetic
+
+    if exact_level is not None or max_level is not None:
+        hierarchy = hierarchy_for({r["SOC_Code"] for r in records},
+                                  code_system)
+        ids, levels = hierarchy.ids, hierarchy.levels
     if exact_level is not None:
         filtered = [r for r in records
-                    if _get_level(r["SOC_Code"], code_system) == exact_level]
+                    if levels[ids[r["SOC_Code"]]] == exact_level]
     elif max_level is not None:
         filtered = [r for r in records
-                    if _get_level(r["SOC_Code"], code_system) <= max_level]
+                    if levels[ids[r["SOC_Code"]]] <= max_level]
     else:
         filtered = records
 
     # Collect unique values
     regions_set: dict[tuple, str] = {}
-    occupations_set: dict[str, dict] = {}
-    major_groups_set: dict[str, str] = {}
     years: set[int] = set()
 
     for record in filtered:
@@ -297,20 +598,8 @@ def _build_static_data(records: list[dict],
         key = (rt, rn)
         if key not in regions_set:
             regions_set[key] = _make_region_id(rt, rn)
-
-        soc = record["SOC_Code"]
-        if soc not in occupations_set:
-            occupations_set[soc] = {
-                "name": record["OCC_TITLE"],
-                "majorGroupId": record["SOC_Major_Group"],
-                "majorGroupName": record["SOC_Major_Group_Name"],
-            }
-
-        mg = record["SOC_Major_Group"]
-        if mg and mg not in major_groups_set:
-            major_groups_set[mg] = record["SOC_Major_Group_Name"]
-
         years.add(record["year"])
+    occupations_set, major_groups_set = _collect_occupations(filtered)
 
     # Build regions array
     regions = []
@@ -321,108 +610,24 @@ def _build_static_data(records: list[dict],
             "regionType": rt,
         })
 
-    # Build occupations array
-    all_soc_codes = set(occupations_set.keys())
-    color_map = _get_major_group_colors(code_system)
+    # Build occupations array (parents resolved within this file's codes)
+    occupation_map, major_groups = _occupation_tables(
+        occupations_set, major_groups_set, code_system
+    )
     occupations = []
-    occupation_map: dict[str, dict] = {}
-    for soc_code in sorted(occupations_set.keys()):
-        occ = occupations_set[soc_code]
-        occ_record = {
-            "socCode": soc_code,
-            "name": occ["name"],
-            "level": _get_level(soc_code, code_system),
-            "parentCode": _get_parent(soc_code, code_system, all_soc_codes),
-            "majorGroupId": occ["majorGroupId"],
-            "majorGroupName": occ["majorGroupName"],
-        }
-        occupation_map[soc_code] = {
-            "name": occ_record["name"],
-            "level": occ_record["level"],
-            "parentCode": occ_record["parentCode"],
-            "majorGroupId": occ_record["majorGroupId"],
-            "majorGroupName": occ_record["majorGroupName"],
-        }
-        if not slim_occupations:
-            occupations.append(occ_record)
-
-    # Build major groups array
-    major_groups = []
-    for gid in sorted(major_groups_set.keys()):
-        color = color_map.get(gid, "#999999")
-        major_groups.append({
-            "groupId": gid,
-            "name": major_groups_set[gid],
-            "color": color,
-        })
+    if not slim_occupations:
+        occupations = [{"socCode": soc_code, **occ}
+                       for soc_code, occ in occupation_map.items()]
 
-    # Build regionData
-    region_data: dict[str, dict[str, list]] = {}
+    # Build regionData lazily: group the records by region (first
+    # appearance order); rows are created per region as it is written
+    region_groups: dict[str, list[dict]] = {}
     for record in filtered:
         rid = regions_set[(record["Region_Type"], record["Region"])]
-        year_str = str(record["year"])
-
-        if rid not in region_data:
-            region_data[rid] = {}
-        if year_str not in region_data[rid]:
-            region_data[rid][year_str] = []
-
-        region_data[rid][year_str].append({
-            "socCode": record["SOC_Code"],
-            "totEmp": record["TOT_EMP"],
-            "gdp": record["GDP"],
-            "aMean": record["A_MEAN"],
-            "complexity": record.get("complexity_score", 0.5),
-        })
-
-    # Build aggregates
-    aggregates: dict[str, dict] = {}
-    for year in sorted(years):
-        year_str = str(year)
-        year_records = [r for r in filtered if r["year"] == year]
+        region_groups.setdefault(rid, []).append(record)
+    region_data = _RegionData(region_groups)
 
-        occ_data: dict[str, dict] = {}
-        all_wages: list[int] = []
-        all_complexity: list[float] = []
-
-        for r in year_records:
-            soc = r["SOC_Code"]
-            if soc not in occ_data:
-                occ_data[soc] = {"totalEmploy": 0, "totalGdp": 0,
-                                 "wages": [], "complexities": []}
-            occ_data[soc]["totalEmploy"] += r["TOT_EMP"]
-            occ_data[soc]["totalGdp"] += r["GDP"]
-            occ_data[soc]["wages"].append(r["A_MEAN"])
-            occ_data[soc]["complexities"].append(r.get("complexity_score", 0.5))
-            all_wages.append(r["A_MEAN"])
-            all_complexity.append(r.get("complexity_score", 0.5))
-
-        by_occupation = {}
-        for soc, d in occ_data.items():
-            by_occupation[soc] = {
-                "totalEmploy": d["totalEmploy"],
-                "avgWage": (sum(d["wages"]) / len(d["wages"])
-                            if d["wages"] else 0),
-                "avgComplexity": (sum(d["complexities"]) / len(d["complexities"])
-                                  if d["complexities"] else 0),
-            }
-
-        all_wages_sorted = sorted(all_wages)
-        all_complexity_sorted = sorted(all_complexity)
-        mid = len(all_wages_sorted) // 2
-
-        aggregates[year_str] = {
-            "byOccupation": by_occupation,
-            "minMaxStats": {
-                "minWage": min(all_wages) if all_wages else 0,
-                "maxWage": max(all_wages) if all_wages else 0,
-                "medianWage": all_wages_sorted[mid] if all_wages_sorted else 0,
-                "minComplexity": min(all_complexity) if all_complexity else 0,
-                "maxComplexity": max(all_complexity) if all_complexity else 1,
-                "medianComplexity": (all_complexity_sorted[mid]
-                                     if all_complexity_sorted else 0.5),
-            },
-        }
+    aggregates = _build_aggregates(filtered, years)
 
     # Source attribution based on code system
     if code_system == "NCO":
@@ -430,8 +635,9 @@ def _build_static_data(records: list[dict],
     else:
         source = "BLS OES + O*NET"
 
+    # No lastUpdated: the date would change every file's hash daily; it
+    # lives in the catalog (export_meta)
     metadata = {
-        "lastUpdated": date.today().isoformat(),
         "years": sorted(years),
         "source": source,
     }
@@ -455,42 +661,469 @@ def _build_static_data(records: list[dict],
     return output
 
 
-def _write_json(data: dict, path: Path) -> int:
-    """Write data as JSON and return file size."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-    return path.stat().st_size
+def _occupation_dictionary(records: Iterable[dict], code_system: str,
+                           short: str, previous: dict | None = None) -> dict:
+    """Build a country's shared occupation dictionary.
+
+    *records* are the raw query rows; the levels ExportSession would
+    synthesize for them are included (_collect_exported_occupations).
+    Codes map to the same entries as metadata.occupationMap, with
+    parents resolved over every code.  Entries of the *previous*
+    dictionary (e.g. other years) are kept, so it only grows.
+    """
+    occupation_map, major_groups = _occupation_tables(
+        *_collect_exported_occupations(records, code_system), code_system
+    )
+    previous = previous or {}
+    occupations = {**previous.get("occupations", {}), **occupation_map}
+    groups = {g["groupId"]: g for g in previous.get("majorGroups", [])}
+    groups.update((g["groupId"], g) for g in major_groups)
+    return {
+        "metadata": {
+            "country": short,
+            "classificationSystem": code_system,
+            "version": config.CODE_SYSTEM_VERSIONS.get(code_system,
+                                                       code_system.lower()),
+        },
+        "occupations": dict(sorted(occupations.items())),
+        "majorGroups": [groups[gid] for gid in sorted(groups)],
+    }
+
+
+def _previous_dictionary(short: str) -> dict:
+    """The occupation dictionary bls-data.json names for *short*, if any."""
+    meta_path = config.json_meta_path()
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        name = next(d["occupationDictionary"] for d in meta["datasets"]
+                    if d.get("country") == short
+                    and d.get("occupationDictionary"))
+        return json.loads((meta_path.parent / name).read_text(encoding="utf-8"))
+    except (OSError, ValueError, KeyError, StopIteration):
+        return {}
+
+
+def _use_occupation_dictionary(data: dict, name: str) -> dict:
+    """Swap a file's occupation tables for a reference to dictionary *name*.
+
+    occupations (or metadata.occupationMap) becomes occupationCodes, the
+    sorted code list, and majorGroups is dropped; key order is kept.
+    """
+    codes = _occupation_codes(data)
+    output = {}
+    for key, value in data.items():
+        if key == "occupations":
+            output["occupationCodes"] = codes
+        elif key != "majorGroups":
+            output[key] = value
+    metadata = output["metadata"] = dict(data["metadata"])
+    metadata.pop("occupationMap", None)
+    metadata["occupationDictionary"] = name
+    return output
+
+
+class ExportSession:
+    """One country-year snapshot shared by every JSON file written for it.
+
+    The records are queried once, together with the missing levels
+    persisted by db.synthesize_levels() (synthesized in Python for
+    regions that stage has not rolled up since their facts changed); an
+    index by (level, region type) then lets each output file take its
+    slice without touching SQLite again.
+    for_years() builds the sessions of several years from one query each.
+
+    A session holds every record of its year, so export memory still
+    grows with the number of regions; only the JSON text is written
+    region by region (_stream_object).
+    """
+
+    def __init__(self, conn: sqlite3.Connection, country_code: str,
+                 year: int, records: list[dict] | None = None,
+                 synthetic: tuple[set[tuple[str, str]], list[tuple]]
+                 | None = None):
+        self.country_code = country_code
+        self.year = year
+        self.short = config.country_short(country_code)
+        self.code_system = _detect_code_system(conn, country_code)
+        if records is None:
+            records = _query_records(conn, [country_code], year)
+        if synthetic is None:
+            synthetic = _query_synthetic(conn, country_code, year)
+        fresh, rows = synthetic
+        self.hierarchy = hierarchy_for(
+            {r["SOC_Code"] for r in records} | {row[2] for row in rows},
+            self.code_system,
+        )
+        ids, levels = self.hierarchy.ids, self.hierarchy.levels
+        self.levels_available = sorted(
+            {levels[ids[r["SOC_Code"]]] for r in records}
+        )
+        synthesized = []
+        if rows:
+            soc_names, soc_mg_names = _name_lookups(records, self.hierarchy)
+            synthesized = [
+                _synthetic_record(year, rt, region, code, emp, wage, gdp,
+                                  complexity, self.hierarchy,
+                                  soc_names, soc_mg_names)
+                for rt, region, code, emp, wage, gdp, complexity in rows
+            ]
+        # Regions whose rollup is missing or older than their facts
+        order = {key: i for i, key in enumerate(dict.fromkeys(
+            (r["Region_Type"], r["Region"]) for r in records
+        ))}
+        stale = order.keys() - fresh
+        if stale:
+            synthesized += _synthesize_missing_levels(
+                records, self.code_system, stale
+            )
+            if rows:
+                synthesized.sort(
+                    key=lambda r: order[(r["Region_Type"], r["Region"])]
+                )
+            self.hierarchy = hierarchy_for(
+                {r["SOC_Code"] for r in records}
+                | {r["SOC_Code"] for r in synthesized},
+                self.code_system,
+            )
+            ids, levels = self.hierarchy.ids, self.hierarchy.levels
+        self.records = records + synthesized
+        self._index: dict[tuple[int, str], list[int]] = defaultdict(list)
+        for i, r in enumerate(self.records):
+            level = levels[ids[r["SOC_Code"]]]
+            self._index[(level, r["Region_Type"])].append(i)
+
+    @classmethod
+    def for_years(cls, conn: sqlite3.Connection, country_code: str,
+                  years: Iterable[int]) -> Iterator["ExportSession"]:
+        """Yield the sessions of *years* (ascending).
+
+        The records come from one query and one synthetic query, split
+        by year in a single pass, instead of one pair per year.  The
+        records query is read year by year as the sessions are reached,
+        so only one year is held and synthesized at a time.
+        """
+        years = sorted(set(years))
+        synthetic = _query_synthetic_by_year(conn, country_code, years)
+        groups = groupby(_iter_records(conn, [country_code], years=years),
+                         key=itemgetter("year"))
+        group = next(groups, None)
+        for year in years:
+            records = []
+            if group is not None and group[0] == year:
+                records = list(group[1])
+                group = next(groups, None)
+            yield cls(conn, country_code, year, records,
+                      synthetic.pop(year, (set(), [])))
+
+    def select(self, levels: Iterable[int],
+               region_types: list[str] | None = None) -> list[dict]:
+        """Return records at *levels* (and *region_types*), in query order."""
+        levels = set(levels)
+        positions = sorted(
+            i
+            for (level, region_type), ids in self._index.items()
+            if level in levels
+            and (region_types is None or region_type in region_types)
+            for i in ids
+        )
+        return [self.records[i] for i in positions]
+
+
+def _occupation_codes(data: dict) -> list[str]:
+    """The file's sorted occupation codes.
+
+    From occupationCodes (shared dictionary), occupations, or
+    metadata.occupationMap when the payload is slim.
+    """
+    if "occupationCodes" in data:
+        return data["occupationCodes"]
+    return ([occ["socCode"] for occ in data["occupations"]]
+            or list(data["metadata"].get("occupationMap", {})))
+
+
+def _to_columns(data: dict, complexity_scale: int | None = None) -> dict:
+    """Re-encode data["regionData"] as parallel arrays (in place).
+
+    Each region-year becomes {"occ": [...], "totEmp": [...], "gdp": [...],
+    "aMean": [...], "complexity": [...]}, where occ indexes the file's
+    sorted occupation codes (_occupation_codes).
+    With complexity_scale, complexity is stored as round(c * scale).
+    """
+    metadata = data["metadata"]
+    codes = _occupation_codes(data)
+    index = {code: i for i, code in enumerate(codes)}
+
+    def encode(year_data: dict) -> dict:
+        columns = {}
+        for year_str, entries in year_data.items():
+            complexity = [e["complexity"] for e in entries]
+            if complexity_scale:
+                complexity = [round(c * complexity_scale) for c in complexity]
+            columns[year_str] = {
+                "occ": [index[e["socCode"]] for e in entries],
+                "totEmp": [e["totEmp"] for e in entries],
+                "gdp": [e["gdp"] for e in entries],
+                "aMean": [e["aMean"] for e in entries],
+                "complexity": complexity,
+            }
+        return columns
+
+    region_data = data["regionData"]
+    if isinstance(region_data, _RegionData):
+        data["regionData"] = region_data.map(encode)
+    else:
+        for rid, year_data in region_data.items():
+            region_data[rid] = encode(year_data)
+
+    metadata["regionDataEncoding"] = "columns"
+    if complexity_scale:
+        metadata["complexityScale"] = complexity_scale
+    return data
+
+
+def _from_columns(data: dict) -> dict:
+    """Inverse of _to_columns(): expand regionData back into rows (in place)."""
+    metadata = data["metadata"]
+    codes = _occupation_codes(data)
+    scale = metadata.pop("complexityScale", None)
+
+    for year_data in data["regionData"].values():
+        for year_str, cols in year_data.items():
+            year_data[year_str] = [
+                {"socCode": codes[i], "totEmp": emp, "gdp": gdp,
+                 "aMean": wage, "complexity": c / scale if scale else c}
+                for i, emp, gdp, wage, c in zip(
+                    cols["occ"], cols["totEmp"], cols["gdp"],
+                    cols["aMean"], cols["complexity"])
+            ]
+
+    metadata["regionDataEncoding"] = "rows"
+    return data
+
+
+def _write_bundle(data: dict, json_path: Path, json_style: str) -> str:
+    """Write the binary bundle next to a JSON file. Returns a log line."""
+    from .export_binary import bundle_paths, write_bundle
+
+    size = write_bundle(data, json_path, json_style)
+    manifest_path, bin_path = bundle_paths(json_path)
+    return f"  {bin_path.name} + {manifest_path.name}: {size:,} bytes"
+
+
+def _write_shards(data: dict, json_path: Path, json_style: str) -> str:
+    """Write *data* as an index plus one shard per region. Returns a log line.
+
+    Shards go in a directory named after the JSON file (X.json -> X/):
+    X/index.json holds everything but regionData, plus metadata.shards
+    mapping regionId -> shard filename; X/<regionId>.json holds that
+    region's regionData.  Shards left over from earlier runs are removed.
+    """
+    shard_dir = json_path.with_suffix("")
+    index = {k: v for k, v in data.items() if k != "regionData"}
+    index["metadata"] = dict(data["metadata"],
+                             shards={rid: f"{rid}.json"
+                                     for rid in data["regionData"]})
+
+    total, _ = _write_json(index, shard_dir / "index.json", json_style)
+    for rid, year_data in data["regionData"].items():
+        size, _ = _write_json({"regionId": rid, "regionData": year_data},
+                              shard_dir / f"{rid}.json", json_style)
+        total += size
+
+    keep = {"index.json"} | set(index["metadata"]["shards"].values())
+    for stale in shard_dir.glob("*.json"):
+        if stale.name not in keep:
+            stale.unlink()
+    return (f"  {shard_dir.name}/: index + {len(data['regionData'])} "
+            f"region shards ({total:,} bytes)")
+
+
+def _round_floats(obj, digits: int):
+    """Return a copy of a JSON-able structure with floats rounded."""
+    if isinstance(obj, float):
+        return round(obj, digits)
+    if isinstance(obj, dict):
+        return {k: _round_floats(v, digits) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_round_floats(v, digits) for v in obj]
+    return obj
+
+
+def _indent_overhead(obj, depth: int = 0) -> int:
+    """Bytes of newlines and indentation that indent=2 adds to *obj*."""
+    if not isinstance(obj, (dict, list)) or not obj:
+        return 0
+    values = obj.values() if isinstance(obj, dict) else obj
+    # Each item gets "\n" + indent; the closing bracket gets one more
+    return (len(obj) * (1 + 2 * (depth + 1)) + 1 + 2 * depth
+            + sum(_indent_overhead(v, depth + 1) for v in values))
+
+
+def _stream_object(write, items: Iterable[tuple[str, object]], depth: int,
+                   pretty: bool, measure: bool = False) -> int:
+    """Write a JSON object one member at a time.
+
+    Members of the top-level object that are mappings (regionData,
+    aggregates, ...) are streamed one entry further down, so only one
+    region's rows are encoded at once.  The bytes match json.dump with
+    indent=2 (pretty) or the compact separators.
+
+    With measure=True (compact only), returns the size the indent=2
+    layout would have; that encodes every member a second time.
+    """
+    inner = "\n" + "  " * (depth + 1)
+    size = 2  # braces
+    count = 0
+    write("{")
+    for key, value in items:
+        key_text = json.dumps(key)
+        if count:
+            write(",")
+        write(f"{inner}{key_text}: " if pretty else f"{key_text}:")
+        size += (1 if count else 0) + len(inner) + len(key_text) + 2
+        count += 1
+        if depth == 0 and isinstance(value, Mapping):
+            size += _stream_object(write, value.items(), depth + 1, pretty,
+                                   measure)
+        elif pretty:
+            write(json.dumps(value, indent=2).replace("\n", inner))
+        else:
+            write(json.dumps(_round_floats(value, config.JSON_FLOAT_DIGITS),
+                             separators=(",", ":")))
+            if measure:
+                size += (len(json.dumps(value, separators=(",", ": ")))
+                         + _indent_overhead(value, depth + 1))
+    if count and pretty:
+        write("\n" + "  " * depth)
+    if count:
+        size += 1 + 2 * depth
+    write("}")
+    return size
+
+
+def _write_json(data: dict, path: Path,
+                style: str = "compact",
+                measure_saving: bool = False) -> tuple[int, int]:
+    """Write data as JSON. Returns (file size, bytes saved vs pretty).
+
+    "compact" drops all optional whitespace and rounds floats to
+    config.JSON_FLOAT_DIGITS places; "pretty" is the indent=2 layout.
+    The document is streamed to the file (_stream_object), so the
+    encoded text is never held whole; an unchanged file is left
+    untouched (export_manifest.replace_if_changed).  The saving
+    is only measured (and otherwise 0) with measure_saving=True, as
+    that costs a second encode.
+    """
+    if style not in config.JSON_STYLES:
+        raise ValueError(f"Unknown JSON style: {style!r}")
+    measure = measure_saving and style == "compact"
+    with export_manifest.replace_if_changed(path) as f:
+        pretty_size = _stream_object(f.write, data.items(), 0,
+                                     style == "pretty", measure)
+    file_size = path.stat().st_size
+    if not measure:
+        return file_size, 0
+    return file_size, pretty_size - file_size
+
+
+def _size_note(file_size: int, saved: int) -> str:
+    """Format a file size, plus the bytes saved by compact encoding."""
+    if saved:
+        return f"{file_size:,} bytes, {saved:,} saved"
+    return f"{file_size:,} bytes"
+
+
+def _export_file(records: list[dict], output_path: Path, code_system: str,
+                 short: str, max_level: int | None = None,
+                 exact_level: int | None = None,
+                 slim_occupations: bool = False,
+                 json_style: str = "compact",
+                 encoding: str = "rows",
+                 complexity_scale: int | None = None,
+                 binary: bool = False,
+                 shard: bool = False,
+                 hashed: bool = False,
+                 occupation_dictionary: str | None = None,
+                 measure_saving: bool = False
+                 ) -> tuple[int, tuple[int, int] | None, list[str], Path]:
+    """Build and write one country-year JSON file from its record slice.
+
+    This is the unit of work export_all() fans out to a process pool, so
+    it only takes picklable arguments and returns its log lines instead
+    of printing them.  Level files (exact_level) with no records are not
+    written.  With hashed=True the file is renamed to its content-addressed
+    name (export_manifest.content_address) and its bundle / shard
+    directory are named after that.  occupation_dictionary names the
+    shared dictionary that replaces the file's occupation tables.
+    measure_saving reports the bytes saved vs pretty (_write_json).
+
+    Returns (record count, (file size, bytes saved) or None, log lines,
+    final path).
+    """
+    data = _build_static_data(
+        records, max_level=max_level, exact_level=exact_level,
+        code_system=code_system, slim_occupations=slim_occupations,
+        synthesize=False,
+    )
+    data["metadata"]["country"] = short
+    if occupation_dictionary:
+        data = _use_occupation_dictionary(data, occupation_dictionary)
+
+    record_count = data["regionData"].record_count()
+    if record_count == 0 and exact_level is not None:
+        return 0, None, [], output_path
+
+    # Bundles are built from the row encoding and its metadata
+    row_data = dict(data, metadata=dict(data["metadata"]))
+    if encoding == "columns":
+        _to_columns(data, complexity_scale)
+    written = _write_json(data, output_path, json_style, measure_saving)
+    if hashed:
+        output_path = export_manifest.content_address(output_path)
+
+    lines = []
+    if binary:
+        lines.append(_write_bundle(row_data, output_path, json_style))
+    lines.append(f"  {output_path.name}: {len(_occupation_codes(data))} "
+                 f"occupations, {record_count} region-records "
+                 f"({_size_note(*written)})")
+    if shard:
+        lines.append(_write_shards(data, output_path, json_style))
+    return record_count, written, lines, output_path
+
+
+def _export_job(*args, **options) -> tuple:
+    """_export_file() in a worker process; also returns the paths written
+    and those of them whose content changed."""
+    with export_manifest.collect() as paths, \
+            export_manifest.collect(replaced=True) as replaced:
+        result = _export_file(*args, **options)
+    return result, paths, replaced
 
 
 def export_country_year(conn: sqlite3.Connection,
                         country_code: str,
                         year: int,
-                        output_path: Path | None = None) -> int:
+                        output_path: Path | None = None,
+                        session: ExportSession | None = None,
+                        **layout) -> int:
     """Generate the main country-year JSON file (levels 1+2).
 
+    layout takes _export_file()'s options: json_style, encoding,
+    complexity_scale, binary and shard.
     Returns record count.
     """
     short = config.country_short(country_code)
     if output_path is None:
         output_path = config.json_country_year_path(short, year)
 
-    code_system = _detect_code_system(conn, country_code)
-    records = _query_records(conn, [country_code])
-    # Filter to requested year
-    records = [r for r in records if r["year"] == year]
-    data = _build_static_data(records, max_level=2, code_system=code_system)
-    data["metadata"]["country"] = short
-    data["metadata"]["maxLevel"] = 2
-
-    file_size = _write_json(data, output_path)
-    record_count = sum(
-        len(entries)
-        for year_data in data["regionData"].values()
-        for entries in year_data.values()
+    session = session or ExportSession(conn, country_code, year)
+    record_count, _, lines, _ = _export_file(
+        session.select([1, 2]), output_path, session.code_system, short,
+        max_level=2, **layout,
     )
-    print(f"  {output_path.name}: {len(data['occupations'])} occupations, "
-          f"{record_count} region-records ({file_size:,} bytes)")
+    for line in lines:
+        print(line)
     return record_count
 
 
@@ -499,52 +1132,53 @@ def export_level_file(conn: sqlite3.Connection,
                       year: int,
                       level: int,
                       output_path: Path | None = None,
-                      region_types: list[str] | None = None) -> int:
+                      region_types: list[str] | None = None,
+                      session: ExportSession | None = None,
+                      **layout) -> int:
     """Generate a level extension JSON file (single level only).
 
     If region_types is set, only include those region types (e.g. ["National", "State"]).
+    layout takes _export_file()'s options: json_style, encoding,
+    complexity_scale, binary and shard.
     Returns record count for this level.
     """
     short = config.country_short(country_code)
     if output_path is None:
         output_path = config.json_country_year_level_path(short, year, level)
 
-    code_system = _detect_code_system(conn, country_code)
-    records = _query_records(conn, [country_code])
-    records = [r for r in records if r["year"] == year]
-    if region_types:
-        records = [r for r in records if r["Region_Type"] in region_types]
-    data = _build_static_data(
-        records,
-        exact_level=level,
-        code_system=code_system,
-        slim_occupations=(country_code == "IND"),
-    )
-    data["metadata"]["country"] = short
-    data["metadata"]["level"] = level
-
-    record_count = sum(
-        len(entries)
-        for year_data in data["regionData"].values()
-        for entries in year_data.values()
+    session = session or ExportSession(conn, country_code, year)
+    record_count, _, lines, _ = _export_file(
+        session.select([level], region_types or None), output_path,
+        session.code_system, short, exact_level=level,
+        slim_occupations=(country_code == "IND"), **layout,
     )
-
-    # Only write if there are records at this level
-    if record_count > 0:
-        file_size = _write_json(data, output_path)
-        print(f"  {output_path.name}: {len(data['occupations'])} occupations, "
-              f"{record_count} region-records ({file_size:,} bytes)")
+    for line in lines:
+        print(line)
     return record_count
 
 
 def export_meta(country_configs: list[dict],
-                output_path: Path | None = None) -> None:
+                output_path: Path | None = None,
+                json_style: str = "compact",
+                data_changed: bool = True) -> None:
     """Generate the meta catalog file (bls-data.json).
 
+    lastUpdated is today's date, unless data_changed is False and the
+    catalog is otherwise unchanged, in which case the previous date is
+    kept (so an unchanged rebuild leaves the file untouched).
+
     country_configs: list of dicts with keys:
         country_code (str), country_short (str), country_name (str),
         year (int), levels_available (list[int]),
         level_files_extra (dict[str,str], optional) — extra level file keys
+        region_data_encoding (str, optional) — "rows" (default) or "columns"
+        complexity_scale (int, optional) — set when complexity is quantized
+        binary (bool, optional) — typed-array bundles were written too
+        shard (bool, optional) — per-region shards were written too
+        file_names (dict[str,str], optional) — actual filenames by key
+            ("main", "3", "4-metro", ...) when they are content-addressed
+        occupation_dictionary (str, optional) — shared occupation
+            dictionary file the data files reference
     """
     if output_path is None:
         output_path = config.json_meta_path()
@@ -628,7 +1262,9 @@ def export_meta(country_configs: list[dict],
                     {"id": "Metro", "pluralName": "Cities"},
                 ],
                 "majorGroups": major_groups,
-                "hierarchyRules": {"strategy": "nco2015"},
+                "hierarchyRules": {
+                    "strategy": config.CODE_SYSTEM_VERSIONS["NCO"],
+                },
             }
 
         major_groups = [
@@ -662,7 +1298,7 @@ def export_meta(country_configs: list[dict],
                 {"id": "Metro", "pluralName": "Metropolitan Areas"},
             ],
             "majorGroups": major_groups,
-            "hierarchyRules": {"strategy": "soc2018"},
+            "hierarchyRules": {"strategy": config.CODE_SYSTEM_VERSIONS["SOC"]},
         }
 
     for cfg in country_configs:
@@ -670,20 +1306,46 @@ def export_meta(country_configs: list[dict],
         year = cfg["year"]
         name = cfg["country_name"]
         levels = cfg["levels_available"]
+        file_names = cfg.get("file_names", {})
 
         datasets_by_key[(short, year)] = {
             "country": short,
             "year": year,
-            "file": f"bls-data-{short}-{year}.json",
+            "file": file_names.get("main", f"bls-data-{short}-{year}.json"),
             "levels": [1, 2],
+            "regionDataEncoding": cfg.get("region_data_encoding", "rows"),
         }
+        if cfg.get("complexity_scale"):
+            datasets_by_key[(short, year)]["complexityScale"] = \
+                cfg["complexity_scale"]
+        if cfg.get("binary"):
+            # Each JSON file X.json has X.bin + X.manifest.json beside it
+            datasets_by_key[(short, year)]["binaryBundles"] = True
+        if cfg.get("occupation_dictionary"):
+            datasets_by_key[(short, year)]["occupationDictionary"] = \
+                cfg["occupation_dictionary"]
+            # The dictionary only grows, so the country's other datasets
+            # that use one can point at the newest too
+            for dataset in datasets_by_key.values():
+                if (dataset["country"] == short
+                        and "occupationDictionary" in dataset):
+                    dataset["occupationDictionary"] = \
+                        cfg["occupation_dictionary"]
+        if cfg.get("shard"):
+            # {file} is a JSON filename from datasets/levelFiles minus ".json"
+            datasets_by_key[(short, year)]["shardLayout"] = {
+                "index": "{file}/index.json",
+                "region": "{file}/{regionId}.json",
+            }
 
         key = f"{short}-{year}"
         if key not in level_files:
             level_files[key] = {}
         for lvl in levels:
             if lvl > 2:
-                level_files[key][str(lvl)] = f"bls-data-{short}-{year}-{lvl}.json"
+                level_files[key][str(lvl)] = file_names.get(
+                    str(lvl), f"bls-data-{short}-{year}-{lvl}.json"
+                )
         for lkey, lfile in cfg.get("level_files_extra", {}).items():
             level_files[key][lkey] = lfile
 
@@ -719,73 +1381,239 @@ def export_meta(country_configs: list[dict],
         "countryMetadata": country_metadata,
         "lastUpdated": date.today().isoformat(),
     }
+    if (not data_changed and "lastUpdated" in existing
+            and dict(existing, lastUpdated=None)
+            == dict(meta, lastUpdated=None)):
+        meta["lastUpdated"] = existing["lastUpdated"]
 
-    _write_json(meta, output_path)
+    _write_json(meta, output_path, json_style)
     print(f"  {output_path.name}: {len(datasets)} datasets, "
             f"{len(countries_map)} countries")
 
 
 def export_all(conn: sqlite3.Connection,
                country_code: str = "USA",
-               year: int = 2024) -> dict:
+               year: int = 2024,
+               json_style: str = "compact",
+               encoding: str = "rows",
+               complexity_scale: int | None = None,
+               binary: bool = False,
+               shard: bool = False,
+               workers: int = 1,
+               hashed: bool = False,
+               shared_occupations: bool = False,
+               measure_saving: bool = False) -> dict:
     """Export all JSON files for a country-year.
 
-    Returns dict with stats.
+    The country-year is queried and synthesized once (ExportSession);
+    every file below is a slice of that snapshot.  encoding and
+    complexity_scale select the regionData layout (see _to_columns);
+    the choice is advertised on the dataset entry in bls-data.json.
+    binary=True adds a typed-array bundle beside every JSON file and
+    shard=True an index + per-region shard directory.  hashed=True
+    gives every data file a content-addressed name
+    (bls-data-us-2024.<hash8>.json) that the catalog points at, so only
+    bls-data.json itself stays mutable.  shared_occupations=True writes
+    the occupation titles, hierarchy and major groups once, to
+    occupations-<country>.json, and the data files carry only codes.
+    measure_saving=True fills in bytes_saved vs pretty JSON, at the cost
+    of a second encode of every compact file.
+
+    With workers > 1 the files are built and written in a process pool,
+    each worker receiving its pre-sliced records; the meta catalog is
+    merged once, here, after every file is done.
+
+    Returns dict with stats; "main_path" is the main file as written,
+    "rows" maps each data file to its region-record count and "paths"
+    lists the files written for the year (for the export manifest).
+    """
+    return export_years(
+        conn, country_code, [year], json_style=json_style,
+        encoding=encoding, complexity_scale=complexity_scale,
+        binary=binary, shard=shard, workers=workers, hashed=hashed,
+        shared_occupations=shared_occupations,
+        measure_saving=measure_saving,
+    )[year]
+
+
+def export_years(conn: sqlite3.Connection,
+                 country_code: str = "USA",
+                 years: Iterable[int] = (2024,),
+                 json_style: str = "compact",
+                 encoding: str = "rows",
+                 complexity_scale: int | None = None,
+                 binary: bool = False,
+                 shard: bool = False,
+                 workers: int = 1,
+                 hashed: bool = False,
+                 shared_occupations: bool = False,
+                 measure_saving: bool = False) -> dict[int, dict]:
+    """Export all JSON files for several years of a country in one pass.
+
+    The records of every year come from a single query split by year
+    (ExportSession.for_years), the shared occupation dictionary covers
+    all of them, and bls-data.json is merged once, after the last year.
+    Options are as for export_all().
+
+    Returns {year: export_all() stats}, in ascending year order.  Files
+    shared by the years (dictionary, bls-data.json) are in no "paths".
     """
     short = config.country_short(country_code)
     country_name = config.COUNTRIES.get(country_code, {}).get("name", country_code)
+    if encoding not in config.REGION_DATA_ENCODINGS:
+        raise ValueError(f"Unknown regionData encoding: {encoding!r}")
+    if encoding == "rows":
+        complexity_scale = None
+    layout = {"json_style": json_style, "encoding": encoding,
+              "complexity_scale": complexity_scale, "binary": binary,
+              "shard": shard, "hashed": hashed,
+              "measure_saving": measure_saving}
+    years = sorted(set(years))
+
+    # Files whose bytes changed, for the catalog's lastUpdated
+    with export_manifest.collect(replaced=True) as replaced:
+        if shared_occupations:
+            # Every data file names the dictionary, so it is built first,
+            # from a pass over the records that keeps only codes and titles
+            dictionary = _occupation_dictionary(
+                _iter_records(conn, [country_code], years=years),
+                _detect_code_system(conn, country_code), short,
+                _previous_dictionary(short),
+            )
+            dictionary_path = config.json_occupations_path(short)
+            written = _write_json(dictionary, dictionary_path, json_style,
+                                  measure_saving)
+            if hashed:
+                dictionary_path = export_manifest.content_address(
+                    dictionary_path
+                )
+            layout["occupation_dictionary"] = dictionary_path.name
+            print(f"  {dictionary_path.name}: "
+                  f"{len(dictionary['occupations'])} occupations "
+                  f"({_size_note(*written)})")
+
+        pool = (ProcessPoolExecutor(max_workers=workers) if workers > 1
+                else None)
+        country_configs: list[dict] = []
+        stats: dict[int, dict] = {}
+        # for_years() yields one session per year, in order.  Each goes
+        # straight into _export_session(), so no year outlives its export.
+        sessions = ExportSession.for_years(conn, country_code, years)
+        try:
+            for year in years:
+                with export_manifest.collect() as paths:
+                    year_config, stats[year] = _export_session(
+                        next(sessions), layout, pool
+                    )
+                stats[year]["paths"] = paths
+                country_configs.append(dict(
+                    year_config, country_name=country_name,
+                    region_data_encoding=encoding,
+                    complexity_scale=complexity_scale, binary=binary,
+                    shard=shard,
+                    occupation_dictionary=layout.get(
+                        "occupation_dictionary"
+                    ),
+                ))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    # Export meta catalog (single writer, after all files)
+    export_meta(country_configs, json_style=json_style,
+                data_changed=bool(replaced))
+    return stats
+
+
+def _export_session(session: ExportSession, layout: dict,
+                    pool: ProcessPoolExecutor | None = None
+                    ) -> tuple[dict, dict]:
+    """Write the main and level files of one ExportSession.
+
+    Returns (its export_meta() config without the layout keys, stats).
+    """
+    short, year = session.short, session.year
+    # Main file (levels 1+2), then the level extension files
+    jobs: list[tuple[str, list[dict], Path, dict]] = [(
+        "main", session.select([1, 2]),
+        config.json_country_year_path(short, year),
+        dict(layout, max_level=2),
+    )]
+    # Levels present in the published (non-synthetic) data
+    all_levels = session.levels_available
+    for level in all_levels:
+        if level > 2:
+            # Split level 3 and 4: nat+state vs metro
+            for key, region_types in ((str(level), ["National", "State"]),
+                                      (f"{level}-metro", ["Metro"])):
+                jobs.append((
+                    key, session.select([level], region_types),
+                    config.json_country_year_level_path(short, year, key),
+                    dict(layout, exact_level=level,
+                         slim_occupations=(session.country_code == "IND")),
+                ))
+
+    if pool is not None:
+        futures = [
+            pool.submit(_export_job, records, path,
+                        session.code_system, short, **options)
+            for _, records, path, options in jobs
+        ]
+        results = []
+        for future in futures:
+            result, paths, replaced = future.result()
+            export_manifest.record(paths)
+            export_manifest.record(replaced, replaced=True)
+            results.append(result)
+    else:
+        results = [
+            _export_file(records, path, session.code_system, short,
+                         **options)
+            for _, records, path, options in jobs
+        ]
 
-    # Export main file (levels 1+2)
-    main_count = export_country_year(conn, country_code, year)
-
-    # Determine which levels exist in data
-    code_system = _detect_code_system(conn, country_code)
-    records = _query_records(conn, [country_code])
-    records = [r for r in records if r["year"] == year]
-    all_levels = sorted(set(_get_level(r["SOC_Code"], code_system) for r in records))
+    # Report in job order, whichever worker finished first
+    counts: dict[str, int] = {}
+    sizes: list[tuple[int, int]] = []
+    rows: dict[Path, int] = {}
+    file_names: dict[str, str] = {}
+    for (key, _, _, _), (count, written, lines, path) in zip(jobs, results):
+        for line in lines:
+            print(line)
+        counts[key] = count
+        if written is not None:
+            sizes.append(written)
+            rows[path] = count
+            file_names[key] = path.name
 
-    # Export level extension files
     level_counts: dict[int, int] = {}
     level_files_extra: dict[str, str] = {}
     for level in all_levels:
         if level > 2:
-            if level >= 3:
-                # Split level 3 and 4: nat+state vs metro
-                count_ns = export_level_file(
-                    conn, country_code, year, level,
-                    region_types=["National", "State"],
-                )
-                metro_path = config.json_country_year_level_path(short, year, f"{level}-metro")
-                count_metro = export_level_file(
-                    conn, country_code, year, level,
-                    output_path=metro_path,
-                    region_types=["Metro"],
-                )
-                total_count = count_ns + count_metro
-                if total_count > 0:
-                    level_counts[level] = total_count
-                if count_metro > 0:
-                    level_files_extra[f"{level}-metro"] = f"bls-data-{short}-{year}-{level}-metro.json"
-            else:
-                count = export_level_file(conn, country_code, year, level)
-                if count > 0:
-                    level_counts[level] = count
-
-    # Export meta catalog
+            total_count = counts[str(level)] + counts[f"{level}-metro"]
+            if total_count > 0:
+                level_counts[level] = total_count
+            if counts[f"{level}-metro"] > 0:
+                level_files_extra[f"{level}-metro"] = \
+                    file_names[f"{level}-metro"]
+
     levels_available = [lvl for lvl in all_levels if lvl > 2 and lvl in level_counts]
-    export_meta([{
-        "country_code": country_code,
+    year_config = {
+        "country_code": session.country_code,
         "country_short": short,
-        "country_name": country_name,
         "year": year,
         "levels_available": levels_available,
         "level_files_extra": level_files_extra,
-    }])
-
-    return {
-        "main_count": main_count,
+        "file_names": file_names,
+    }
+    return year_config, {
+        "main_count": counts["main"],
+        "main_path": results[0][3],
         "level_counts": level_counts,
         "levels_available": all_levels,
+        "bytes_written": sum(size for size, _ in sizes),
+        "bytes_saved": sum(saved for _, saved in sizes),
+        "rows": rows,
     }
 
 
@@ -793,7 +1621,8 @@ def export_all(conn: sqlite3.Connection,
 
 def export_json(conn: sqlite3.Connection,
                 country_codes: list[str] | None = None,
-                output_path: Path | None = None) -> int:
+                output_path: Path | None = None,
+                json_style: str = "compact") -> int:
     """Generate a full bls-data.json with all levels. Returns record count.
 
     This is the legacy single-file export. For the new country-tagged
@@ -805,14 +1634,16 @@ def export_json(conn: sqlite3.Connection,
     records = _query_records(conn, country_codes)
     data = _build_static_data(records)
 
-    file_size = _write_json(data, output_path)
-    print(f"  {output_path.name}: {len(records)} records ({file_size:,} bytes)")
+    written = _write_json(data, output_path, json_style)
+    print(f"  {output_path.name}: {len(records)} records "
+          f"({_size_note(*written)})")
     return len(records)
 
 
 def export_json_levels(conn: sqlite3.Connection,
                        country_codes: list[str] | None = None,
-                       max_levels: list[int] | None = None) -> dict[int, int]:
+                       max_levels: list[int] | None = None,
+                       json_style: str = "compact") -> dict[int, int]:
     """Generate per-level split JSON files (legacy cumulative format).
 
     Returns dict of level -> record count.
@@ -830,19 +1661,15 @@ def export_json_levels(conn: sqlite3.Connection,
 
         data = _build_static_data(records, max_level=level)
         output_path = config.json_level_path(level)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        written = _write_json(data, output_path, json_style)
 
         level_records = sum(
             len(entries)
             for year_data in data["regionData"].values()
             for entries in year_data.values()
         )
-        file_size = output_path.stat().st_size
         print(f"  {output_path.name}: {len(data['occupations'])} occupations, "
-              f"{level_records} region-records ({file_size:,} bytes)")
+              f"{level_records} region-records ({_size_note(*written)})")
         results[level] = level_records
 
     return results
@@ -5,23 +5,12 @@ import sqlite3
 from datetime import date
 from pathlib import Path
 
-from . import config
+from . import config, export_manifest
 
 
-def _query_records(conn: sqlite3.Connection,
-                   country_codes: list[str] | None = None) -> list[dict]:
-    """Query occupation records and map to frontend contract.
-
-    DB column              -> JS field
-    occupation_code        -> SOC_Code
-    occupation_title       -> OCC_TITLE
-    major_group_name       -> SOC_Major_Group_Name
-    employment             -> TOT_EMP
-    mean_annual_wage       -> A_MEAN
-    gdp                    -> GDP
-    region.region_type     -> Region_Type  (uses "Metro")
-    region.name            -> Region
-    """
+def _records_query(country_codes: list[str] | None = None
+                   ) -> tuple[str, list]:
+    """Return the (sql, params) used by _query_records()."""
     query = """
         SELECT o.year, r.region_type, r.name as region,
                o.occupation_code, o.occupation_title, o.major_group_name,
@@ -37,7 +26,24 @@ def _query_records(conn: sqlite3.Connection,
         query += f" WHERE c.code IN ({placeholders})"
         params = list(country_codes)
     query += " ORDER BY r.region_type, r.name, o.occupation_code"
+    return query, params
+
 
+def _query_records(conn: sqlite3.Connection,
+                   country_codes: list[str] | None = None) -> list[dict]:
+    """Query occupation records and map to frontend contract.
+
+    DB column              -> JS field
+    occupation_code        -> SOC_Code
+    occupation_title       -> OCC_TITLE
+    major_group_name       -> SOC_Major_Group_Name
+    employment             -> TOT_EMP
+    mean_annual_wage       -> A_MEAN
+    gdp                    -> GDP
+    region.region_type     -> Region_Type  (uses "Metro")
+    region.name            -> Region
+    """
+    query, params = _records_query(country_codes)
     records = []
     for row in conn.execute(query, params).fetchall():
         (year, region_type, region, occ_code, occ_title, major_group,
@@ -158,6 +164,6 @@ window.updateBLSData = function(newData, newMetadata) {{
 console.log('BLS Data loader initialized - use getBLSData() to access embedded data (CORS-free)');
 """
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(content, encoding="utf-8")
+    with export_manifest.replace_if_changed(output_path) as f:
+        f.write(content)
     return len(records)
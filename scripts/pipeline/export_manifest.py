@@ -0,0 +1,217 @@
+"""Content-hash manifest of exported files (data/export_manifest.json).
+
+Exporters write through replace_if_changed(): the new bytes go to a
+temp file first, and the target is only replaced when their hash
+differs, so unchanged outputs keep their mtime and CDN cache entries.
+
+content_address() renames a written file to <stem>.<hash8><suffix>,
+for data files served as immutable.
+
+ExportManifest.update() then records hash, size and row count of each
+file an exporter produced, sorting them into written / skipped, and
+deletes files that exporter produced on an earlier run but not now
+(or, with keep_generations, not in its last N runs).
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+from . import config
+from .db import file_hash
+
+MANIFEST_VERSION = 1
+HASH_LENGTH = 8
+
+# (path list, replaced only) of the active collect() blocks in this process
+_collectors: list[tuple[list[Path], bool]] = []
+
+
+@contextmanager
+def collect(replaced: bool = False):
+    """Collect the paths passed to replace_if_changed() inside the block.
+
+    With replaced=True only the files whose content actually changed
+    are collected.
+    """
+    paths: list[Path] = []
+    _collectors.append((paths, replaced))
+    try:
+        yield paths
+    finally:
+        # By identity: nested blocks can hold equal lists
+        del _collectors[next(i for i, (c, _) in enumerate(_collectors)
+                             if c is paths)]
+
+
+def record(paths, replaced: bool = False) -> None:
+    """Add paths written elsewhere (e.g. by a worker process) to collect()
+    (with replaced=True, to the collect(replaced=True) blocks)."""
+    for collector, replaced_only in _collectors:
+        if replaced_only == replaced:
+            collector.extend(paths)
+
+
+def _same_content(a: Path, b: Path) -> bool:
+    return (a.stat().st_size == b.stat().st_size
+            and file_hash(a) == file_hash(b))
+
+
+@contextmanager
+def replace_if_changed(path: Path, mode: str = "w"):
+    """Open *path* for writing, leaving it untouched if the bytes are the same.
+
+    Yields a handle to a temp file beside *path*; on exit the temp file
+    replaces *path* (atomically) unless both hash the same.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp, mode, encoding=None if "b" in mode else "utf-8") as f:
+            yield f
+        replaced = not (path.exists() and _same_content(tmp, path))
+        if replaced:
+            os.replace(tmp, path)
+        else:
+            tmp.unlink()
+    finally:
+        tmp.unlink(missing_ok=True)
+    record([path])
+    if replaced:
+        record([path], replaced=True)
+
+
+def content_address(path: Path) -> Path:
+    """Rename a written file to its content-addressed name; return that.
+
+    <stem><suffix> becomes <stem>.<first 8 hex of sha256><suffix>.  If
+    that file already exists it holds the same bytes and is kept as is
+    (and no longer counts as replaced).  Paths in active collect() blocks
+    are updated to the new name.
+    """
+    digest = file_hash(path)[:HASH_LENGTH]
+    hashed = path.with_name(f"{path.stem}.{digest}{path.suffix}")
+    existed = hashed.exists()
+    if existed:
+        path.unlink()
+    else:
+        os.replace(path, hashed)
+    for collector, replaced_only in _collectors:
+        collector[:] = [hashed if p == path else p for p in collector
+                        if not (replaced_only and existed and p == path)]
+    return hashed
+
+
+class ExportManifest:
+    """Hash, size and row count of every exported file, by exporter.
+
+    Exporters are named by scope (e.g. "json:us-2024", "split"), so a
+    run only removes stale files of the exporters it ran.  Each update()
+    of an exporter is one generation of its files.  Summary lists
+    ``written``, ``skipped`` and ``removed`` cover this run.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or config.EXPORT_MANIFEST_PATH
+        self.files: dict[str, dict] = {}
+        self.generations: dict[str, int] = {}
+        if self.path.exists():
+            try:
+                saved = json.loads(self.path.read_text(encoding="utf-8"))
+                self.files = saved["files"]
+                self.generations = saved.get("generations", {})
+            except (ValueError, KeyError):
+                self.files = {}
+        self.written: list[Path] = []
+        self.skipped: list[Path] = []
+        self.removed: list[Path] = []
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(config.PROJECT_ROOT).as_posix()
+        except ValueError:
+            return str(path)
+
+    @staticmethod
+    def _path(key: str) -> Path:
+        return config.PROJECT_ROOT / key
+
+    def _digest(self, path: Path) -> str:
+        """Content hash, trusting the stored one while size/mtime match."""
+        stat = path.stat()
+        old = self.files.get(self._key(path), {})
+        if (old.get("size") == stat.st_size
+                and old.get("mtimeNs") == stat.st_mtime_ns):
+            return old["sha256"]
+        return file_hash(path)
+
+    def recorded(self, path: Path) -> bool:
+        """True if *path* exists with the content its entry records."""
+        old = self.files.get(self._key(path))
+        return (old is not None and Path(path).exists()
+                and self._digest(Path(path)) == old["sha256"])
+
+    def update(self, exporter: str, paths,
+               rows: dict[Path, int] | None = None,
+               keep_generations: int = 1) -> None:
+        """Record the files *exporter* produced this run.
+
+        Files whose hash matches their previous entry count as skipped.
+        Files recorded for *exporter* but not produced in its last
+        *keep_generations* runs (1: this run) are deleted, along with
+        their directory once empty.  Keeping more than one generation
+        lets clients holding an older catalog still fetch the
+        content-addressed files it names.  rows maps a path to its
+        record count, where known.
+        """
+        generation = self.generations.get(exporter, 0) + 1
+        self.generations[exporter] = generation
+        rows = {self._key(p): n for p, n in (rows or {}).items()}
+        produced = set()
+        for path in dict.fromkeys(Path(p) for p in paths):
+            key = self._key(path)
+            produced.add(key)
+            stat = path.stat()
+            old = self.files.get(key, {})
+            digest = self._digest(path)
+            if old.get("sha256") == digest:
+                self.skipped.append(path)
+            else:
+                self.written.append(path)
+            self.files[key] = {
+                "exporter": exporter,
+                "sha256": digest,
+                "size": stat.st_size,
+                "mtimeNs": stat.st_mtime_ns,
+                "rows": rows.get(key),
+                "generation": generation,
+            }
+
+        for key, entry in list(self.files.items()):
+            if (entry["exporter"] == exporter and key not in produced
+                    and generation - entry.get("generation", 0)
+                    >= keep_generations):
+                del self.files[key]
+                path = self._path(key)
+                if path.exists():
+                    path.unlink()
+                    self.removed.append(path)
+                    if not any(path.parent.iterdir()):
+                        path.parent.rmdir()
+
+    def save(self) -> None:
+        """Write the manifest (sorted by path)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(
+            {"version": MANIFEST_VERSION,
+             "generations": dict(sorted(self.generations.items())),
+             "files": dict(sorted(self.files.items()))},
+            indent=2,
+        ) + "\n", encoding="utf-8")
+
+    def summary(self) -> str:
+        return (f"{len(self.written)} written, {len(self.skipped)} skipped "
+                f"(unchanged), {len(self.removed)} removed")
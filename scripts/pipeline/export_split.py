@@ -5,7 +5,7 @@ import re
 import sqlite3
 from pathlib import Path
 
-from . import config
+from . import config, export_manifest
 
 
 def _make_slug(region_type: str, region_name: str) -> str:
@@ -34,9 +34,8 @@ def _make_slug(region_type: str, region_name: str) -> str:
     return f"{prefix}-{slug_part}"
 
 
-def _query_all(conn: sqlite3.Connection,
-               country_codes: list[str] | None = None) -> list[dict]:
-    """Query all occupation records with country code."""
+def _all_query(country_codes: list[str] | None = None) -> tuple[str, list]:
+    """Return the (sql, params) used by _query_all()."""
     query = """
         SELECT o.year, r.region_type, r.name as region,
                o.occupation_code, o.occupation_title, o.major_group_name,
@@ -52,7 +51,13 @@ def _query_all(conn: sqlite3.Connection,
         query += f" WHERE c.code IN ({placeholders})"
         params = list(country_codes)
     query += " ORDER BY r.region_type, r.name, o.occupation_code"
+    return query, params
+
 
+def _query_all(conn: sqlite3.Connection,
+               country_codes: list[str] | None = None) -> list[dict]:
+    """Query all occupation records with country code."""
+    query, params = _all_query(country_codes)
     rows = []
     for row in conn.execute(query, params).fetchall():
         (year, region_type, region, occ_code, occ_title, major_group,
@@ -90,7 +95,8 @@ def export_split(conn: sqlite3.Connection,
                  output_dir: Path | None = None) -> dict:
     """Generate meta.js + per-region data files.
 
-    Returns dict with stats: {meta_path, region_count, occ_count, files}.
+    Returns dict with stats: {meta_path, region_count, occ_count, files,
+    rows} (rows maps each written path to its record count).
     """
     if output_dir is None:
         output_dir = config.DATA_DIR
@@ -121,6 +127,7 @@ def export_split(conn: sqlite3.Connection,
     region_dir.mkdir(parents=True, exist_ok=True)
 
     files_written = []
+    rows: dict[Path, int] = {}
 
     for (year, region_type, region_name, country_code), group_records in groups.items():
         years_set.add(year)
@@ -146,11 +153,10 @@ def export_split(conn: sqlite3.Connection,
         filename = f"{year}.{slug}.{country_short}.data.js"
         filepath = region_dir / filename
         rows_json = json.dumps(compact_rows)
-        filepath.write_text(
-            f"window.BLS_LOAD({rows_json});\n",
-            encoding="utf-8",
-        )
+        with export_manifest.replace_if_changed(filepath) as f:
+            f.write(f"window.BLS_LOAD({rows_json});\n")
         files_written.append(filename)
+        rows[filepath] = len(compact_rows)
 
     # Sort regions within each type
     for rt in regions_by_type:
@@ -164,14 +170,13 @@ def export_split(conn: sqlite3.Connection,
     }
     meta_json = json.dumps(meta, indent=2)
     meta_path = output_dir / "meta.js"
-    meta_path.write_text(
-        f"window.BLS_META = {meta_json};\n",
-        encoding="utf-8",
-    )
+    with export_manifest.replace_if_changed(meta_path) as f:
+        f.write(f"window.BLS_META = {meta_json};\n")
 
     return {
         "meta_path": str(meta_path),
         "region_count": len(files_written),
         "occ_count": len(occ_list),
         "files": files_written,
+        "rows": rows,
     }
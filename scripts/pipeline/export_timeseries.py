@@ -24,7 +24,7 @@ import requests
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
-from scripts.pipeline import config
+from scripts.pipeline import config, export_manifest
 from scripts.pipeline.fetch_bls import (
     _bls_urls, _download_zip, _find_xlsx_in_zip, _clean_numeric,
 )
@@ -363,7 +363,7 @@ def export_oes(raw_dir: Path | None = None,
         "data": base_data,
     }
     base_path = config.PUBLIC_DATA_DIR / "timeseries-us-oes.json"
-    with open(base_path, "w", encoding="utf-8") as f:
+    with export_manifest.replace_if_changed(base_path) as f:
         json.dump(base_json, f, separators=(",", ":"))
     print(f"\n  Base: {base_path.name} ({len(base_regions)} regions, "
           f"{len(base_data)} with data)")
@@ -377,7 +377,7 @@ def export_oes(raw_dir: Path | None = None,
             "data": metro_data,
         }
         metro_path = config.PUBLIC_DATA_DIR / "timeseries-us-oes-metro.json"
-        with open(metro_path, "w", encoding="utf-8") as f:
+        with export_manifest.replace_if_changed(metro_path) as f:
             json.dump(metro_json, f, separators=(",", ":"))
         print(f"  Metro: {metro_path.name} ({len(metro_regions)} regions)")
 
@@ -613,7 +613,7 @@ def export_ilostat(country: str = "both") -> None:
         }
 
         out_path = config.PUBLIC_DATA_DIR / f"timeseries-ilostat-{cc}.json"
-        with open(out_path, "w", encoding="utf-8") as f:
+        with export_manifest.replace_if_changed(out_path) as f:
             json.dump(output, f, separators=(",", ":"))
         print(f"    Output: {out_path.name} ({len(groups)} groups, "
               f"{len(years)} years)")
@@ -990,7 +990,7 @@ def export_plfs() -> None:
     }
 
     out_path = config.PUBLIC_DATA_DIR / "timeseries-plfs-in.json"
-    with open(out_path, "w", encoding="utf-8") as f:
+    with export_manifest.replace_if_changed(out_path) as f:
         json.dump(output, f, separators=(",", ":"))
     print(f"\n  Output: {out_path.name} ({len(groups)} groups, "
           f"{len(active_years)} years, {len(regions)} regions, "
@@ -1022,14 +1022,20 @@ def main():
     )
     args = parser.parse_args()
 
-    if args.source in ("oes", "all"):
-        export_oes(start_year=args.start_year, end_year=args.end_year)
-
-    if args.source in ("ilostat", "all"):
-        export_ilostat()
-
-    if args.source in ("plfs", "all"):
-        export_plfs()
+    manifest = export_manifest.ExportManifest()
+    exporters = {
+        "oes": lambda: export_oes(start_year=args.start_year,
+                                  end_year=args.end_year),
+        "ilostat": export_ilostat,
+        "plfs": export_plfs,
+    }
+    for source, export in exporters.items():
+        if args.source in (source, "all"):
+            with export_manifest.collect() as paths:
+                export()
+            manifest.update(f"timeseries:{source}", paths)
+    manifest.save()
+    print(f"\nExport manifest: {manifest.summary()}")
 
 
 if __name__ == "__main__":
@@ -13,6 +13,7 @@ Usage:
 import csv
 import io
 import zipfile
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
 import requests
@@ -91,10 +92,11 @@ def _find_xlsx_in_zip(zip_path: Path, prefer: str | None = None) -> str:
 
 
 def _read_xlsx_from_zip(zip_path: Path,
-                        prefer: str | None = None) -> list[dict]:
+                        prefer: str | None = None) -> Iterator[dict]:
     """Extract and read the XLSX from a BLS ZIP file.
 
-    Returns list of dicts with original BLS column names.
+    Yields dicts with original BLS column names, one per sheet row, so the
+    caller never holds the full parsed sheet in memory.
     """
     import openpyxl
 
@@ -107,11 +109,11 @@ def _read_xlsx_from_zip(zip_path: Path,
             ws = wb.active
             rows_iter = ws.iter_rows(values_only=True)
             headers = [str(h).strip() if h else "" for h in next(rows_iter)]
-            data = []
-            for row in rows_iter:
-                data.append(dict(zip(headers, row)))
-            wb.close()
-    return data
+            try:
+                for row in rows_iter:
+                    yield dict(zip(headers, row))
+            finally:
+                wb.close()
 
 
 def _clean_numeric(val) -> int | None:
@@ -129,9 +131,9 @@ def _clean_numeric(val) -> int | None:
         return None
 
 
-def _filter_and_map_national(rows: list[dict], year: int) -> list[dict]:
+def _filter_and_map_national(rows: Iterable[dict],
+                             year: int) -> Iterator[dict]:
     """Filter national data and map to our schema."""
-    results = []
     for row in rows:
         # Keep cross-industry occupations at all levels
         i_group = str(row.get("I_GROUP", "")).strip()
@@ -151,7 +153,7 @@ def _filter_and_map_national(rows: list[dict], year: int) -> list[dict]:
         prefix = occ_code[:2] if "-" in occ_code else ""
         major_group = config.SOC_MAJOR_GROUPS.get(prefix, occ_title)
 
-        results.append({
+        yield {
             "year": year,
             "region_type": "National",
             "region": config.COUNTRIES["USA"]["national_region_name"],
@@ -160,13 +162,12 @@ def _filter_and_map_national(rows: list[dict], year: int) -> list[dict]:
             "major_group_name": major_group,
             "employment": emp,
             "mean_annual_wage": wage,
-        })
-    return results
+        }
 
 
-def _filter_and_map_state(rows: list[dict], year: int) -> list[dict]:
+def _filter_and_map_state(rows: Iterable[dict],
+                          year: int) -> Iterator[dict]:
     """Filter state data and map to our schema."""
-    results = []
     for row in rows:
         i_group = str(row.get("I_GROUP", "")).strip()
         occ_group = str(row.get("O_GROUP", "")).strip()
@@ -190,7 +191,7 @@ def _filter_and_map_state(rows: list[dict], year: int) -> list[dict]:
         prefix = occ_code[:2] if "-" in occ_code else ""
         major_group = config.SOC_MAJOR_GROUPS.get(prefix, occ_title)
 
-        results.append({
+        yield {
             "year": year,
             "region_type": "State",
             "region": area_title,
@@ -199,13 +200,12 @@ def _filter_and_map_state(rows: list[dict], year: int) -> list[dict]:
             "major_group_name": major_group,
             "employment": emp,
             "mean_annual_wage": wage,
-        })
-    return results
+        }
 
 
-def _filter_and_map_metro(rows: list[dict], year: int) -> list[dict]:
+def _filter_and_map_metro(rows: Iterable[dict],
+                          year: int) -> Iterator[dict]:
     """Filter metro data and map to our schema."""
-    results = []
     for row in rows:
         i_group = str(row.get("I_GROUP", "")).strip()
         occ_group = str(row.get("O_GROUP", "")).strip()
@@ -233,7 +233,7 @@ def _filter_and_map_metro(rows: list[dict], year: int) -> list[dict]:
         prefix = occ_code[:2] if "-" in occ_code else ""
         major_group = config.SOC_MAJOR_GROUPS.get(prefix, occ_title)
 
-        results.append({
+        yield {
             "year": year,
             "region_type": "Metro",
             "region": area_title,
@@ -242,8 +242,16 @@ def _filter_and_map_metro(rows: list[dict], year: int) -> list[dict]:
             "major_group_name": major_group,
             "employment": emp,
             "mean_annual_wage": wage,
-        })
-    return results
+        }
+
+
+def _write_records(writer: csv.DictWriter, records: Iterable[dict]) -> int:
+    """Write records to a CSV writer one at a time. Returns count."""
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
 
 
 def fetch_and_parse(year: int, raw_dir: Path | None = None) -> Path:
@@ -255,43 +263,45 @@ def fetch_and_parse(year: int, raw_dir: Path | None = None) -> Path:
         raw_dir = config.RAW_DIR
 
     urls = _bls_urls(year)
-    all_records: list[dict] = []
-
-    # National
-    print("Fetching BLS national data...")
-    nat_zip = _download_zip(urls["national"], raw_dir)
-    nat_rows = _read_xlsx_from_zip(nat_zip)
-    nat_records = _filter_and_map_national(nat_rows, year)
-    print(f"  National: {len(nat_records)} occupations")
-    all_records.extend(nat_records)
-
-    # State
-    print("Fetching BLS state data...")
-    st_zip = _download_zip(urls["state"], raw_dir)
-    st_rows = _read_xlsx_from_zip(st_zip)
-    st_records = _filter_and_map_state(st_rows, year)
-    print(f"  States: {len(st_records)} records")
-    all_records.extend(st_records)
-
-    # Metro (prefer MSA file over BOS nonmetropolitan file)
-    print("Fetching BLS metro data...")
-    ma_zip = _download_zip(urls["metro"], raw_dir)
-    ma_rows = _read_xlsx_from_zip(ma_zip, prefer="MSA")
-    ma_records = _filter_and_map_metro(ma_rows, year)
-    print(f"  Metros: {len(ma_records)} records")
-    all_records.extend(ma_records)
-
-    # Write combined CSV
-    csv_path = raw_dir / f"bls_oes_{year}_combined.csv"
     fieldnames = [
         "year", "region_type", "region", "occupation_code",
         "occupation_title", "major_group_name", "employment",
         "mean_annual_wage",
     ]
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+
+    # Records are streamed straight from each workbook into the CSV; write
+    # to a temp file so a failed download never leaves a partial CSV behind.
+    csv_path = raw_dir / f"bls_oes_{year}_combined.csv"
+    tmp_path = csv_path.with_suffix(".csv.tmp")
+    total = 0
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
-        writer.writerows(all_records)
 
-    print(f"\nCombined CSV: {csv_path.name} ({len(all_records):,} records)")
+        # National
+        print("Fetching BLS national data...")
+        nat_zip = _download_zip(urls["national"], raw_dir)
+        count = _write_records(writer, _filter_and_map_national(
+            _read_xlsx_from_zip(nat_zip), year))
+        print(f"  National: {count} occupations")
+        total += count
+
+        # State
+        print("Fetching BLS state data...")
+        st_zip = _download_zip(urls["state"], raw_dir)
+        count = _write_records(writer, _filter_and_map_state(
+            _read_xlsx_from_zip(st_zip), year))
+        print(f"  States: {count} records")
+        total += count
+
+        # Metro (prefer MSA file over BOS nonmetropolitan file)
+        print("Fetching BLS metro data...")
+        ma_zip = _download_zip(urls["metro"], raw_dir)
+        count = _write_records(writer, _filter_and_map_metro(
+            _read_xlsx_from_zip(ma_zip, prefer="MSA"), year))
+        print(f"  Metros: {count} records")
+        total += count
+    tmp_path.replace(csv_path)
+
+    print(f"\nCombined CSV: {csv_path.name} ({total:,} records)")
     return csv_path
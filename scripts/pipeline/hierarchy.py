@@ -0,0 +1,164 @@
+"""Occupation code hierarchy: level, parent and major group per code.
+
+The per-code string rules live in the _soc_* / _nco_* helpers;
+OccupationHierarchy evaluates them once for a set of codes and keeps the
+result as integer-indexed arrays plus child adjacency lists.
+"""
+
+from collections.abc import Iterable
+from functools import lru_cache
+
+
+def _soc_level(soc_code: str) -> int:
+    """BLS SOC hierarchy: 4 real levels.
+
+    XX-0000 = 1 (major group)
+    XX-X000 = 2 (minor group)
+    XX-XX00 = 2 (minor group — SOC 2018 renumbered codes)
+    XX-XXX0 = 3 (broad occupation)
+    XX-XXXX = 4 (detailed occupation)
+    """
+    if soc_code.endswith("-0000"):
+        return 1
+    elif soc_code.endswith("00"):  # catches both XX-X000 and XX-XX00
+        return 2
+    elif soc_code.endswith("0"):
+        return 3
+    else:
+        return 4
+
+
+def _soc_parent(soc_code: str, known_codes: set[str] | None = None) -> str | None:
+    """Get parent SOC code for hierarchy traversal.
+
+    For level 3 (XX-XXX0), the parent minor group can be either
+    XX-X000 (standard) or XX-XX00 (SOC 2018 renumbered).  When
+    *known_codes* is provided we check which pattern actually exists;
+    otherwise we default to the standard XX-X000 pattern.
+    """
+    level = _soc_level(soc_code)
+    prefix = soc_code[:3]  # "XX-"
+    if level == 4:
+        return prefix + soc_code[3:6] + "0"   # XX-XXXX → XX-XXX0
+    if level == 3:
+        renumbered = prefix + soc_code[3:5] + "00"   # XX-XX00
+        standard   = prefix + soc_code[3] + "000"    # XX-X000
+        if renumbered == standard:
+            return standard
+        if known_codes is not None:
+            return renumbered if renumbered in known_codes else standard
+        return standard  # safe default
+    if level == 2:
+        return prefix + "0000"                  # XX-X000 → XX-0000
+    return None  # level 1 has no parent
+
+
+def _nco_level(nco_code: str) -> int:
+    """NCO hierarchy: level = number of digits in the code."""
+    return len(nco_code.strip())
+
+
+def _nco_parent(nco_code: str, known_codes: set[str] | None = None) -> str | None:
+    """Get parent NCO code: drop last digit."""
+    code = nco_code.strip()
+    if len(code) <= 1:
+        return None
+    return code[:-1]
+
+
+def _nco_major_group_id(nco_code: str) -> str:
+    """Get the 1-digit division (major group) for any NCO code."""
+    return nco_code[0]
+
+
+def _get_level(occ_code: str, code_system: str) -> int:
+    """Dispatch to SOC or NCO level function."""
+    if code_system == "NCO":
+        return _nco_level(occ_code)
+    return _soc_level(occ_code)
+
+
+def _get_parent(occ_code: str, code_system: str,
+                known_codes: set[str] | None = None) -> str | None:
+    """Dispatch to SOC or NCO parent function."""
+    if code_system == "NCO":
+        return _nco_parent(occ_code, known_codes)
+    return _soc_parent(occ_code, known_codes)
+
+
+def _get_major_group_id(occ_code: str, code_system: str) -> str:
+    """Get the major group ID for an occupation code."""
+    if code_system == "NCO":
+        return _nco_major_group_id(occ_code)
+    # SOC: first two digits (e.g. "11" from "11-1011")
+    return occ_code[:2] if "-" in occ_code else occ_code[:1]
+
+
+class OccupationHierarchy:
+    """Integer-indexed hierarchy for one code system and known-code set.
+
+    Codes are numbered in sorted order.  ``levels``, ``parents`` (parent
+    id, or -1) and ``major_groups`` are arrays indexed by code id;
+    ``children`` holds each code's child ids.  Parents are resolved
+    against the known codes, as _get_parent() does; with
+    include_ancestors=True, unpublished ancestors are added as extra
+    nodes so rollups can look them up too.
+    """
+
+    def __init__(self, codes: Iterable[str], code_system: str = "SOC",
+                 include_ancestors: bool = False):
+        self.code_system = code_system
+        known = set(codes)
+        nodes = set(known)
+        parent_of: dict[str, str | None] = {}
+        pending = list(known)
+        while pending:
+            code = pending.pop()
+            parent = _get_parent(code, code_system, known)
+            parent_of[code] = parent
+            if include_ancestors and parent and parent not in nodes:
+                nodes.add(parent)
+                pending.append(parent)
+
+        self.codes: list[str] = sorted(nodes)
+        self.ids: dict[str, int] = {c: i for i, c in enumerate(self.codes)}
+        self.levels: list[int] = [
+            _get_level(c, code_system) for c in self.codes
+        ]
+        self.parent_codes: list[str | None] = [
+            parent_of[c] for c in self.codes
+        ]
+        self.parents: list[int] = [
+            self.ids.get(p, -1) if p else -1 for p in self.parent_codes
+        ]
+        self.major_groups: list[str] = [
+            _get_major_group_id(c, code_system) for c in self.codes
+        ]
+        self.children: list[list[int]] = [[] for _ in self.codes]
+        for cid, pid in enumerate(self.parents):
+            if pid >= 0:
+                self.children[pid].append(cid)
+
+    def level(self, code: str) -> int:
+        """Level of *code* (must be in the hierarchy)."""
+        return self.levels[self.ids[code]]
+
+    def parent(self, code: str) -> str | None:
+        """Parent code of *code*, resolved against the known codes."""
+        return self.parent_codes[self.ids[code]]
+
+    def major_group(self, code: str) -> str:
+        """Major group id of *code*."""
+        return self.major_groups[self.ids[code]]
+
+
+@lru_cache(maxsize=32)
+def _cached_hierarchy(code_system: str, codes: frozenset[str],
+                      include_ancestors: bool) -> OccupationHierarchy:
+    return OccupationHierarchy(codes, code_system, include_ancestors)
+
+
+def hierarchy_for(codes: Iterable[str], code_system: str = "SOC",
+                  include_ancestors: bool = False) -> OccupationHierarchy:
+    """Return the (memoized) hierarchy for a code system and code set."""
+    return _cached_hierarchy(code_system, frozenset(codes), include_ancestors)
@@ -3,6 +3,8 @@
 import csv
 import re
 import sqlite3
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from . import config, db
@@ -33,49 +35,124 @@ def derive_major_group(code: str, title: str, code_system: str) -> str:
     return title
 
 
-def read_csv(csv_path: Path) -> list[dict]:
-    """Read a CSV file and return list of row dicts.
+def read_csv(csv_path: Path) -> Iterator[dict]:
+    """Read a CSV file and yield one row dict per line.
+
+    Rows are streamed so memory stays flat regardless of file size.
 
     Expected columns: occupation_code, occupation_title, employment,
                       mean_annual_wage, complexity_score
     """
-    rows = []
     with open(csv_path, "r", encoding="utf-8-sig") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            rows.append({
+            yield {
                 "occupation_code": row["occupation_code"].strip(),
                 "occupation_title": row["occupation_title"].strip(),
                 "employment": int(float(row["employment"])),
                 "mean_annual_wage": int(float(row["mean_annual_wage"])),
-            })
-    return rows
+            }
 
 
-def import_records(conn: sqlite3.Connection, rows: list[dict],
-                   region_id: int, year: int, code_system: str) -> int:
+def import_records(conn: sqlite3.Connection, rows: Iterable[dict],
+                   region_id: int, year: int, code_system: str,
+                   cache: db.DimensionCache | None = None) -> int:
     """Import parsed CSV rows into the occupations table. Returns count."""
-    count = 0
-    for row in rows:
-        major_group = derive_major_group(
-            row["occupation_code"], row["occupation_title"], code_system
+    return db.bulk_insert_occupations(conn, (
+        (year, region_id, row["occupation_code"], row["occupation_title"],
+         derive_major_group(row["occupation_code"], row["occupation_title"],
+                            code_system),
+         row["employment"], row["mean_annual_wage"])
+        for row in rows
+    ), cache=cache)
+
+
+def _iter_file_rows(csv_path: Path, code_system: str) -> Iterator[tuple]:
+    """Yield compact row tuples for one occupation CSV.
+
+    Tuples are (occupation_code, occupation_title, major_group_name,
+    employment, mean_annual_wage).
+    """
+    for row in read_csv(csv_path):
+        yield (
+            row["occupation_code"], row["occupation_title"],
+            derive_major_group(row["occupation_code"],
+                               row["occupation_title"], code_system),
+            row["employment"], row["mean_annual_wage"],
         )
-        db.insert_occupation(
-            conn,
-            year=year,
-            region_id=region_id,
-            occupation_code=row["occupation_code"],
-            occupation_title=row["occupation_title"],
-            major_group_name=major_group,
-            employment=row["employment"],
-            mean_annual_wage=row["mean_annual_wage"],
+
+
+def _parse_file(csv_path: Path, code_system: str) -> list[tuple]:
+    """Parse one occupation CSV into a list of row tuples (worker entry point)."""
+    return list(_iter_file_rows(csv_path, code_system))
+
+
+def _import_files(conn: sqlite3.Connection,
+                  jobs: list[tuple[Path, int, str]],
+                  year: int, workers: int = 1,
+                  manifest: db.ImportManifest | None = None,
+                  cache: db.DimensionCache | None = None) -> int:
+    """Import (csv_path, region_id, code_system) jobs in order. Returns count.
+
+    With workers > 1, files are parsed in a process pool while the calling
+    thread, which owns the SQLite connection, bulk-inserts each batch as
+    it arrives.  Batches are consumed in job order, so the result is the
+    same as a serial import.
+
+    With a manifest, files already imported unchanged into *year* are
+    skipped and the old rows of changed files are replaced.
+    """
+    if manifest is not None:
+        jobs = [job for job in jobs if not manifest.unchanged(job[0], year)]
+        for csv_path, region_id, _ in jobs:
+            manifest.clear(csv_path, [(year, region_id)], year)
+
+    if workers <= 1:
+        batches = (
+            _iter_file_rows(csv_path, code_system)
+            for csv_path, _, code_system in jobs
         )
-        count += 1
-    return count
+        return _write_batches(conn, jobs, batches, year, manifest, cache)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        batches = pool.map(
+            _parse_file,
+            [csv_path for csv_path, _, _ in jobs],
+            [code_system for _, _, code_system in jobs],
+        )
+        return _write_batches(conn, jobs, batches, year, manifest, cache)
+
+
+def _write_batches(conn: sqlite3.Connection,
+                   jobs: list[tuple[Path, int, str]],
+                   batches: Iterable[list[tuple]], year: int,
+                   manifest: db.ImportManifest | None,
+                   cache: db.DimensionCache | None = None) -> int:
+    """Bulk-insert one parsed batch per job, in job order. Returns count."""
+    cache = cache or db.DimensionCache(conn)
+    total = 0
+    for (csv_path, region_id, _), batch in zip(jobs, batches):
+        total += db.bulk_insert_occupations(
+            conn, ((year, region_id) + row for row in batch), cache=cache
+        )
+        if manifest is not None:
+            manifest.record(csv_path, [(year, region_id)], year)
+    return total
+
+
+def _country_id(cache: db.DimensionCache, country_code: str) -> int:
+    """Return the country id for a configured country code."""
+    country_cfg = config.COUNTRIES[country_code]
+    return cache.country_id(
+        country_code, country_cfg["name"],
+        country_cfg["code_system"], country_cfg.get("currency", "USD"),
+    )
 
 
 def import_national(conn: sqlite3.Connection, country_code: str,
-                    year: int) -> int:
+                    year: int,
+                    cache: db.DimensionCache | None = None,
+                    manifest: db.ImportManifest | None = None) -> int:
     """Import one country's national CSV. Returns record count."""
     country_cfg = config.COUNTRIES[country_code]
     csv_path = country_cfg["national_csv"]
@@ -83,43 +160,45 @@ def import_national(conn: sqlite3.Connection, country_code: str,
         print(f"  Skipping {country_code} national: {csv_path} not found")
         return 0
 
-    country_id = db.ensure_country(
-        conn, country_code, country_cfg["name"],
-        country_cfg["code_system"], country_cfg.get("currency", "USD"),
-    )
-    region_id = db.ensure_region(
-        conn, country_id, country_cfg["national_region_name"], "National"
+    cache = cache or db.DimensionCache(conn)
+    country_id = _country_id(cache, country_code)
+    region_id = cache.region_id(
+        country_id, country_cfg["national_region_name"], "National"
     )
 
-    rows = read_csv(csv_path)
-    count = import_records(conn, rows, region_id, year,
-                           country_cfg["code_system"])
+    count = _import_files(
+        conn, [(csv_path, region_id, country_cfg["code_system"])], year,
+        manifest=manifest, cache=cache,
+    )
     print(f"  {country_code} National: {count} records")
     return count
 
 
 def import_states(conn: sqlite3.Connection, country_code: str,
-                  year: int) -> int:
-    """Import all state CSVs for a country. Returns total record count."""
+                  year: int,
+                  cache: db.DimensionCache | None = None,
+                  workers: int = 1,
+                  manifest: db.ImportManifest | None = None) -> int:
+    """Import all state CSVs for a country. Returns total record count.
+
+    Region ids are assigned up front in sorted file order; with
+    workers > 1 the files are then parsed in parallel.
+    """
     country_cfg = config.COUNTRIES[country_code]
     states_dir = country_cfg.get("states_dir")
     if not states_dir or not states_dir.exists():
         return 0
 
-    country_id = db.ensure_country(
-        conn, country_code, country_cfg["name"],
-        country_cfg["code_system"], country_cfg.get("currency", "USD"),
-    )
+    cache = cache or db.DimensionCache(conn)
+    country_id = _country_id(cache, country_code)
 
-    total = 0
+    jobs = []
     for csv_path in sorted(states_dir.glob("*_occupational_data.csv")):
         stem = csv_path.stem.replace("_occupational_data", "")
         display_name = config.display_name_for_state(stem)
-        region_id = db.ensure_region(conn, country_id, display_name, "State")
-        rows = read_csv(csv_path)
-        count = import_records(conn, rows, region_id, year,
-                               country_cfg["code_system"])
-        total += count
+        region_id = cache.region_id(country_id, display_name, "State")
+        jobs.append((csv_path, region_id, country_cfg["code_system"]))
+    total = _import_files(conn, jobs, year, workers, manifest, cache)
 
     if total > 0:
         print(f"  {country_code} States: {total} records "
@@ -127,29 +206,32 @@ def import_states(conn: sqlite3.Connection, country_code: str,
     return total
 
 
-def import_metros(conn: sqlite3.Connection, year: int) -> int:
-    """Import all metro CSVs. Maps each to the correct country. Returns count."""
+def import_metros(conn: sqlite3.Connection, year: int,
+                  cache: db.DimensionCache | None = None,
+                  workers: int = 1,
+                  manifest: db.ImportManifest | None = None) -> int:
+    """Import all metro CSVs. Maps each to the correct country. Returns count.
+
+    Region ids are assigned up front in sorted file order; with
+    workers > 1 the files are then parsed in parallel.
+    """
     metros_dir = config.DATA_DIR / "metros"
     if not metros_dir.exists():
         return 0
 
-    total = 0
+    cache = cache or db.DimensionCache(conn)
+    jobs = []
     for csv_path in sorted(metros_dir.glob("*_occupational_data.csv")):
         stem = config.metro_stem(csv_path.name)
         country_code = config.country_for_metro(stem)
         country_cfg = config.COUNTRIES[country_code]
 
-        country_id = db.ensure_country(
-            conn, country_code, country_cfg["name"],
-            country_cfg["code_system"], country_cfg.get("currency", "USD"),
-        )
+        country_id = _country_id(cache, country_code)
 
         display_name = config.display_name_for_metro(stem)
-        region_id = db.ensure_region(conn, country_id, display_name, "Metro")
-        rows = read_csv(csv_path)
-        count = import_records(conn, rows, region_id, year,
-                               country_cfg["code_system"])
-        total += count
+        region_id = cache.region_id(country_id, display_name, "Metro")
+        jobs.append((csv_path, region_id, country_cfg["code_system"]))
+    total = _import_files(conn, jobs, year, workers, manifest, cache)
 
     if total > 0:
         metro_count = len(list(metros_dir.glob("*_occupational_data.csv")))
@@ -158,56 +240,74 @@ def import_metros(conn: sqlite3.Connection, year: int) -> int:
 
 
 def import_combined_csv(conn: sqlite3.Connection, csv_path: Path,
-                        year: int) -> int:
+                        year: int,
+                        cache: db.DimensionCache | None = None,
+                        manifest: db.ImportManifest | None = None) -> int:
     """Import a combined CSV with region_type and region columns.
 
     Expected columns: year, region_type, region, occupation_code,
                       occupation_title, major_group_name, employment,
                       mean_annual_wage
     """
-    country_code = "USA"
-    country_cfg = config.COUNTRIES[country_code]
-    country_id = db.ensure_country(
-        conn, country_code, country_cfg["name"],
-        country_cfg["code_system"], country_cfg.get("currency", "USD"),
-    )
-
-    total = 0
-    with open(csv_path, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            region_type = row["region_type"].strip()
-            region_name = row["region"].strip()
-            region_id = db.ensure_region(conn, country_id, region_name, region_type)
-            db.insert_occupation(
-                conn,
-                year=int(row.get("year", year)),
-                region_id=region_id,
-                occupation_code=row["occupation_code"].strip(),
-                occupation_title=row["occupation_title"].strip(),
-                major_group_name=row["major_group_name"].strip(),
-                employment=int(float(row["employment"])),
-                mean_annual_wage=int(float(row["mean_annual_wage"])),
-            )
-            total += 1
+    if manifest is not None:
+        if manifest.unchanged(csv_path):
+            print(f"  Combined CSV: {csv_path.name} unchanged, skipped")
+            return 0
+        manifest.clear(csv_path)
+
+    cache = cache or db.DimensionCache(conn)
+    country_id = _country_id(cache, "USA")
+    scopes: set[tuple[int, int]] = set()
+
+    def _rows():
+        with open(csv_path, "r", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                region_type = row["region_type"].strip()
+                region_name = row["region"].strip()
+                region_id = cache.region_id(country_id, region_name,
+                                            region_type)
+                row_year = int(row.get("year", year))
+                scopes.add((row_year, region_id))
+                yield (
+                    row_year,
+                    region_id,
+                    row["occupation_code"].strip(),
+                    row["occupation_title"].strip(),
+                    row["major_group_name"].strip(),
+                    int(float(row["employment"])),
+                    int(float(row["mean_annual_wage"])),
+                )
+
+    total = db.bulk_insert_occupations(conn, _rows(), cache=cache)
+    if manifest is not None:
+        manifest.record(csv_path, scopes)
 
     print(f"  Combined CSV: {total} records from {csv_path.name}")
     return total
 
 
-def import_all(conn: sqlite3.Connection, year: int) -> int:
-    """Import everything: all countries' national + states + metros."""
+def import_all(conn: sqlite3.Connection, year: int, workers: int = 1,
+               manifest: db.ImportManifest | None = None,
+               cache: db.DimensionCache | None = None) -> int:
+    """Import everything: all countries' national + states + metros.
+
+    workers > 1 parses state and metro files in a process pool; with a
+    manifest, only new or changed files are imported.
+    """
     total = 0
+    cache = cache or db.DimensionCache(conn)
 
     # National data for each country
     for country_code in config.COUNTRIES:
-        total += import_national(conn, country_code, year)
+        total += import_national(conn, country_code, year, cache, manifest)
 
     # State data (currently only USA has states)
     for country_code in config.COUNTRIES:
-        total += import_states(conn, country_code, year)
+        total += import_states(conn, country_code, year, cache, workers,
+                               manifest)
 
     # Metro data (auto-mapped to countries)
-    total += import_metros(conn, year)
+    total += import_metros(conn, year, cache, workers, manifest)
 
     return total
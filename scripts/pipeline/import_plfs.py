@@ -313,7 +313,8 @@ def _normalize_person_weight(raw_weight: float | None,
     return raw_weight
 
 
-def import_india_national(conn: sqlite3.Connection, year: int = 2024) -> int:
+def import_india_national(conn: sqlite3.Connection, year: int = 2024,
+                          cache: db.DimensionCache | None = None) -> int:
     """Import India national data from Table 25 + Table 50 CSVs.
 
     Table 50 values are monthly wages; this importer stores annual wages
@@ -333,10 +334,11 @@ def import_india_national(conn: sqlite3.Connection, year: int = 2024) -> int:
     wages = _read_table50(table50_path)
     labels = _load_nco_label_map(ind_config.get("nco_labels_csv", Path("")))
 
-    country_id = db.ensure_country(conn, "IND", "India", "NCO", "INR")
-    region_id = db.ensure_region(conn, country_id, "India", "National")
+    cache = cache or db.DimensionCache(conn)
+    country_id = cache.country_id("IND", "India", "NCO", "INR")
+    region_id = cache.region_id(country_id, "India", "National")
 
-    count = 0
+    rows = []
     for dist in distributions:
         code = dist["nco_code"]
         name = labels.get(dist["nco_code"], dist["name"])
@@ -349,20 +351,11 @@ def import_india_national(conn: sqlite3.Connection, year: int = 2024) -> int:
         division = _nco_division(code)
         annual_wage = wages.get(division, 0) * 12
         major_group_name = config.NCO_MAJOR_GROUPS.get(division, f"Division {division}")
-        gdp = employment * annual_wage
-
-        conn.execute(
-            "INSERT OR REPLACE INTO occupations "
-            "(year, region_id, occupation_code, occupation_title, "
-            "major_group_name, employment, mean_annual_wage, gdp, complexity_score) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0.5)",
-            (year, region_id, code, name,
-             major_group_name, employment, annual_wage, gdp),
-        )
-        count += 1
 
-    conn.commit()
-    return count
+        rows.append((year, region_id, code, name,
+                     major_group_name, employment, annual_wage))
+
+    return db.bulk_insert_occupations(conn, rows, cache=cache)
 
 
 def import_india_subnational_from_microdata(
@@ -377,6 +370,7 @@ def import_india_subnational_from_microdata(
     city_region_type: str = "Metro",
     district_top_n: int | None = None,
     district_population_min: float | None = None,
+    cache: db.DimensionCache | None = None,
 ) -> dict[str, int]:
     """Import weighted state/city aggregates from PLFS person-level microdata CSV.
 
@@ -413,8 +407,8 @@ def import_india_subnational_from_microdata(
         district_population_min = float(ind_config.get("district_population_min", 0) or 0)
 
     country_cfg = config.COUNTRIES["IND"]
-    country_id = db.ensure_country(
-        conn,
+    cache = cache or db.DimensionCache(conn)
+    country_id = cache.country_id(
         "IND",
         country_cfg["name"],
         country_cfg["code_system"],
@@ -532,7 +526,7 @@ def import_india_subnational_from_microdata(
     national_count = 0
     state_count = 0
     city_count = 0
-    region_cache: dict[tuple[str, str], int] = {}
+    rows: list[tuple] = []
 
     for (region_type, region_name, occ_code), stats in accum.items():
         obs_n = int(stats["obs_n"])
@@ -553,31 +547,18 @@ def import_india_subnational_from_microdata(
         major_id = _nco_division(occ_code)
         major_group_name = config.NCO_MAJOR_GROUPS.get(major_id, f"Division {major_id}")
         occ_title = title_by_code.get(occ_code, _default_nco_title(occ_code))
-        gdp = employment * annual_wage
 
-        region_key = (region_type, region_name)
-        if region_key not in region_cache:
-            region_cache[region_key] = db.ensure_region(
-                conn, country_id, region_name, region_type
-            )
-        region_id = region_cache[region_key]
-
-        conn.execute(
-            "INSERT OR REPLACE INTO occupations "
-            "(year, region_id, occupation_code, occupation_title, "
-            "major_group_name, employment, mean_annual_wage, gdp, complexity_score) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0.5)",
-            (
-                year,
-                region_id,
-                occ_code,
-                occ_title,
-                major_group_name,
-                employment,
-                annual_wage,
-                gdp,
-            ),
-        )
+        region_id = cache.region_id(country_id, region_name, region_type)
+
+        rows.append((
+            year,
+            region_id,
+            occ_code,
+            occ_title,
+            major_group_name,
+            employment,
+            annual_wage,
+        ))
 
         if region_type == "National":
             national_count += 1
@@ -586,11 +567,12 @@ def import_india_subnational_from_microdata(
         elif region_type == city_region_type:
             city_count += 1
 
-    conn.commit()
+    db.bulk_insert_occupations(conn, rows, cache=cache)
     return {"national": national_count, "state": state_count, "city": city_count}
 
 
-def import_all_india(conn: sqlite3.Connection, year: int = 2024) -> int:
+def import_all_india(conn: sqlite3.Connection, year: int = 2024,
+                     cache: db.DimensionCache | None = None) -> int:
     """Orchestrate India data import.
 
     Returns total records imported.
@@ -598,18 +580,21 @@ def import_all_india(conn: sqlite3.Connection, year: int = 2024) -> int:
     print(f"Importing India PLFS data for year {year}...")
 
     count = 0
+    cache = cache or db.DimensionCache(conn)
 
     ind_config = config.COUNTRIES["IND"]
     table25_path = ind_config["table25_csv"]
     table50_path = ind_config["table50_csv"]
     if table25_path.exists() and table50_path.exists():
-        national_count = import_india_national(conn, year)
+        national_count = import_india_national(conn, year, cache)
         count += national_count
         print(f"  National: {national_count} occupation records")
     else:
         print("  National tables not found; skipping published-table import")
 
-    sub_counts = import_india_subnational_from_microdata(conn, year)
+    sub_counts = import_india_subnational_from_microdata(
+        conn, year, cache=cache
+    )
     if sub_counts.get("national", 0) > 0 or sub_counts["state"] > 0 or sub_counts["city"] > 0:
         if sub_counts.get("national", 0) > 0:
             print(f"  National (microdata): {sub_counts['national']} occupation records")
@@ -2,17 +2,35 @@
 
 import argparse
 import sys
+import time
 from pathlib import Path
 
 # Add project root to path so we can run as script
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 from scripts.pipeline import (
-    config, db, import_csv, export_csv, export_json, export_jsonp,
-    export_split, validate,
+    config, db, compress, import_csv, export_csv, export_json, export_jsonp,
+    export_manifest, export_split, validate,
 )
 
 
+def _parse_years(spec: str, conn, country_code: str) -> list[int]:
+    """Resolve --years ("2019-2024", "2022,2024", "all") to the years
+    with data for *country_code*, ascending."""
+    available = export_json.available_years(conn, country_code)
+    if spec == "all":
+        return available
+    years = set()
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        years.update(range(int(first), int(last or first) + 1))
+    missing = sorted(years - set(available))
+    if missing:
+        print(f"  WARNING: no {country_code} data for "
+              f"{', '.join(map(str, missing))}; skipping")
+    return sorted(years & set(available))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="BLS Data Pipeline: Fetch -> Import -> Compute -> Export"
@@ -21,6 +39,12 @@ def main():
         "--year", type=int, default=2024,
         help="Data year (default: 2024)",
     )
+    parser.add_argument(
+        "--years", type=str, default=None,
+        help="Export several years in one pass: a range (2019-2024), a "
+             "list (2022,2024) or 'all' years in the database "
+             "(default: --year only)",
+    )
     parser.add_argument(
         "--fresh", action="store_true",
         help="Drop and recreate all tables before import",
@@ -29,6 +53,11 @@ def main():
         "--fetch", action="store_true",
         help="Download BLS + O*NET data before import",
     )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Skip unchanged CSV sources and renormalize only affected "
+             "regions (uses the import_manifest table)",
+    )
     parser.add_argument(
         "--import-only", action="store_true",
         help="Only import CSVs into SQLite (skip export)",
@@ -57,6 +86,59 @@ def main():
         "--export-csv", action="store_true", default=False,
         help="Generate research CSV files",
     )
+    parser.add_argument(
+        "--json-style", choices=config.JSON_STYLES, default="compact",
+        help="Frontend JSON encoding: compact (minimal separators, "
+             f"{config.JSON_FLOAT_DIGITS}-digit floats) or pretty (indent=2) "
+             "(default: compact)",
+    )
+    parser.add_argument(
+        "--report-savings", action="store_true", default=False,
+        help="With compact JSON, also report the bytes saved vs pretty "
+             "JSON (encodes every file a second time)",
+    )
+    parser.add_argument(
+        "--region-data", choices=config.REGION_DATA_ENCODINGS, default="rows",
+        help="regionData layout: rows (array of objects) or columns "
+             "(parallel arrays, advertised in bls-data.json) (default: rows)",
+    )
+    parser.add_argument(
+        "--quantize-complexity", action="store_true", default=False,
+        help="With --region-data columns, store complexity as integers "
+             f"(x{config.COMPLEXITY_SCALE})",
+    )
+    parser.add_argument(
+        "--export-binary", action="store_true", default=False,
+        help="Also write typed-array bundles (.bin + .manifest.json) "
+             "beside each country-year JSON file",
+    )
+    parser.add_argument(
+        "--shard-regions", action="store_true", default=False,
+        help="Also write each country-year JSON file as an index plus "
+             "one shard per region (for lazy loading)",
+    )
+    parser.add_argument(
+        "--hashed-names", action="store_true", default=False,
+        help="Write data files as bls-data-<cc>-<year>.<hash8>.json and "
+             "point bls-data.json at them (immutable caching)",
+    )
+    parser.add_argument(
+        "--keep-generations", type=int,
+        default=config.HASHED_FILE_GENERATIONS,
+        help="With --hashed-names, keep superseded data files for this "
+             "many exports before removing them "
+             f"(default: {config.HASHED_FILE_GENERATIONS})",
+    )
+    parser.add_argument(
+        "--shared-occupations", action="store_true", default=False,
+        help="Write occupation titles/hierarchy once per country "
+             "(occupations-<cc>.json); data files carry only codes",
+    )
+    parser.add_argument(
+        "--precompress", action="store_true", default=False,
+        help="Write .gz (and .br, if the brotli module is installed) "
+             "sidecars next to every exported file",
+    )
     parser.add_argument(
         "--split-levels", action="store_true", default=True,
         help="Generate per-level split JSON files (default: on)",
@@ -81,6 +163,19 @@ def main():
         "--timeseries", action="store_true", default=False,
         help="Export time-series JSON files (BLS OES + ILOSTAT)",
     )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Processes for parsing state/metro CSVs (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--export-workers", type=int, default=1,
+        help="Processes for building/writing the country-year JSON files "
+             "(default: 1, serial)",
+    )
+    parser.add_argument(
+        "--explain", action="store_true", default=False,
+        help="Print EXPLAIN QUERY PLAN for every exporter query",
+    )
     parser.add_argument(
         "--db-path", type=str, default=None,
         help=f"SQLite database path (default: {config.DB_PATH})",
@@ -101,6 +196,8 @@ def main():
 
     print("=== BLS Data Pipeline ===")
     print(f"  Year: {args.year}")
+    if args.years:
+        print(f"  Export years: {args.years}")
     print(f"  Country: {args.country} ({country_long})")
     print(f"  DB: {db_path}")
     print(f"  Export countries: {', '.join(export_countries)}")
@@ -144,7 +241,9 @@ def main():
 
     # Ensure data directory exists
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = db.connect(db_path)
+    conn = db.connect(
+        db_path, profile="read_mostly" if args.export_only else "bulk_load"
+    )
 
     try:
         # --- IMPORT PHASE ---
@@ -155,29 +254,66 @@ def main():
 
             print("Creating schema...")
             db.create_schema(conn)
+            if args.fresh:
+                # Empty tables: build secondary indexes once, after the load
+                db.drop_indexes(conn)
 
             print(f"\nImporting data for year {args.year}...")
+            import_start = time.perf_counter()
+            manifest = db.ImportManifest(conn) if args.incremental else None
+            cache = db.DimensionCache(conn)
 
             if country_long == "IND":
                 # India PLFS pipeline
                 from scripts.pipeline import import_plfs
-                total = import_plfs.import_all_india(conn, year=args.year)
+                total = import_plfs.import_all_india(
+                    conn, year=args.year, cache=cache
+                )
             elif combined_csv_path and combined_csv_path.exists():
                 # Import from fetched combined CSV
                 total = import_csv.import_combined_csv(
-                    conn, combined_csv_path, args.year
+                    conn, combined_csv_path, args.year, cache=cache,
+                    manifest=manifest,
                 )
             else:
                 # Import from individual CSV files (legacy bls2 format)
-                total = import_csv.import_all(conn, args.year)
+                total = import_csv.import_all(
+                    conn, args.year, workers=args.workers, manifest=manifest,
+                    cache=cache,
+                )
 
             conn.commit()
-            print(f"\nTotal imported: {total} records")
+            import_secs = time.perf_counter() - import_start
+            rate = total / import_secs if import_secs > 0 else 0
+            print(f"\nTotal imported: {total} records "
+                  f"in {import_secs:.1f}s ({rate:,.0f} rows/sec)")
+            writes = cache.write_summary(manifest.cleared if manifest else 0)
+            print(f"  {writes['inserted']} inserted, {writes['updated']} "
+                  f"updated, {writes['unchanged']} unchanged")
+
+            if args.fresh:
+                print("\nRebuilding indexes...")
+                db.create_indexes(conn)
 
             if country_long != "IND":
                 # Complexity scores already computed in import_plfs
-                print("\nComputing complexity scores (GDP normalization)...")
-                db.compute_complexity_scores(conn)
+                if manifest is not None:
+                    print(f"\n{manifest.skipped} source files unchanged; "
+                          f"renormalizing {len(manifest.affected)} "
+                          f"region-years...")
+                    db.compute_complexity_scores(conn, scope=manifest.affected)
+                else:
+                    print("\nComputing complexity scores (GDP normalization)...")
+                    db.compute_complexity_scores(conn)
+
+            # Roll up unpublished hierarchy levels (after complexity);
+            # incremental runs only redo the region-years that changed
+            print("\nSynthesizing missing hierarchy levels...")
+            scope = None
+            if manifest is not None and country_long != "IND":
+                scope = manifest.affected
+            synth_count = db.synthesize_levels(conn, scope=scope)
+            print(f"  {synth_count} synthetic occupation rows")
 
             # Validate DB
             print("\nValidating database...")
@@ -201,6 +337,26 @@ def main():
 
         # --- EXPORT PHASE ---
         print("\n--- EXPORT PHASE ---\n")
+        if not args.export_only:
+            # Reopen with the read-only export profile
+            conn.close()
+            conn = db.connect(db_path, profile="read_mostly")
+
+        if args.explain:
+            print("Exporter query plans:")
+            db.explain_exports(conn, [country_long])
+            print()
+
+        export_years = [args.year]
+        if args.years:
+            export_years = _parse_years(args.years, conn, country_long)
+            print(f"Export years: {', '.join(map(str, export_years))}\n")
+
+        # Outputs are only rewritten when their bytes change; the manifest
+        # records what each exporter produced and removes stale files.
+        # (exporter, paths, rows, keep_generations) per exporter run:
+        manifest = export_manifest.ExportManifest()
+        exported: list[tuple[str, list[Path], dict, int]] = []
 
         if args.export_csv:
             print("Exporting intermediate CSVs...")
@@ -208,37 +364,82 @@ def main():
             for filename, count in csv_results.items():
                 print(f"  {filename}: {count} rows")
 
-        if args.export_json:
+        if args.export_json and export_years:
+            years_label = ", ".join(map(str, export_years))
             print(f"Exporting country-tagged JSON "
-                  f"(country: {args.country}, year: {args.year})...")
-            stats = export_json.export_all(
-                conn, country_code=country_long, year=args.year
-            )
-            print(f"\n  Main file: {stats['main_count']} region-records")
-            for lvl, cnt in stats.get("level_counts", {}).items():
-                print(f"  Level {lvl}: {cnt} region-records")
-            print(f"  Levels in data: {stats['levels_available']}")
-
-            # Validate the main country-year JSON
+                  f"(country: {args.country}, year: {years_label}, "
+                  f"style: {args.json_style}, regionData: {args.region_data})...")
+            with export_manifest.collect() as paths:
+                year_stats = export_json.export_years(
+                    conn, country_code=country_long, years=export_years,
+                    json_style=args.json_style, encoding=args.region_data,
+                    complexity_scale=(config.COMPLEXITY_SCALE
+                                      if args.quantize_complexity else None),
+                    binary=args.export_binary, shard=args.shard_regions,
+                    workers=args.export_workers, hashed=args.hashed_names,
+                    shared_occupations=args.shared_occupations,
+                    measure_saving=args.report_savings,
+                )
             short = config.country_short(country_long)
-            main_path = config.json_country_year_path(short, args.year)
-            print("\nValidating JSON output...")
-            errors = validate.validate_json(main_path)
-            if errors:
-                print("  VALIDATION ERRORS:")
-                for e in errors:
-                    print(f"    - {e}")
-            else:
-                print("  JSON validation passed")
+            keep = args.keep_generations if args.hashed_names else 1
+            # One manifest scope per country-year, as in single-year runs;
+            # files shared by the years (bls-data.json, the occupation
+            # dictionary) go with the first
+            shared = set(paths).difference(
+                *(stats["paths"] for stats in year_stats.values())
+            )
+            for year, stats in year_stats.items():
+                year_paths = stats["paths"]
+                if year == export_years[0]:
+                    year_paths += [p for p in paths if p in shared]
+                exported.append((f"json:{short}-{year}", year_paths,
+                                 stats["rows"], keep))
+
+                print(f"\n  {year} main file: {stats['main_count']} "
+                      f"region-records")
+                for lvl, cnt in stats.get("level_counts", {}).items():
+                    print(f"  Level {lvl}: {cnt} region-records")
+                print(f"  Levels in data: {stats['levels_available']}")
+                if stats["bytes_saved"]:
+                    print(f"  {stats['bytes_written']:,} bytes written, "
+                          f"{stats['bytes_saved']:,} saved vs pretty JSON")
+
+                # Validate the main country-year JSON
+                main_path = stats["main_path"]
+                print(f"\nValidating JSON output ({main_path.name})...")
+                errors = validate.validate_json(main_path)
+                if errors:
+                    print("  VALIDATION ERRORS:")
+                    for e in errors:
+                        print(f"    - {e}")
+                else:
+                    print("  JSON validation passed")
+
+                if args.export_binary:
+                    from scripts.pipeline import export_binary
+                    manifest_path, _ = export_binary.bundle_paths(main_path)
+                    print("\nValidating binary bundle...")
+                    errors = validate.validate_bundle(manifest_path, main_path)
+                    if errors:
+                        print("  VALIDATION ERRORS:")
+                        for e in errors:
+                            print(f"    - {e}")
+                    else:
+                        print("  Binary bundle validation passed")
 
         if not args.skip_jsonp:
             print(f"\nExporting JSONP "
                   f"(countries: {', '.join(export_countries)})...")
-            record_count = export_jsonp.export_jsonp(conn, export_countries)
+            with export_manifest.collect() as paths:
+                record_count = export_jsonp.export_jsonp(conn, export_countries)
+            exported.append(("jsonp", paths,
+                             {config.JSONP_PATH: record_count}, 1))
             print(f"  {config.JSONP_PATH.name}: {record_count} records")
 
             print(f"\nExporting split files (meta.js + per-region)...")
-            split_stats = export_split.export_split(conn, export_countries)
+            with export_manifest.collect() as paths:
+                split_stats = export_split.export_split(conn, export_countries)
+            exported.append(("split", paths, split_stats["rows"], 1))
             print(f"  meta.js: {split_stats['occ_count']} occupations")
             print(f"  regions/: {split_stats['region_count']} files")
 
@@ -254,25 +455,45 @@ def main():
                 print("  JSONP validation passed")
 
         if args.validate:
-            print("\nRunning data completeness validation...")
-            warnings = validate.validate_completeness(
-                conn, country_long, args.year
-            )
-            if warnings:
-                print(f"  {len(warnings)} discrepancies found:")
-                for w in warnings[:20]:
-                    print(f"    - {w}")
-                if len(warnings) > 20:
-                    print(f"    ... and {len(warnings) - 20} more")
-            else:
-                print("  Data completeness validation passed")
+            for year in export_years:
+                print(f"\nRunning data completeness validation ({year})...")
+                warnings = validate.validate_completeness(
+                    conn, country_long, year
+                )
+                if warnings:
+                    print(f"  {len(warnings)} discrepancies found:")
+                    for w in warnings[:20]:
+                        print(f"    - {w}")
+                    if len(warnings) > 20:
+                        print(f"    ... and {len(warnings) - 20} more")
+                else:
+                    print("  Data completeness validation passed")
 
         if args.timeseries:
             print("\n--- TIME SERIES EXPORT ---\n")
             from scripts.pipeline import export_timeseries
             if country_long == "USA" or args.country.lower() == "us":
-                export_timeseries.export_oes()
-            export_timeseries.export_ilostat()
+                with export_manifest.collect() as paths:
+                    export_timeseries.export_oes()
+                exported.append(("timeseries:oes", paths, {}, 1))
+            with export_manifest.collect() as paths:
+                export_timeseries.export_ilostat()
+            exported.append(("timeseries:ilostat", paths, {}, 1))
+
+        if args.precompress and exported:
+            print(f"\n--- COMPRESSION ({', '.join(compress.codecs())}) ---\n")
+            # Before manifest.update(), which would mark everything recorded
+            compress.compress_outputs(
+                [p for _, paths, _, _ in exported for p in paths], manifest
+            )
+            for _, paths, _, _ in exported:
+                paths.extend([side for p in list(paths)
+                              for side in compress.sidecar_paths(p)])
+
+        for exporter, paths, rows, keep in exported:
+            manifest.update(exporter, paths, rows, keep_generations=keep)
+        manifest.save()
+        print(f"\nExport manifest: {manifest.summary()}")
 
         print("\nPipeline complete!")
 
@@ -7,7 +7,7 @@ from collections import defaultdict
 from pathlib import Path
 
 from . import config
-from .export_json import _soc_level, _soc_parent
+from .hierarchy import hierarchy_for
 
 SOC_PATTERN = re.compile(r"^\d{2}-\d{4}$")
 ISCO_PATTERN = re.compile(r"^OC\d$")
@@ -155,8 +155,14 @@ def validate_json(json_path: Path | None = None) -> list[str]:
         errors.append(f"Invalid JSON: {e}")
         return errors
 
-    # Check required top-level keys
-    for key in ["metadata", "regions", "occupations", "majorGroups", "regionData"]:
+    # Check required top-level keys (a shared occupation dictionary
+    # replaces occupations + majorGroups with occupationCodes)
+    dictionary_name = data.get("metadata", {}).get("occupationDictionary")
+    required = ["metadata", "regions", "occupations", "majorGroups",
+                "regionData"]
+    if dictionary_name:
+        required[2:4] = ["occupationCodes"]
+    for key in required:
         if key not in data:
             errors.append(f"Missing top-level key: {key}")
 
@@ -164,8 +170,6 @@ def validate_json(json_path: Path | None = None) -> list[str]:
         meta = data["metadata"]
         if "years" not in meta:
             errors.append("metadata missing 'years'")
-        if "lastUpdated" not in meta:
-            errors.append("metadata missing 'lastUpdated'")
 
     if "regions" in data and len(data["regions"]) == 0:
         errors.append("regions array is empty")
@@ -173,9 +177,68 @@ def validate_json(json_path: Path | None = None) -> list[str]:
     if "occupations" in data and len(data["occupations"]) == 0:
         errors.append("occupations array is empty")
 
+    if dictionary_name:
+        dictionary_path = json_path.parent / dictionary_name
+        try:
+            dictionary = json.loads(dictionary_path.read_text(encoding="utf-8"))
+            missing = set(data.get("occupationCodes", [])) - set(
+                dictionary["occupations"])
+            if missing:
+                errors.append(f"{len(missing)} occupation codes missing "
+                              f"from {dictionary_name}")
+        except (OSError, ValueError, KeyError) as e:
+            errors.append(f"Unreadable occupation dictionary "
+                          f"{dictionary_name}: {e}")
+
     if "regionData" in data and len(data["regionData"]) == 0:
         errors.append("regionData is empty")
 
+    if data.get("metadata", {}).get("regionDataEncoding") == "columns":
+        occ_count = (len(data.get("occupationCodes", []))
+                     or len(data.get("occupations", []))
+                     or len(data["metadata"].get("occupationMap", {})))
+        for rid, year_data in data.get("regionData", {}).items():
+            for year, cols in year_data.items():
+                lengths = {len(v) for v in cols.values()}
+                if len(lengths) > 1:
+                    errors.append(f"{rid} {year}: column lengths differ")
+                elif any(not 0 <= i < occ_count for i in cols.get("occ", [])):
+                    errors.append(f"{rid} {year}: occupation index out of range")
+
+    return errors
+
+
+def validate_bundle(manifest_path: Path,
+                    json_path: Path | None = None) -> list[str]:
+    """Validate a binary bundle, optionally against its JSON file.
+
+    The bundle is read back with export_binary.read_bundle(); with
+    json_path, its regionData must match the JSON file's row for row.
+    Returns list of errors.
+    """
+    from .export_binary import read_bundle
+
+    if not manifest_path.exists():
+        return [f"Bundle manifest not found: {manifest_path}"]
+
+    try:
+        bundle = read_bundle(manifest_path)
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        return [f"Unreadable bundle {manifest_path.name}: {e}"]
+
+    errors = []
+    if not bundle["regionData"]:
+        errors.append("bundle regionData is empty")
+
+    if json_path is not None:
+        data = json.loads(json_path.read_text(encoding="utf-8"))
+        if data["metadata"].get("regionDataEncoding", "rows") != "rows":
+            from .export_json import _from_columns
+            _from_columns(data)
+        if bundle["regionData"] != data["regionData"]:
+            errors.append(f"{manifest_path.name} does not match "
+                          f"{json_path.name}")
+
     return errors
 
 
@@ -184,12 +247,17 @@ def validate_completeness(conn: sqlite3.Connection,
                           year: int = 2024) -> list[str]:
     """Compare parent employment with sum of children for each region.
 
+    Children come from one OccupationHierarchy built over the
+    country-year's codes, so each region is checked in linear time.
+
     Returns list of warning strings for discrepancies > 10%.
     """
-    from .export_json import _query_records
+    from .export_json import _detect_code_system, _query_records
 
-    records = _query_records(conn, [country_code])
-    records = [r for r in records if r["year"] == year]
+    records = _query_records(conn, [country_code], year)
+    hierarchy = hierarchy_for({r["SOC_Code"] for r in records},
+                              _detect_code_system(conn, country_code))
+    codes, children = hierarchy.codes, hierarchy.children
 
     # Group by region
     by_region: dict[str, list[dict]] = defaultdict(list)
@@ -201,14 +269,11 @@ def validate_completeness(conn: sqlite3.Connection,
         by_code = {r["SOC_Code"]: r for r in region_records}
         # For each parent code that exists in this region
         for code, rec in by_code.items():
-            level = _soc_level(code)
-            if level >= 4:
-                continue  # detailed codes have no children
-            # Find children of this code
+            # Sum the children published for this region
             children_emp = sum(
-                r["TOT_EMP"]
-                for c, r in by_code.items()
-                if c != code and _soc_parent(c) == code
+                by_code[codes[child]]["TOT_EMP"]
+                for child in children[hierarchy.ids[code]]
+                if codes[child] in by_code
             )
             if children_emp > 0:
                 parent_emp = rec["TOT_EMP"]
@@ -6,7 +6,10 @@ import React, {
   useRef,
   useState,
 } from 'react';
-import { BLSData, BLSMetaCatalog, CountryMetadata } from './types';
+import {
+  BLSData, BLSMetaCatalog, BLSOccupationDictionary, BLSRegionColumns,
+  BLSRegionOccupation, CountryMetadata,
+} from './types';
 
 interface DataState {
   data: BLSData | null;
@@ -51,6 +54,86 @@ const StaticDataContext = createContext<DataState>({
 
 export const useStaticData = () => useContext(StaticDataContext);
 
+/** Shared occupation dictionaries, fetched once per file name */
+const dictionaryCache = new Map<string, Promise<BLSOccupationDictionary>>();
+
+function fetchDictionary(name: string): Promise<BLSOccupationDictionary> {
+  let pending = dictionaryCache.get(name);
+  if (!pending) {
+    pending = fetch(`${BASE_URL}/${name}`).then((res) => {
+      if (!res.ok) throw new Error(`HTTP ${res.status} fetching ${name}`);
+      return res.json();
+    });
+    // Let a failed fetch be retried on the next load
+    pending.catch(() => dictionaryCache.delete(name));
+    dictionaryCache.set(name, pending);
+  }
+  return pending;
+}
+
+/**
+ * Fill in occupations + majorGroups for files that only carry
+ * occupationCodes, from the shared dictionary (the catalog's name for it
+ * if given, else the file's own). Other files pass through as-is.
+ */
+async function hydrateOccupations(
+  raw: BLSData,
+  dictionaryName?: string,
+): Promise<BLSData> {
+  if (!raw.occupationCodes) return raw;
+  const name = dictionaryName || raw.metadata.occupationDictionary;
+  if (!name) throw new Error('Data file has no occupation dictionary');
+
+  const dictionary = await fetchDictionary(name);
+  const occupations = raw.occupationCodes.map((socCode) => ({
+    socCode,
+    ...dictionary.occupations[socCode],
+  }));
+  const groupIds = new Set(occupations.map((o) => o.majorGroupId));
+  return {
+    ...raw,
+    occupations,
+    majorGroups: dictionary.majorGroups.filter((g) => groupIds.has(g.groupId)),
+  };
+}
+
+/**
+ * Expand columnar regionData (regionDataEncoding "columns") into the
+ * row objects the rest of the app reads. Row files pass through as-is.
+ */
+function decodeRegionData(raw: BLSData): BLSData {
+  if (raw.metadata.regionDataEncoding !== 'columns') return raw;
+
+  const codes = raw.occupationCodes || (raw.occupations.length > 0
+    ? raw.occupations.map((o) => o.socCode)
+    : Object.keys(raw.metadata.occupationMap || {}).sort());
+  const scale = raw.metadata.complexityScale || 1;
+
+  const regionData: BLSData['regionData'] = {};
+  for (const [regionId, yearData] of Object.entries(raw.regionData)) {
+    regionData[regionId] = {};
+    for (const [year, value] of Object.entries(yearData)) {
+      const cols = value as unknown as BLSRegionColumns;
+      const rows: BLSRegionOccupation[] = new Array(cols.occ.length);
+      for (let i = 0; i < cols.occ.length; i++) {
+        rows[i] = {
+          socCode: codes[cols.occ[i]],
+          totEmp: cols.totEmp[i],
+          gdp: cols.gdp[i],
+          aMean: cols.aMean[i],
+          complexity: cols.complexity[i] / scale,
+        };
+      }
+      regionData[regionId][year] = rows;
+    }
+  }
+  return {
+    ...raw,
+    metadata: { ...raw.metadata, regionDataEncoding: 'rows' },
+    regionData,
+  };
+}
+
 /**
  * Merge a level extension file into the existing BLSData.
  * Extension files contain only occupations at a single level,
@@ -206,7 +289,9 @@ export const StaticDataProvider: React.FC = ({ children }) => {
         // Step 4: Fetch main data file
         const mainRes = await fetch(`${BASE_URL}/${dataset.file}`);
         if (!mainRes.ok) throw new Error(`HTTP ${mainRes.status} fetching ${dataset.file}`);
-        const mainData: BLSData = await mainRes.json();
+        const mainData = decodeRegionData(await hydrateOccupations(
+          await mainRes.json(), dataset.occupationDictionary,
+        ));
 
         if (cancelled) return;
         setData(mainData);
@@ -242,6 +327,8 @@ export const StaticDataProvider: React.FC = ({ children }) => {
       }
 
       const filename = levelFiles[levelKey];
+      const dictionaryName = findDataset(meta, selectedCountry, selectedYear)
+        ?.occupationDictionary;
       levelFetchingRef.current.add(levelKey as any);
       setLevelLoading(true);
 
@@ -250,8 +337,10 @@ export const StaticDataProvider: React.FC = ({ children }) => {
           if (!res.ok) throw new Error(`HTTP ${res.status} fetching ${filename}`);
           return res.json();
         })
+        .then((raw: BLSData) => hydrateOccupations(raw, dictionaryName))
         .then((extData: BLSData) => {
-          setData((prev) => (prev ? mergeExtension(prev, extData) : prev));
+          const decoded = decodeRegionData(extData);
+          setData((prev) => (prev ? mergeExtension(prev, decoded) : prev));
           loadedKeysRef.current.add(levelKey);
           levelFetchingRef.current.delete(levelKey as any);
           setLevelLoading(levelFetchingRef.current.size > 0);
@@ -306,8 +395,11 @@ export const StaticDataProvider: React.FC = ({ children }) => {
           if (!res.ok) throw new Error(`HTTP ${res.status} fetching ${dataset.file}`);
           return res.json();
         })
+        .then((raw: BLSData) => hydrateOccupations(
+          raw, dataset.occupationDictionary,
+        ))
         .then((mainData: BLSData) => {
-          setData(mainData);
+          setData(decodeRegionData(mainData));
           setLoadedLevels(dataset.levels);
           setLoading(false);
         })
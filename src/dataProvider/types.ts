@@ -15,6 +15,19 @@ export interface BLSOccupation {
   majorGroupName: string;
 }
 
+export type BLSOccupationEntry = Omit<BLSOccupation, 'socCode'>;
+
+/** Shared occupation dictionary (occupations-<country>.json) */
+export interface BLSOccupationDictionary {
+  metadata: {
+    country: string;
+    classificationSystem: string;
+    version: string;
+  };
+  occupations: { [socCode: string]: BLSOccupationEntry };
+  majorGroups: BLSMajorGroup[];
+}
+
 export interface BLSMajorGroup {
   groupId: string;
   name: string;
@@ -29,6 +42,22 @@ export interface BLSRegionOccupation {
   complexity: number;
 }
 
+/**
+ * Columnar region-year (regionDataEncoding "columns"): parallel arrays,
+ * where occ indexes the file's sorted occupation codes (occupationCodes,
+ * occupations, or metadata.occupationMap for slim files).
+ */
+export interface BLSRegionColumns {
+  occ: number[];
+  totEmp: number[];
+  gdp: number[];
+  aMean: number[];
+  /** Integers when metadata.complexityScale is set (value = c / scale) */
+  complexity: number[];
+}
+
+export type RegionDataEncoding = 'rows' | 'columns';
+
 export interface BLSAggregateOccupation {
   totalEmploy: number;
   avgWage: number;
@@ -51,25 +80,29 @@ export interface BLSAggregates {
 
 export interface BLSData {
   metadata: {
-    lastUpdated: string;
+    /** Older files only; the date is kept in bls-data.json */
+    lastUpdated?: string;
     years: number[];
     source: string;
     country?: string;
     maxLevel?: number;
     level?: number;
-    occupationMap?: {
-      [socCode: string]: {
-        name: string;
-        level: number;
-        parentCode: string | null;
-        majorGroupId: string;
-        majorGroupName: string;
-      };
-    };
+    regionDataEncoding?: RegionDataEncoding;
+    complexityScale?: number;
+    /** Shard index files only: regionId -> shard filename */
+    shards?: { [regionId: string]: string };
+    /** Shared dictionary file holding this file's occupation tables */
+    occupationDictionary?: string;
+    occupationMap?: { [socCode: string]: BLSOccupationEntry };
   };
   regions: BLSRegion[];
   occupations: BLSOccupation[];
   majorGroups: BLSMajorGroup[];
+  /**
+   * Files that use a shared occupation dictionary carry only these
+   * sorted codes instead of occupations + majorGroups (filled in on load).
+   */
+  occupationCodes?: string[];
   regionData: {
     [regionId: string]: {
       [year: string]: BLSRegionOccupation[];
@@ -120,6 +153,14 @@ export interface BLSMetaCatalog {
     year: number;
     file: string;
     levels: number[];
+    regionDataEncoding?: RegionDataEncoding;
+    complexityScale?: number;
+    /** Each file X.json also has X.bin + X.manifest.json (typed arrays) */
+    binaryBundles?: boolean;
+    /** Per-region shards; {file} is a data filename without ".json" */
+    shardLayout?: { index: string; region: string };
+    /** Shared occupation dictionary for this dataset's files */
+    occupationDictionary?: string;
   }[];
   levelFiles: {
     [countryYear: string]: {
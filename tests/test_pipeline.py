@@ -8,11 +8,31 @@ from pathlib import Path
 import pytest
 
 from scripts.pipeline import (
-    config, db, import_csv, import_plfs, export_csv,
-    export_json, export_jsonp, export_split, validate,
+    config, db, compress, import_csv, import_plfs, export_csv,
+    export_json, export_jsonp, export_manifest, export_split, validate,
 )
 
 
+# The occupations table schema from before normalization
+LEGACY_SCHEMA_SQL = """
+    CREATE TABLE countries (id INTEGER PRIMARY KEY,
+        code TEXT UNIQUE NOT NULL, name TEXT NOT NULL,
+        code_system TEXT NOT NULL, currency TEXT DEFAULT 'USD');
+    CREATE TABLE regions (id INTEGER PRIMARY KEY,
+        country_id INTEGER NOT NULL, name TEXT NOT NULL,
+        region_type TEXT NOT NULL,
+        UNIQUE(country_id, name, region_type));
+    CREATE TABLE occupations (id INTEGER PRIMARY KEY,
+        year INTEGER NOT NULL, region_id INTEGER NOT NULL,
+        occupation_code TEXT NOT NULL, occupation_title TEXT NOT NULL,
+        major_group_name TEXT NOT NULL, employment INTEGER NOT NULL,
+        mean_annual_wage INTEGER NOT NULL, gdp BIGINT NOT NULL,
+        complexity_score REAL NOT NULL DEFAULT 0.5,
+        UNIQUE(year, region_id, occupation_code));
+    CREATE INDEX idx_occ_year ON occupations(year);
+"""
+
+
 @pytest.fixture
 def tmp_db():
     """Create a temporary SQLite database."""
@@ -159,7 +179,42 @@ class TestDatabase:
         table_names = [t[0] for t in tables]
         assert "countries" in table_names
         assert "regions" in table_names
-        assert "occupations" in table_names
+        assert "occupation_codes" in table_names
+        assert "occupation_facts" in table_names
+        views = tmp_db.execute(
+            "SELECT name FROM sqlite_master WHERE type='view'"
+        ).fetchall()
+        assert ("occupations",) in views
+
+    def test_connection_profiles(self, tmp_path):
+        db_path = tmp_path / "profiles.db"
+        conn = db.connect(db_path, profile="bulk_load")
+        db.create_schema(conn)
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+        conn.close()
+
+        conn = db.connect(db_path, profile="read_mostly")
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM occupation_facts")
+        conn.close()
+
+        with pytest.raises(ValueError):
+            db.connect(db_path, profile="nope")
+
+    def test_drop_and_create_indexes(self, tmp_db):
+        def index_names():
+            return {r[0] for r in tmp_db.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'index' AND sql IS NOT NULL"
+            )}
+
+        assert "idx_occ_region_cover" in index_names()
+        db.drop_indexes(tmp_db)
+        assert index_names() == set()
+        db.create_indexes(tmp_db)
+        assert "idx_occ_region_cover" in index_names()
 
     def test_ensure_country(self, tmp_db):
         cid = db.ensure_country(tmp_db, "USA", "United States", "SOC", "USD")
@@ -173,6 +228,19 @@ class TestDatabase:
         rid = db.ensure_region(tmp_db, cid, "California", "State")
         assert rid > 0
 
+    def test_dimension_cache(self, tmp_db):
+        cid = db.ensure_country(tmp_db, "USA", "United States", "SOC")
+        rid = db.ensure_region(tmp_db, cid, "California", "State")
+        cache = db.DimensionCache(tmp_db)
+        # Pre-loaded rows resolve without touching SQLite
+        assert cache.countries == {"USA": cid}
+        assert cache.region_id(cid, "California", "State") == rid
+        new_rid = cache.region_id(cid, "Texas", "State")
+        assert new_rid != rid
+        assert cache.region_id(cid, "Texas", "State") == new_rid
+        count = tmp_db.execute("SELECT COUNT(*) FROM regions").fetchone()[0]
+        assert count == 2
+
     def test_insert_occupation(self, tmp_db):
         cid = db.ensure_country(tmp_db, "USA", "United States", "SOC")
         rid = db.ensure_region(tmp_db, cid, "United States", "National")
@@ -184,6 +252,153 @@ class TestDatabase:
         row = tmp_db.execute("SELECT gdp FROM occupations").fetchone()
         assert row[0] == 9270 * 126480
 
+    def test_occupation_codes_dimension(self, tmp_db):
+        cid = db.ensure_country(tmp_db, "USA", "United States", "SOC")
+        nat = db.ensure_region(tmp_db, cid, "United States", "National")
+        ca = db.ensure_region(tmp_db, cid, "California", "State")
+        rows = [
+            (2024, nat, "15-1252", "Software Developers", "Computer", 10, 100),
+            (2024, ca, "15-1252", "Software Developers", "Computer", 5, 120),
+            (2024, nat, "15-1250", "Software Developers and Testers",
+             "Computer", 12, 100),
+            (2024, nat, "15-1200", "Computer Occupations", "Computer", 20, 90),
+        ]
+        assert db.bulk_insert_occupations(tmp_db, rows) == 4
+        codes = tmp_db.execute(
+            "SELECT occupation_code, level, parent_code FROM occupation_codes "
+            "ORDER BY occupation_code"
+        ).fetchall()
+        # One dimension row per code; the renumbered minor group inserted
+        # last still becomes the parent of its broad occupation.
+        assert codes == [
+            ("15-1200", 2, "15-0000"),
+            ("15-1250", 3, "15-1200"),
+            ("15-1252", 4, "15-1250"),
+        ]
+        assert db.get_record_count(tmp_db) == 4
+        row = tmp_db.execute(
+            "SELECT occupation_title, employment FROM occupations "
+            "WHERE region_id = ? AND occupation_code = '15-1252'", (ca,)
+        ).fetchone()
+        assert row == ("Software Developers", 5)
+
+    def test_titles_are_kept_per_year(self, tmp_db):
+        cid = db.ensure_country(tmp_db, "USA", "United States", "SOC")
+        nat = db.ensure_region(tmp_db, cid, "United States", "National")
+
+        def titles():
+            return tmp_db.execute(
+                "SELECT year, occupation_title FROM occupations "
+                "WHERE occupation_code = '15-1252' ORDER BY year"
+            ).fetchall()
+
+        for year, title in ((2019, "OLD"), (2024, "NEW")):
+            db.bulk_insert_occupations(tmp_db, [
+                (year, nat, "15-1252", title, "Computer", 10, 100),
+            ])
+        assert titles() == [(2019, "OLD"), (2024, "NEW")]
+
+        # Re-importing a year corrects its title; back to the code's
+        # own title drops the per-year entry
+        db.bulk_insert_occupations(tmp_db, [
+            (2024, nat, "15-1252", "NEWER", "Computer", 10, 100),
+        ])
+        assert titles() == [(2019, "OLD"), (2024, "NEWER")]
+        db.bulk_insert_occupations(tmp_db, [
+            (2024, nat, "15-1252", "OLD", "Computer", 10, 100),
+        ])
+        assert titles() == [(2019, "OLD"), (2024, "OLD")]
+        assert tmp_db.execute(
+            "SELECT COUNT(*) FROM occupation_titles"
+        ).fetchone()[0] == 0
+
+    def test_legacy_schema_migration(self, tmp_path):
+        conn = db.connect(tmp_path / "legacy.db")
+        conn.executescript(LEGACY_SCHEMA_SQL + """
+            INSERT INTO countries VALUES (1, 'USA', 'United States', 'SOC', 'USD');
+            INSERT INTO regions VALUES (1, 1, 'United States', 'National');
+            INSERT INTO occupations VALUES
+                (1, 2024, 1, '11-0000', 'Management', 'Management', 10, 5, 50, 1.0),
+                (2, 2024, 1, '11-1000', 'Top Executives', 'Management', 4, 5, 20, 0.0),
+                (3, 2023, 1, '11-1000', 'Chief Executives', 'Management', 4, 5, 20, 0.0);
+        """)
+        db.create_schema(conn)
+        rows = conn.execute(
+            "SELECT id, occupation_code, occupation_title, gdp, "
+            "complexity_score FROM occupations ORDER BY id"
+        ).fetchall()
+        assert rows == [(1, "11-0000", "Management", 50, 1.0),
+                        (2, "11-1000", "Top Executives", 20, 0.0),
+                        (3, "11-1000", "Chief Executives", 20, 0.0)]
+        parent = conn.execute(
+            "SELECT parent_code FROM occupation_codes "
+            "WHERE occupation_code = '11-1000'"
+        ).fetchone()[0]
+        assert parent == "11-0000"
+        db.drop_all(conn)
+        conn.close()
+
+    def test_bulk_insert_occupations(self, tmp_db):
+        cid = db.ensure_country(tmp_db, "USA", "United States", "SOC")
+        rid = db.ensure_region(tmp_db, cid, "United States", "National")
+        rows = (
+            (2024, rid, f"11-{i:04d}", "Occ", "Management", 10 + i, 1000)
+            for i in range(25)
+        )
+        count = db.bulk_insert_occupations(tmp_db, rows, chunk_size=10)
+        assert count == 25
+        assert db.get_record_count(tmp_db) == 25
+        row = tmp_db.execute(
+            "SELECT gdp FROM occupations WHERE occupation_code = '11-0003'"
+        ).fetchone()
+        assert row[0] == 13 * 1000
+
+    def test_bulk_insert_upserts_in_place(self, tmp_db):
+        cid = db.ensure_country(tmp_db, "USA", "United States", "SOC")
+        rid = db.ensure_region(tmp_db, cid, "United States", "National")
+        rows = [
+            (2024, rid, f"11-{i:04d}", "Occ", "Management", 10 + i, 1000)
+            for i in range(5)
+        ]
+        cache = db.DimensionCache(tmp_db)
+        db.bulk_insert_occupations(tmp_db, rows, cache=cache)
+        ids = tmp_db.execute(
+            "SELECT id FROM occupations ORDER BY occupation_code"
+        ).fetchall()
+
+        # Re-import: one changed value, one new code, the rest unchanged
+        rows[2] = rows[2][:5] + (99, 1000)
+        rows.append((2024, rid, "11-9999", "Occ", "Management", 1, 1))
+        cache = db.DimensionCache(tmp_db)
+        assert db.bulk_insert_occupations(tmp_db, rows, chunk_size=3,
+                                          cache=cache) == 6
+        assert cache.write_summary() == {
+            "inserted": 1, "updated": 1, "unchanged": 4,
+        }
+        assert tmp_db.execute(
+            "SELECT id FROM occupations ORDER BY occupation_code LIMIT 5"
+        ).fetchall() == ids
+        assert tmp_db.execute(
+            "SELECT gdp FROM occupations WHERE occupation_code = '11-0002'"
+        ).fetchone()[0] == 99 * 1000
+
+    def test_write_summary_counts_cleared_rows_as_inserts(self, tmp_db,
+                                                          tmp_path):
+        cid = db.ensure_country(tmp_db, "USA", "United States", "SOC")
+        rid = db.ensure_region(tmp_db, cid, "United States", "National")
+        rows = [(2024, rid, f"11-{i:04d}", "Occ", "Management", 10, 1000)
+                for i in range(4)]
+        db.bulk_insert_occupations(tmp_db, rows)
+
+        manifest = db.ImportManifest(tmp_db)
+        cache = db.DimensionCache(tmp_db)
+        manifest.clear(tmp_path / "national.csv", [(2024, rid)])
+        db.bulk_insert_occupations(tmp_db, rows[:3], cache=cache)
+        assert manifest.cleared == 4
+        assert cache.write_summary(manifest.cleared) == {
+            "inserted": 3, "updated": 0, "unchanged": 0,
+        }
+
     def test_complexity_computation(self, tmp_db):
         cid = db.ensure_country(tmp_db, "USA", "United States", "SOC")
         rid = db.ensure_region(tmp_db, cid, "United States", "National")
@@ -201,6 +416,266 @@ class TestDatabase:
         assert rows[0][1] == 0.0
         assert rows[1][1] == 1.0
 
+    def test_explain_exports_uses_indexes(self, seeded_db, capsys):
+        plans = db.explain_exports(seeded_db, ["USA"])
+        assert "export_json._query_records" in plans
+        assert "export_csv._query_all" in plans
+        for name, detail in plans.items():
+            if name == "export_csv._query_all":
+                continue  # unfiltered full dump
+            assert not any(line.startswith("SCAN f") for line in detail), name
+            assert any("idx_occ_region_cover" in line for line in detail)
+        assert "export_split._query_all:" in capsys.readouterr().out
+
+    def test_complexity_computation_scoped(self, tmp_db):
+        cid = db.ensure_country(tmp_db, "USA", "United States", "SOC")
+        nat = db.ensure_region(tmp_db, cid, "United States", "National")
+        ca = db.ensure_region(tmp_db, cid, "California", "State")
+        for rid in (nat, ca):
+            db.insert_occupation(tmp_db, 2024, rid, "11-0000", "Mgmt", "Mgmt", 100, 100)
+            db.insert_occupation(tmp_db, 2024, rid, "13-0000", "Biz", "Biz", 200, 200)
+        tmp_db.commit()
+        db.compute_complexity_scores(tmp_db, scope=[(2024, ca)])
+        rows = tmp_db.execute(
+            "SELECT region_id, occupation_code, complexity_score FROM occupations "
+            "ORDER BY region_id, occupation_code"
+        ).fetchall()
+        # National untouched (default 0.5); California normalized
+        assert [r[2] for r in rows if r[0] == nat] == [0.5, 0.5]
+        assert [r[2] for r in rows if r[0] == ca] == [0.0, 1.0]
+
+
+class TestCsvImport:
+    """Test streaming CSV import."""
+
+    def test_read_csv_is_lazy(self, tmp_path):
+        csv_path = tmp_path / "us_occupational_data.csv"
+        csv_path.write_text(
+            "occupation_code,occupation_title,employment,mean_annual_wage\n"
+            "11-0000,Management,100,1000.0\n",
+            encoding="utf-8",
+        )
+        rows = import_csv.read_csv(csv_path)
+        assert not isinstance(rows, list)
+        assert list(rows) == [{
+            "occupation_code": "11-0000", "occupation_title": "Management",
+            "employment": 100, "mean_annual_wage": 1000,
+        }]
+
+    def test_import_combined_csv(self, tmp_db, tmp_path):
+        csv_path = tmp_path / "combined.csv"
+        csv_path.write_text(
+            "year,region_type,region,occupation_code,occupation_title,"
+            "major_group_name,employment,mean_annual_wage\n"
+            "2024,National,United States,11-0000,Management,Management,100,1000\n"
+            "2024,State,California,11-0000,Management,Management,10,1200\n"
+            "2024,State,California,13-0000,Business,Business,20,900\n",
+            encoding="utf-8",
+        )
+        total = import_csv.import_combined_csv(tmp_db, csv_path, 2024)
+        assert total == 3
+        regions = tmp_db.execute("SELECT COUNT(*) FROM regions").fetchone()[0]
+        assert regions == 2
+        assert db.get_record_count(tmp_db) == 3
+
+    def test_import_states_parallel_matches_serial(self, tmp_path, monkeypatch):
+        states_dir = tmp_path / "states"
+        states_dir.mkdir()
+        for i, stem in enumerate(["texas", "alabama", "ohio"]):
+            (states_dir / f"{stem}_occupational_data.csv").write_text(
+                "occupation_code,occupation_title,employment,mean_annual_wage\n"
+                f"11-0000,Management,{100 + i},1000\n"
+                f"13-0000,Business,{200 + i},900\n",
+                encoding="utf-8",
+            )
+        monkeypatch.setitem(config.COUNTRIES["USA"], "states_dir", states_dir)
+
+        results = []
+        for workers in (1, 2):
+            conn = sqlite3.connect(":memory:")
+            db.create_schema(conn)
+            total = import_csv.import_states(conn, "USA", 2024, workers=workers)
+            assert total == 6
+            results.append(conn.execute(
+                "SELECT r.id, r.name, o.occupation_code, o.employment "
+                "FROM occupations o JOIN regions r ON o.region_id = r.id "
+                "ORDER BY o.id"
+            ).fetchall())
+            conn.close()
+        assert results[0] == results[1]
+        # Region ids follow sorted file order
+        assert [r[1] for r in results[0][::2]] == ["Alabama", "Ohio", "Texas"]
+
+
+class TestIncrementalImport:
+    """Test manifest-driven incremental imports."""
+
+    def test_only_changed_files_are_reimported(self, tmp_db, tmp_path,
+                                               monkeypatch):
+        states_dir = tmp_path / "states"
+        states_dir.mkdir()
+        header = "occupation_code,occupation_title,employment,mean_annual_wage\n"
+        for stem in ("ohio", "texas"):
+            (states_dir / f"{stem}_occupational_data.csv").write_text(
+                header + "11-0000,Management,100,1000\n"
+                         "13-0000,Business,200,900\n",
+                encoding="utf-8",
+            )
+        monkeypatch.setitem(config.COUNTRIES["USA"], "states_dir", states_dir)
+
+        manifest = db.ImportManifest(tmp_db)
+        assert import_csv.import_states(tmp_db, "USA", 2024,
+                                        manifest=manifest) == 4
+        assert len(manifest.affected) == 2
+
+        # Nothing changed: everything skipped
+        manifest = db.ImportManifest(tmp_db)
+        assert import_csv.import_states(tmp_db, "USA", 2024,
+                                        manifest=manifest) == 0
+        assert manifest.skipped == 2
+        assert manifest.affected == set()
+
+        # Texas drops an occupation: only Texas is replaced
+        (states_dir / "texas_occupational_data.csv").write_text(
+            header + "11-0000,Management,150,1000\n", encoding="utf-8",
+        )
+        manifest = db.ImportManifest(tmp_db)
+        assert import_csv.import_states(tmp_db, "USA", 2024,
+                                        manifest=manifest) == 1
+        texas = tmp_db.execute(
+            "SELECT id FROM regions WHERE name = 'Texas'"
+        ).fetchone()[0]
+        assert manifest.affected == {(2024, texas)}
+        assert db.get_record_count(tmp_db) == 3
+
+    def test_same_files_into_two_years(self, tmp_db, tmp_path, monkeypatch):
+        # Per-file CSVs carry no year: a 2023 import must not make the
+        # files count as unchanged for 2024
+        states_dir = tmp_path / "states"
+        states_dir.mkdir()
+        (states_dir / "ohio_occupational_data.csv").write_text(
+            "occupation_code,occupation_title,employment,mean_annual_wage\n"
+            "11-0000,Management,100,1000\n13-0000,Business,200,900\n",
+            encoding="utf-8",
+        )
+        monkeypatch.setitem(config.COUNTRIES["USA"], "states_dir", states_dir)
+
+        for year in (2023, 2024):
+            manifest = db.ImportManifest(tmp_db)
+            assert import_csv.import_states(tmp_db, "USA", year,
+                                            manifest=manifest) == 2
+            assert manifest.skipped == 0
+        assert tmp_db.execute(
+            "SELECT year, COUNT(*) FROM occupation_facts GROUP BY year"
+        ).fetchall() == [(2023, 2), (2024, 2)]
+
+        # Each year now skips, and re-importing one keeps the other
+        manifest = db.ImportManifest(tmp_db)
+        assert import_csv.import_states(tmp_db, "USA", 2024,
+                                        manifest=manifest) == 0
+        assert manifest.skipped == 1
+        (states_dir / "ohio_occupational_data.csv").write_text(
+            "occupation_code,occupation_title,employment,mean_annual_wage\n"
+            "11-0000,Management,150,1000\n",
+            encoding="utf-8",
+        )
+        manifest = db.ImportManifest(tmp_db)
+        assert import_csv.import_states(tmp_db, "USA", 2024,
+                                        manifest=manifest) == 1
+        assert tmp_db.execute(
+            "SELECT year, COUNT(*) FROM occupation_facts GROUP BY year"
+        ).fetchall() == [(2023, 2), (2024, 1)]
+
+
+class TestSyntheticLevels:
+    """Test persisted hierarchy rollups (db.synthesize_levels)."""
+
+    def test_matches_python_synthesis(self, seeded_db):
+        python_records = export_json.ExportSession(
+            seeded_db, "USA", 2024
+        ).records
+        assert db.synthesize_levels(seeded_db) > 0
+        sql_records = export_json.ExportSession(seeded_db, "USA", 2024).records
+        assert sql_records == python_records
+
+        # 15-1252's unpublished ancestors exist only as placeholders
+        placeholders = dict(seeded_db.execute(
+            "SELECT occupation_code, occupation_title FROM occupation_codes "
+            "WHERE is_placeholder = 1"
+        ).fetchall())
+        assert placeholders["15-1250"] == "SOC 15-1250"
+        assert "15-1000" in placeholders
+
+    def test_scoped_rerun(self, seeded_db):
+        db.synthesize_levels(seeded_db)
+        ca = seeded_db.execute(
+            "SELECT id FROM regions WHERE name = 'California'"
+        ).fetchone()[0]
+        untouched = seeded_db.execute(
+            "SELECT id, employment FROM synthetic_occupations "
+            "WHERE region_id != ? ORDER BY id", (ca,)
+        ).fetchall()
+
+        db.insert_occupation(seeded_db, 2024, ca, "15-1252",
+                             "Software Developers", "Computer", 1000, 130000)
+        db.compute_complexity_scores(seeded_db, scope=[(2024, ca)])
+        db.synthesize_levels(seeded_db, scope=[(2024, ca)])
+
+        assert seeded_db.execute(
+            "SELECT id, employment FROM synthetic_occupations "
+            "WHERE region_id != ? ORDER BY id", (ca,)
+        ).fetchall() == untouched
+        emp = seeded_db.execute(
+            "SELECT s.employment FROM synthetic_occupations s "
+            "JOIN occupation_codes oc ON oc.id = s.code_id "
+            "WHERE s.region_id = ? AND oc.occupation_code = '15-1250'", (ca,)
+        ).fetchone()[0]
+        assert emp == 1000
+
+    def test_stale_rollups_are_synthesized_in_python(self, seeded_db):
+        db.synthesize_levels(seeded_db)
+        cid, ca = seeded_db.execute(
+            "SELECT country_id, id FROM regions WHERE name = 'California'"
+        ).fetchone()
+        austin = db.ensure_region(seeded_db, cid, "Austin-Round Rock, TX",
+                                  "Metro")
+        db.bulk_insert_occupations(seeded_db, [
+            (2024, ca, "15-1252", "Software Developers",
+             "Computer and Mathematical", 400000, 150000),
+            (2024, austin, "15-1252", "Software Developers",
+             "Computer and Mathematical", 30000, 120000),
+        ])
+        fresh = {name for (name,) in seeded_db.execute(
+            "SELECT r.name FROM synthetic_scopes s "
+            "JOIN regions r ON r.id = s.region_id"
+        )}
+        assert fresh == {"United States",
+                         "San Francisco-Oakland-Berkeley, CA"}
+
+        records = export_json.ExportSession(seeded_db, "USA", 2024).records
+        seeded_db.execute("DELETE FROM synthetic_scopes")
+        python_records = export_json.ExportSession(
+            seeded_db, "USA", 2024
+        ).records
+        assert records == python_records
+        assert any(r["Region"] == "Austin-Round Rock, TX"
+                   and r["SOC_Code"] == "15-1250" for r in records)
+
+    def test_placeholder_replaced_by_real_code(self, seeded_db):
+        db.synthesize_levels(seeded_db)
+        nat = seeded_db.execute(
+            "SELECT id FROM regions WHERE region_type = 'National'"
+        ).fetchone()[0]
+        db.bulk_insert_occupations(seeded_db, [
+            (2024, nat, "15-1250", "Software and Web Developers",
+             "Computer and Mathematical", 1600000, 128000),
+        ])
+        row = seeded_db.execute(
+            "SELECT occupation_title, is_placeholder FROM occupation_codes "
+            "WHERE occupation_code = '15-1250'"
+        ).fetchone()
+        assert row == ("Software and Web Developers", 0)
+
 
 class TestValidation:
     """Test validation checks."""
@@ -242,6 +717,18 @@ class TestExportJson:
         finally:
             out_path.unlink(missing_ok=True)
 
+    def test_aggregates_match_python_path(self, seeded_db):
+        """NumPy aggregates are identical to the pure-Python fallback."""
+        records = export_json._query_records(seeded_db, ["USA"])
+        records += [dict(r, year=2023, TOT_EMP=r["TOT_EMP"] // 2,
+                         complexity_score=r["complexity_score"] / 3)
+                    for r in records]
+        years = {2023, 2024}
+        fast = export_json._build_aggregates(records, years)
+        slow = export_json._build_aggregates_python(records, years)
+        assert json.dumps(fast) == json.dumps(slow)
+        assert list(fast["2024"]["byOccupation"])[0] == "11-0000"
+
     def test_export_json_occupation_levels(self, seeded_db):
         with tempfile.NamedTemporaryFile(
             suffix=".json", delete=False, mode="w"
@@ -316,13 +803,26 @@ class TestExportJsonLevels:
         assert _soc_level("11-1011") == 4  # detailed
 
     def test_soc_parent_calculation(self):
-        from scripts.pipeline.export_json import _soc_parent
+        from scripts.pipeline.hierarchy import _soc_parent
         assert _soc_parent("11-0000") is None      # major has no parent
         assert _soc_parent("11-1000") == "11-0000"  # minor → major
         assert _soc_parent("11-1100") == "11-0000"  # minor (renumbered) → major
         assert _soc_parent("11-1110") == "11-1000"  # broad → minor (default XX-X000 without context)
         assert _soc_parent("15-1252") == "15-1250"  # detailed → broad
 
+    def test_occupation_hierarchy_index(self):
+        from scripts.pipeline.hierarchy import OccupationHierarchy
+        h = OccupationHierarchy(["11-0000", "11-1100", "11-1110", "11-1111"])
+        assert h.parent("11-1110") == "11-1100"  # renumbered minor is known
+        assert h.parent("11-1100") == "11-0000"
+        assert h.level("11-1111") == 4
+        kids = [h.codes[i] for i in h.children[h.ids["11-1100"]]]
+        assert kids == ["11-1110"]
+        assert h.parents[h.ids["11-0000"]] == -1
+
+        full = OccupationHierarchy(["15-1252"], include_ancestors=True)
+        assert full.codes == ["15-0000", "15-1000", "15-1250", "15-1252"]
+
     def test_level_filter_reduces_records(self, seeded_db):
         """Level-1 should have fewer occupations than full data."""
         from scripts.pipeline.export_json import _build_static_data, _query_records
@@ -362,6 +862,45 @@ class TestExportCountryTagged:
             for occ in data["occupations"]:
                 assert occ["level"] <= 2
 
+    def test_json_styles(self, tmp_path):
+        data = {"a": [1, {"b": 0.123456789, "c": []}], "d": {}, "e": "x"}
+        pretty_path, compact_path = tmp_path / "p.json", tmp_path / "c.json"
+
+        size, saved = export_json._write_json(data, pretty_path, "pretty")
+        assert saved == 0
+        assert pretty_path.read_text() == json.dumps(data, indent=2)
+
+        size, saved = export_json._write_json(data, compact_path)
+        assert compact_path.read_text() == \
+            '{"a":[1,{"b":0.1235,"c":[]}],"d":{},"e":"x"}'
+        assert saved == 0  # only measured on request
+        size, saved = export_json._write_json(data, compact_path,
+                                              measure_saving=True)
+        assert size + saved == pretty_path.stat().st_size
+
+        with pytest.raises(ValueError):
+            export_json._write_json(data, compact_path, "tiny")
+
+    def test_streamed_region_data(self, seeded_db, tmp_path):
+        """Lazily built regionData streams to the same bytes as json.dump."""
+        records = export_json._query_records(seeded_db, ["USA"])
+        data = export_json._build_static_data(records)
+        materialized = {**data, "regionData": dict(data["regionData"])}
+        assert data["regionData"].record_count() == sum(
+            len(entries) for year_data in materialized["regionData"].values()
+            for entries in year_data.values()
+        )
+
+        path = tmp_path / "p.json"
+        export_json._write_json(data, path, "pretty")
+        assert path.read_text() == json.dumps(materialized, indent=2)
+
+        size, saved = export_json._write_json(data, path,
+                                              measure_saving=True)
+        assert json.loads(path.read_text())["regionData"] == \
+            json.loads(json.dumps(materialized))["regionData"]
+        assert size + saved == len(json.dumps(materialized, indent=2))
+
     def test_export_level_file(self, seeded_db):
         with tempfile.TemporaryDirectory() as tmpdir:
             out_path = Path(tmpdir) / "bls-data-us-2024-4.json"
@@ -456,6 +995,103 @@ class TestExportCountryTagged:
             finally:
                 cfg.PUBLIC_DATA_DIR = orig_pub
 
+    def test_export_all_queries_once(self, seeded_db, tmp_path, monkeypatch):
+        import scripts.pipeline.config as cfg
+        monkeypatch.setattr(cfg, "PUBLIC_DATA_DIR", tmp_path)
+        calls = []
+        orig_query = export_json._iter_records
+
+        def counting_query(*args, **kwargs):
+            calls.append(args)
+            return orig_query(*args, **kwargs)
+
+        monkeypatch.setattr(export_json, "_iter_records", counting_query)
+        export_json.export_all(seeded_db, "USA", 2024)
+        assert len(calls) == 1
+
+    def test_export_only_on_legacy_schema(self, tmp_path, monkeypatch):
+        # --export-only never creates the schema, so a database from
+        # before normalization has no synthetic_occupations table
+        from scripts.pipeline import run_pipeline
+        db_path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript(LEGACY_SCHEMA_SQL + """
+            INSERT INTO countries VALUES (1, 'USA', 'United States', 'SOC', 'USD');
+            INSERT INTO regions VALUES (1, 1, 'United States', 'National');
+            INSERT INTO occupations VALUES
+                (1, 2024, 1, '11-0000', 'Management', 'Management', 10, 5, 50, 1.0),
+                (2, 2024, 1, '11-1011', 'Chief Executives', 'Management', 4, 5, 20, 0.0);
+        """)
+        conn.close()
+        out = tmp_path / "public"
+        monkeypatch.setattr(config, "PUBLIC_DATA_DIR", out)
+        monkeypatch.setattr(config, "EXPORT_MANIFEST_PATH",
+                            tmp_path / "export_manifest.json")
+        monkeypatch.setattr("sys.argv", [
+            "run_pipeline", "--export-only", "--db-path", str(db_path),
+        ])
+        run_pipeline.main()
+
+        data = json.loads((out / "bls-data-us-2024.json").read_text())
+        # 11-1000 synthesized in Python, as before synthesize_levels()
+        assert {occ["socCode"] for occ in data["occupations"]} == {
+            "11-0000", "11-1000"}
+        assert (out / "bls-data-us-2024-4.json").exists()
+        conn = sqlite3.connect(db_path)
+        assert db._object_type(conn, "synthetic_occupations") is None
+        conn.close()
+
+    def test_export_years_single_pass(self, seeded_db, tmp_path, monkeypatch):
+        import scripts.pipeline.config as cfg
+        seeded_db.execute("""
+            INSERT INTO occupation_facts (year, region_id, code_id, employment,
+                                          mean_annual_wage, gdp, complexity_score)
+            SELECT 2023, region_id, code_id, employment, mean_annual_wage,
+                   gdp, complexity_score
+            FROM occupation_facts WHERE year = 2024
+        """)
+        seeded_db.commit()
+        assert export_json.available_years(seeded_db, "USA") == [2023, 2024]
+
+        # Reference: one export_all() run per year
+        monkeypatch.setattr(cfg, "PUBLIC_DATA_DIR", tmp_path / "single")
+        for year in (2023, 2024):
+            export_json.export_all(seeded_db, "USA", year)
+
+        queries, metas = [], []
+        orig_query, orig_meta = export_json._iter_records, export_json.export_meta
+        monkeypatch.setattr(export_json, "_iter_records",
+                            lambda *a, **kw: queries.append(a) or
+                            orig_query(*a, **kw))
+        monkeypatch.setattr(export_json, "export_meta",
+                            lambda *a, **kw: metas.append(a) or
+                            orig_meta(*a, **kw))
+        monkeypatch.setattr(cfg, "PUBLIC_DATA_DIR", tmp_path / "multi")
+        stats = export_json.export_years(seeded_db, "USA", [2024, 2023])
+        assert list(stats) == [2023, 2024]
+        assert stats[2023]["main_count"] == stats[2024]["main_count"] > 0
+        assert len(queries) == 1 and len(metas) == 1
+
+        single = sorted(p.name for p in (tmp_path / "single").iterdir())
+        assert sorted(p.name for p in (tmp_path / "multi").iterdir()) == single
+        for name in single:
+            assert ((tmp_path / "multi" / name).read_bytes()
+                    == (tmp_path / "single" / name).read_bytes()), name
+        meta = json.loads((tmp_path / "multi" / "bls-data.json").read_text())
+        assert meta["yearsByCountry"]["us"] == [2023, 2024]
+
+    def test_export_session_select(self, seeded_db):
+        session = export_json.ExportSession(seeded_db, "USA", 2024)
+        assert session.levels_available == [1, 2, 4]
+        metro = session.select([4], ["Metro"])
+        assert metro
+        assert {r["Region_Type"] for r in metro} == {"Metro"}
+        # Slices keep query order (real rows first, then synthesized)
+        assert session.select([1, 2]) == [
+            r for r in session.records
+            if session.hierarchy.level(r["SOC_Code"]) <= 2
+        ]
+
 
 class TestExactLevelFilter:
     """Test the exact_level filter in _build_static_data."""
@@ -480,6 +1116,46 @@ class TestExactLevelFilter:
         assert data["occupations"][0]["socCode"] == "11-0000"
 
 
+class TestExportBinary:
+    """Test typed-array bundle export."""
+
+    def test_bundle_round_trip(self, seeded_db, tmp_path):
+        from scripts.pipeline import export_binary
+        json_path = tmp_path / "bls-data-us-2024-4.json"
+        export_json.export_level_file(seeded_db, "USA", 2024, 4, json_path,
+                                      binary=True)
+        manifest_path, bin_path = export_binary.bundle_paths(json_path)
+        assert bin_path.exists()
+
+        manifest = json.loads(manifest_path.read_text())
+        assert "regionData" not in manifest
+        for spec in manifest["binary"]["columns"].values():
+            assert spec["offset"] % 8 == 0
+
+        bundle = export_binary.read_bundle(manifest_path)
+        data = json.loads(json_path.read_text())
+        assert bundle["regionData"] == data["regionData"]
+        assert bundle["occupations"] == data["occupations"]
+        assert validate.validate_bundle(manifest_path, json_path) == []
+
+    def test_bundle_matches_columnar_json(self, seeded_db, tmp_path):
+        from scripts.pipeline import export_binary
+        json_path = tmp_path / "bls-data-us-2024.json"
+        export_json.export_country_year(
+            seeded_db, "USA", 2024, json_path, binary=True,
+            encoding="columns", complexity_scale=config.COMPLEXITY_SCALE,
+        )
+        manifest_path, _ = export_binary.bundle_paths(json_path)
+        assert validate.validate_bundle(manifest_path, json_path) == []
+
+    def test_int32_overflow_rejected(self):
+        from scripts.pipeline import export_binary
+        with pytest.raises(ValueError):
+            export_binary._column([2 ** 31], "<i4")
+        with pytest.raises(ValueError):
+            export_binary._column([1.5], "<i4")
+
+
 class TestExportSplit:
     """Test split data export (meta.js + per-region files)."""
 
@@ -515,6 +1191,169 @@ class TestExportSplit:
         assert export_split._make_slug("Metro", "St. Louis, MO-IL") == "metro-st_louis"
 
 
+class TestExportManifest:
+    """Test skipping unchanged outputs and removing stale ones."""
+
+    def _export(self, conn, manifest, **layout):
+        with export_manifest.collect() as paths:
+            stats = export_json.export_all(conn, "USA", 2024, **layout)
+        manifest.update("json:us-2024", paths, stats["rows"])
+        manifest.save()
+
+    def test_unchanged_files_are_skipped(self, seeded_db, tmp_path,
+                                         monkeypatch):
+        monkeypatch.setattr(config, "PUBLIC_DATA_DIR", tmp_path / "data")
+        manifest_path = tmp_path / "export_manifest.json"
+        first = export_manifest.ExportManifest(manifest_path)
+        self._export(seeded_db, first, shard=True)
+        assert first.written and not first.skipped
+
+        main = tmp_path / "data" / "bls-data-us-2024.json"
+        mtime = main.stat().st_mtime_ns
+        entries = json.loads(manifest_path.read_text())["files"]
+        entry = entries[str(main.resolve())]
+        assert entry["sha256"] == db.file_hash(main)
+        assert entry["rows"] == 18
+
+        second = export_manifest.ExportManifest(manifest_path)
+        self._export(seeded_db, second, shard=True)
+        assert not second.written and not second.removed
+        assert len(second.skipped) == len(first.written)
+        assert main.stat().st_mtime_ns == mtime
+
+        # Dropping the shard layout removes the shard files
+        third = export_manifest.ExportManifest(manifest_path)
+        self._export(seeded_db, third)
+        assert [p.name for p in third.written] == ["bls-data.json"]
+        assert {p.parent.name for p in third.removed} == {
+            "bls-data-us-2024", "bls-data-us-2024-4", "bls-data-us-2024-4-metro"
+        }
+        assert not (tmp_path / "data" / "bls-data-us-2024").exists()
+
+    @staticmethod
+    def _on_day(monkeypatch, day: str) -> None:
+        """Make export_json's date.today() return *day*."""
+        import datetime
+
+        class Day(datetime.date):
+            @classmethod
+            def today(cls):
+                return cls.fromisoformat(day)
+
+        monkeypatch.setattr(export_json, "date", Day)
+
+    def test_next_day_rerun_is_skipped(self, seeded_db, tmp_path,
+                                       monkeypatch):
+        monkeypatch.setattr(config, "PUBLIC_DATA_DIR", tmp_path / "data")
+        manifest_path = tmp_path / "export_manifest.json"
+        meta_path = tmp_path / "data" / "bls-data.json"
+        self._on_day(monkeypatch, "2025-01-01")
+        self._export(seeded_db, export_manifest.ExportManifest(manifest_path))
+        main = tmp_path / "data" / "bls-data-us-2024.json"
+        assert "lastUpdated" not in json.loads(main.read_text())["metadata"]
+
+        # Same data the next day: nothing is rewritten, catalog included
+        self._on_day(monkeypatch, "2025-01-02")
+        manifest = export_manifest.ExportManifest(manifest_path)
+        self._export(seeded_db, manifest)
+        assert not manifest.written and manifest.skipped
+        assert json.loads(meta_path.read_text())["lastUpdated"] == "2025-01-01"
+
+        # Changed data moves the catalog date
+        seeded_db.execute("UPDATE occupation_facts SET employment = employment + 1")
+        manifest = export_manifest.ExportManifest(manifest_path)
+        self._export(seeded_db, manifest)
+        assert main in manifest.written
+        assert json.loads(meta_path.read_text())["lastUpdated"] == "2025-01-02"
+
+    def test_hashed_names_and_generations(self, seeded_db, tmp_path,
+                                          monkeypatch):
+        monkeypatch.setattr(config, "PUBLIC_DATA_DIR", tmp_path / "data")
+        manifest_path = tmp_path / "export_manifest.json"
+
+        def export(style):
+            manifest = export_manifest.ExportManifest(manifest_path)
+            with export_manifest.collect() as paths:
+                stats = export_json.export_all(seeded_db, "USA", 2024,
+                                               json_style=style, shard=True,
+                                               hashed=True)
+            manifest.update("json:us-2024", paths, stats["rows"],
+                            keep_generations=2)
+            manifest.save()
+            return stats["main_path"], manifest
+
+        main, _ = export("compact")
+        digest = db.file_hash(main)[:export_manifest.HASH_LENGTH]
+        assert main.name == f"bls-data-us-2024.{digest}.json"
+        assert (main.with_suffix("") / "index.json").exists()
+        meta = json.loads((tmp_path / "data" / "bls-data.json").read_text())
+        assert meta["datasets"][0]["file"] == main.name
+        assert meta["levelFiles"]["us-2024"]["4-metro"].startswith(
+            "bls-data-us-2024-4-metro.")
+        assert not (tmp_path / "data" / "bls-data-us-2024.json").exists()
+
+        # Unchanged data on a later day keeps every name and file, and
+        # the catalog (bls-data.json) is not rewritten either
+        self._on_day(monkeypatch, "2099-01-01")
+        rerun, manifest = export("compact")
+        assert rerun == main
+        assert not manifest.written and not manifest.removed
+        assert meta == json.loads(
+            (tmp_path / "data" / "bls-data.json").read_text()
+        )
+
+        # Superseded files survive one more export, then are removed
+        pretty, manifest = export("pretty")
+        assert pretty != main and main.exists() and not manifest.removed
+        _, manifest = export("pretty")
+        assert main in manifest.removed and not main.exists()
+        assert not main.with_suffix("").exists()
+        assert pretty.exists()
+
+    def test_precompressed_sidecars(self, seeded_db, tmp_path, monkeypatch,
+                                    capsys):
+        import gzip
+
+        monkeypatch.setattr(config, "PUBLIC_DATA_DIR", tmp_path / "data")
+        manifest_path = tmp_path / "export_manifest.json"
+
+        def export():
+            manifest = export_manifest.ExportManifest(manifest_path)
+            with export_manifest.collect() as paths:
+                export_json.export_all(seeded_db, "USA", 2024, shard=True)
+            results = compress.compress_outputs(paths, manifest, workers=2)
+            manifest.update("json:us-2024", [
+                *paths, *(s for p in paths for s in compress.sidecar_paths(p))
+            ])
+            manifest.save()
+            return paths, results
+
+        paths, results = export()
+        assert set(results) == set(paths)
+        # Shard files share names, so the log shows their directory too
+        log = capsys.readouterr().out
+        assert "  bls-data-us-2024/index.json: " in log
+        assert "  bls-data-us-2024-4/index.json: " in log
+        for path in paths:
+            sidecar = path.with_name(path.name + ".gz")
+            assert gzip.decompress(sidecar.read_bytes()) == path.read_bytes()
+            assert results[path][".gz"] == sidecar.stat().st_size
+        if compress.brotli is None:
+            assert compress.codecs() == [".gz"]
+
+        # Unchanged sources are not recompressed
+        _, results = export()
+        assert results == {}
+
+    def test_changed_content_is_replaced(self, tmp_path):
+        path = tmp_path / "a.txt"
+        for text in ("one", "one", "two"):
+            with export_manifest.replace_if_changed(path) as f:
+                f.write(text)
+        assert path.read_text() == "two"
+        assert [p.name for p in tmp_path.iterdir()] == ["a.txt"]
+
+
 class TestValidateJson:
     """Test JSON validation."""
 
@@ -543,6 +1382,119 @@ class TestValidateJson:
             errors = validate.validate_json(out_path)
             assert errors == [], f"Validation errors: {errors}"
 
+    def test_columnar_region_data(self, seeded_db, tmp_path):
+        """Columnar regionData round-trips to the row encoding."""
+        rows_path = tmp_path / "rows.json"
+        cols_path = tmp_path / "cols.json"
+        export_json.export_country_year(seeded_db, "USA", 2024, rows_path)
+        export_json.export_country_year(
+            seeded_db, "USA", 2024, cols_path, encoding="columns",
+            complexity_scale=config.COMPLEXITY_SCALE,
+        )
+        assert validate.validate_json(cols_path) == []
+
+        rows = json.loads(rows_path.read_text(encoding="utf-8"))
+        cols = json.loads(cols_path.read_text(encoding="utf-8"))
+        assert cols["metadata"]["regionDataEncoding"] == "columns"
+        scale = cols["metadata"]["complexityScale"]
+        codes = [o["socCode"] for o in cols["occupations"]]
+        for rid, year_data in cols["regionData"].items():
+            c = year_data["2024"]
+            assert all(isinstance(v, int) for v in c["complexity"])
+            decoded = [
+                {"socCode": codes[i], "totEmp": e, "gdp": g, "aMean": w,
+                 "complexity": x / scale}
+                for i, e, g, w, x in zip(c["occ"], c["totEmp"], c["gdp"],
+                                         c["aMean"], c["complexity"])
+            ]
+            assert decoded == rows["regionData"][rid]["2024"]
+
+    def test_meta_advertises_region_data_encoding(self, seeded_db, tmp_path,
+                                                  monkeypatch):
+        monkeypatch.setattr(config, "PUBLIC_DATA_DIR", tmp_path)
+        export_json.export_all(seeded_db, "USA", 2024, encoding="columns")
+        meta = json.loads((tmp_path / "bls-data.json").read_text())
+        assert meta["datasets"][0]["regionDataEncoding"] == "columns"
+        assert "complexityScale" not in meta["datasets"][0]
+        level_file = tmp_path / meta["levelFiles"]["us-2024"]["4"]
+        data = json.loads(level_file.read_text())
+        assert data["metadata"]["regionDataEncoding"] == "columns"
+
+    def test_export_workers_match_serial(self, seeded_db, tmp_path,
+                                         monkeypatch):
+        outputs = {}
+        for workers in (1, 2):
+            out_dir = tmp_path / f"w{workers}"
+            monkeypatch.setattr(config, "PUBLIC_DATA_DIR", out_dir)
+            with export_manifest.collect() as paths:
+                stats = export_json.export_all(seeded_db, "USA", 2024,
+                                               workers=workers)
+            stats["rows"] = {p.name: n for p, n in stats["rows"].items()}
+            stats["main_path"] = stats["main_path"].name
+            stats["paths"] = sorted(p.name for p in stats["paths"])
+            outputs[workers] = (stats, sorted(p.name for p in paths), {
+                p.name: p.read_bytes() for p in out_dir.glob("*.json")
+            })
+        assert outputs[1] == outputs[2]
+        assert "bls-data-us-2024-4.json" in outputs[2][1]
+        assert outputs[2][1] == sorted(outputs[2][2])
+
+    def test_shared_occupation_dictionary(self, seeded_db, tmp_path,
+                                          monkeypatch):
+        """Data files carry codes; the dictionary holds the tables."""
+        monkeypatch.setattr(config, "PUBLIC_DATA_DIR", tmp_path)
+        export_json.export_all(seeded_db, "USA", 2024)
+        inline = {p.name: json.loads(p.read_text())
+                  for p in tmp_path.glob("bls-data-us-*.json")}
+        export_json.export_all(seeded_db, "USA", 2024, encoding="columns",
+                               shared_occupations=True)
+
+        meta = json.loads((tmp_path / "bls-data.json").read_text())
+        assert meta["datasets"][0]["occupationDictionary"] == \
+            "occupations-us.json"
+        dictionary = json.loads((tmp_path / "occupations-us.json").read_text())
+        assert dictionary["metadata"]["version"] == "soc2018"
+
+        for name, before in inline.items():
+            path = tmp_path / name
+            assert validate.validate_json(path) == []
+            data = json.loads(path.read_text())
+            assert "occupations" not in data and "majorGroups" not in data
+            assert data["occupationCodes"] == [
+                o["socCode"] for o in before["occupations"]]
+            for occ in before["occupations"]:
+                entry = dictionary["occupations"][occ["socCode"]]
+                assert entry["name"] == occ["name"]
+                assert entry["majorGroupId"] == occ["majorGroupId"]
+            export_json._from_columns(data)
+            assert data["regionData"] == before["regionData"]
+
+    def test_region_shards(self, seeded_db, tmp_path, monkeypatch):
+        """Index + per-region shards reassemble to the single file."""
+        monkeypatch.setattr(config, "PUBLIC_DATA_DIR", tmp_path)
+        stale = tmp_path / "bls-data-us-2024" / "state-gone.json"
+        stale.parent.mkdir()
+        stale.write_text("{}")
+        export_json.export_all(seeded_db, "USA", 2024, shard=True)
+
+        meta = json.loads((tmp_path / "bls-data.json").read_text())
+        layout = meta["datasets"][0]["shardLayout"]
+        stem = meta["datasets"][0]["file"][:-len(".json")]
+        index_path = tmp_path / layout["index"].format(file=stem)
+        index = json.loads(index_path.read_text())
+        assert "regionData" not in index
+        assert not stale.exists()
+
+        full = json.loads((tmp_path / meta["datasets"][0]["file"]).read_text())
+        region_data = {}
+        for rid in index["metadata"]["shards"]:
+            shard_path = tmp_path / layout["region"].format(file=stem,
+                                                             regionId=rid)
+            shard = json.loads(shard_path.read_text())
+            region_data[shard["regionId"]] = shard["regionData"]
+        assert region_data == full["regionData"]
+        assert index["aggregates"] == full["aggregates"]
+
 
 class TestValidateCompleteness:
     """Test data completeness validation."""